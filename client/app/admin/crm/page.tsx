@@ -52,19 +52,15 @@ export default function CrmDashboardPage() {
   useEffect(() => {
     async function fetchStats() {
       try {
-        const [leadsData, quotesData, invoicesData, estimatesData] = await Promise.allSettled([
-          api.getLeadStats(),
-          api.getQuoteStats(),
-          api.getInvoiceStats(),
-          api.getEstimateStats(),
-        ]);
-
+        const data = await api.getDashboardStats();
         setStats({
-          leads: leadsData.status === 'fulfilled' ? leadsData.value : null,
-          quotes: quotesData.status === 'fulfilled' ? quotesData.value : null,
-          invoices: invoicesData.status === 'fulfilled' ? invoicesData.value : null,
-          estimates: estimatesData.status === 'fulfilled' ? estimatesData.value : null,
+          leads: data.leads,
+          quotes: data.quotes,
+          invoices: data.invoices,
+          estimates: data.estimates,
         });
+      } catch (err) {
+        console.error('Failed to fetch dashboard stats:', err);
       } finally {
         setIsLoading(false);
       }
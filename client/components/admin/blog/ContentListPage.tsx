@@ -225,9 +225,16 @@ export default function ContentListPage({ contentType }: ContentListPageProps) {
                             {statusLabels[post.status]}
                           </span>
                         </div>
-                        <p className="text-xs text-gray-500 mt-1 line-clamp-2">
-                          {post.excerpt || 'No excerpt'}
-                        </p>
+                        {post.search_snippet ? (
+                          <p
+                            className="text-xs text-gray-500 mt-1 line-clamp-2"
+                            dangerouslySetInnerHTML={{ __html: post.search_snippet }}
+                          />
+                        ) : (
+                          <p className="text-xs text-gray-500 mt-1 line-clamp-2">
+                            {post.excerpt || 'No excerpt'}
+                          </p>
+                        )}
                         <div className="flex items-center gap-2 mt-2">
                           <div className="flex items-center gap-1 text-xs text-gray-400">
                             <Calendar className="w-3 h-3" />
@@ -319,9 +326,16 @@ export default function ContentListPage({ contentType }: ContentListPageProps) {
                               <h3 className="font-medium text-gray-900 truncate max-w-xs">
                                 {post.title}
                               </h3>
-                              <p className="text-sm text-gray-500 truncate max-w-xs">
-                                {post.excerpt || 'No excerpt'}
-                              </p>
+                              {post.search_snippet ? (
+                                <p
+                                  className="text-sm text-gray-500 truncate max-w-xs"
+                                  dangerouslySetInnerHTML={{ __html: post.search_snippet }}
+                                />
+                              ) : (
+                                <p className="text-sm text-gray-500 truncate max-w-xs">
+                                  {post.excerpt || 'No excerpt'}
+                                </p>
+                              )}
                             </div>
                           </div>
                         </td>
@@ -187,6 +187,13 @@ const VideoEmbed = Node.create({
   },
 });
 
+// width/height on a resolved media_plan image (data-media-id) are its
+// intrinsic size, written by resolve_media_placeholder before any srcset
+// exists (see blog/services/image_derivatives.py) -- not a display width,
+// which this editor always saves as an inline style.
+const hasIntrinsicSize = (element: HTMLElement) =>
+  element.hasAttribute('srcset') || element.hasAttribute('data-media-id');
+
 // Extended Image extension with width, alignment, drag-to-move and resize.
 // Attribute parsing keeps width/align in sync with saved HTML; the actual
 // visual output (public site) is produced by renderHTML as inline styles,
@@ -199,11 +206,40 @@ const ResizableImage = Image.extend({
       ...this.parent?.(),
       width: {
         default: null,
+        // An intrinsic width attribute (see hasIntrinsicSize) goes to
+        // intrinsicWidth below, not here.
         parseHTML: element =>
-          element.style.width || element.getAttribute('width') || null,
+          element.style.width ||
+          (hasIntrinsicSize(element) ? null : element.getAttribute('width')) ||
+          null,
         // Rendered via node renderHTML below (avoids duplicate style attrs).
         renderHTML: () => ({}),
       },
+      // Responsive derivatives written by generate_image_derivatives (see
+      // blog/services/image_derivatives.py). Declared for the same reason as
+      // mediaId below: undeclared attributes are dropped on round-trip.
+      srcset: {
+        default: null,
+        parseHTML: element => element.getAttribute('srcset'),
+        renderHTML: attributes => (attributes.srcset ? { srcset: attributes.srcset } : {}),
+      },
+      sizes: {
+        default: null,
+        parseHTML: element => element.getAttribute('sizes'),
+        renderHTML: attributes => (attributes.sizes ? { sizes: attributes.sizes } : {}),
+      },
+      intrinsicWidth: {
+        default: null,
+        parseHTML: element => (hasIntrinsicSize(element) ? element.getAttribute('width') : null),
+        renderHTML: attributes =>
+          attributes.intrinsicWidth ? { width: attributes.intrinsicWidth } : {},
+      },
+      intrinsicHeight: {
+        default: null,
+        parseHTML: element => (hasIntrinsicSize(element) ? element.getAttribute('height') : null),
+        renderHTML: attributes =>
+          attributes.intrinsicHeight ? { height: attributes.intrinsicHeight } : {},
+      },
       align: {
         default: 'center',
         parseHTML: element => element.getAttribute('data-align') || 'center',
@@ -25,6 +25,7 @@ function PhaseMedia({ media, title }: { media: ProjectMedia; title: string }) {
     return (
       <video
         src={media.file}
+        poster={media.poster ?? undefined}
         autoPlay
         muted
         loop
@@ -106,6 +107,7 @@ export default function ProjectDetailPage({ project }: ProjectDetailPageProps) {
               ) : project.main_video ? (
                 <video
                   src={project.main_video}
+                  poster={project.main_video_poster ?? undefined}
                   controls
                   playsInline
                   className="absolute inset-0 w-full h-full object-contain"
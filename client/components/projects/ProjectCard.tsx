@@ -28,7 +28,7 @@ export default function ProjectCard({ project }: ProjectCardProps) {
       <div className="overflow-hidden bg-gray-100 w-full relative">
         {project.cover_image ? (
           project.cover_media_type === 'video' ? (
-            <VideoWithSound src={project.cover_image} className="w-full h-auto block" />
+            <VideoWithSound src={project.cover_image} poster={project.cover_poster ?? undefined} className="w-full h-auto block" />
           ) : (
             <img
               src={project.cover_image}
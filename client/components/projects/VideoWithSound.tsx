@@ -4,11 +4,12 @@ import { useRef, useEffect } from 'react';
 
 interface VideoWithSoundProps {
   src: string;
+  poster?: string;
   className?: string;
   threshold?: number; // how much of the video must be visible before unmuting (0-1)
 }
 
-export default function VideoWithSound({ src, className, threshold = 0.5 }: VideoWithSoundProps) {
+export default function VideoWithSound({ src, poster, className, threshold = 0.5 }: VideoWithSoundProps) {
   const ref = useRef<HTMLVideoElement>(null);
 
   useEffect(() => {
@@ -39,6 +40,7 @@ export default function VideoWithSound({ src, className, threshold = 0.5 }: Vide
     <video
       ref={ref}
       src={src}
+      poster={poster}
       autoPlay
       muted          // must start muted for autoplay to work
       loop
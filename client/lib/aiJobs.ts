@@ -0,0 +1,117 @@
+import type { AIJob } from '@/types/api';
+
+const WS_BASE = process.env.NEXT_PUBLIC_WS_URL || 'ws://localhost:8000';
+
+// Polling fallback while the socket is down (no token yet, proxy without
+// WebSocket support, mid-reconnect).
+const POLL_INTERVAL_MS = 3000;
+
+type AIJobProgressHandler = (job: AIJob) => void;
+
+interface Waiter {
+  resolve: (job: AIJob) => void;
+  reject: (error: Error) => void;
+  onProgress?: AIJobProgressHandler;
+}
+
+interface AIJobSocketMessage {
+  type: 'ai_jobs_snapshot' | 'ai_job_update' | 'pong';
+  job?: AIJob;
+  jobs?: AIJob[];
+}
+
+const isFinished = (job: AIJob) => job.status === 'succeeded' || job.status === 'failed';
+
+// Waits for background AI jobs (see blog/ai_jobs.py) over a single shared
+// ws/blog/ai-jobs/ socket, opened while at least one job is pending and
+// closed once none are. Any number of jobs can be awaited at once.
+export class AIJobWatcher {
+  private socket: WebSocket | null = null;
+  private waiters = new Map<string, Waiter>();
+  private pollTimer: ReturnType<typeof setInterval> | null = null;
+
+  constructor(
+    private getToken: () => string | null,
+    private fetchJob: (id: string) => Promise<AIJob>
+  ) {}
+
+  wait(job: AIJob, onProgress?: AIJobProgressHandler): Promise<AIJob> {
+    return new Promise((resolve, reject) => {
+      this.waiters.set(job.id, { resolve, reject, onProgress });
+      this.handle(job);
+      if (this.waiters.size > 0) {
+        this.connect();
+        this.startPolling();
+      }
+    });
+  }
+
+  private handle(job: AIJob): void {
+    const waiter = this.waiters.get(job.id);
+    if (!waiter) return;
+
+    if (!isFinished(job)) {
+      waiter.onProgress?.(job);
+      return;
+    }
+    this.waiters.delete(job.id);
+    if (job.status === 'succeeded') {
+      waiter.resolve(job);
+    } else {
+      waiter.reject(new Error(job.error || 'AI generation failed'));
+    }
+    if (this.waiters.size === 0) this.stop();
+  }
+
+  private connect(): void {
+    if (this.socket || typeof window === 'undefined') return;
+    const token = this.getToken();
+    if (!token) return;
+
+    const socket = new WebSocket(`${WS_BASE}/ws/blog/ai-jobs/?token=${token}`);
+    this.socket = socket;
+
+    socket.onmessage = (event) => {
+      try {
+        const data: AIJobSocketMessage = JSON.parse(event.data);
+        if (data.type === 'ai_jobs_snapshot') {
+          data.jobs?.forEach(job => this.handle(job));
+        } else if (data.type === 'ai_job_update' && data.job) {
+          this.handle(data.job);
+        }
+      } catch (error) {
+        console.error('Failed to parse AI job message:', error);
+      }
+    };
+
+    socket.onclose = () => {
+      if (this.socket === socket) this.socket = null;
+    };
+  }
+
+  private startPolling(): void {
+    if (this.pollTimer) return;
+    this.pollTimer = setInterval(() => {
+      if (this.socket?.readyState === WebSocket.OPEN) return;
+      this.connect();
+      this.waiters.forEach((_, id) => {
+        this.fetchJob(id)
+          .then(job => this.handle(job))
+          .catch(() => {
+            // Transient; the next tick retries.
+          });
+      });
+    }, POLL_INTERVAL_MS);
+  }
+
+  private stop(): void {
+    if (this.pollTimer) {
+      clearInterval(this.pollTimer);
+      this.pollTimer = null;
+    }
+    if (this.socket) {
+      this.socket.close(1000);
+      this.socket = null;
+    }
+  }
+}
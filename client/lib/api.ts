@@ -37,6 +37,7 @@ import type {
   NotificationPreferences,
   PushSubscriptionCreate,
   DailyStatsResponse,
+  DashboardStats,
   BlogCategory,
   BlogPost,
   BlogPostListItem,
@@ -52,11 +53,16 @@ import type {
   AIGenerateSEORequest,
   AIGenerateSEOResponse,
   BlogImageUploadResponse,
+  DirectUpload,
+  DirectUploadTarget,
+  VideoUpload,
+  VideoUploadTarget,
   AIEnhancePromptRequest,
   AIEnhancePromptResponse,
   AIGenerateImageRequest,
   AIGenerateImageResponse,
   AIImageOptionsResponse,
+  AIJob,
   CalendarBlogPost,
   QuickDraftCreate,
   MediaResolvedSource,
@@ -95,6 +101,7 @@ import type {
   SubdomainCheckResponse,
 } from '@/types/api';
 import type { ContentType } from '@/lib/contentTypes';
+import { AIJobWatcher } from '@/lib/aiJobs';
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api';
 
@@ -157,6 +164,10 @@ class ApiClient {
   private cache = new ApiCache();
   private refreshPromise: Promise<boolean> | null = null;
   private tokenRefreshListeners: (() => void)[] = [];
+  private aiJobs = new AIJobWatcher(
+    () => this.accessToken,
+    (id) => this.getAIJob(id)
+  );
 
   constructor() {
     // Initialize tokens from localStorage (client-side only)
@@ -206,6 +217,90 @@ class ApiClient {
     return !!this.accessToken;
   }
 
+  // Upload `file` straight to storage (R2 presigned URL, or the local upload
+  // endpoint) instead of through a multipart API request. `endpoint` is the
+  // upload-url action of the object the file will be attached to. Returns
+  // the token to send as `upload_token`.
+  async directUpload(endpoint: string, file: File, target?: DirectUploadTarget): Promise<string> {
+    const upload = await this.fetch<DirectUpload>(endpoint, {
+      method: 'POST',
+      body: JSON.stringify({
+        target,
+        filename: file.name,
+        content_type: file.type,
+        size: file.size,
+      }),
+    });
+    const response = await fetch(upload.url, {
+      method: upload.method,
+      headers: upload.headers,
+      body: file,
+    });
+    if (!response.ok) {
+      throw new Error(`Upload failed (${response.status})`);
+    }
+    return upload.token;
+  }
+
+  // Resumable chunked upload of a project video (server:
+  // projects/chunked_uploads.py). The upload id is kept in localStorage, so
+  // uploading the same file again after a dropped connection or a reload
+  // picks up at the last chunk the server has. Returns the token to send as
+  // `upload_token`.
+  async uploadProjectVideo(
+    projectId: number,
+    file: File,
+    target: VideoUploadTarget,
+    onProgress?: (fraction: number) => void
+  ): Promise<string> {
+    const resumeKey = `video-upload:${projectId}:${target}:${file.name}:${file.size}:${file.lastModified}`;
+    const savedId = typeof window !== 'undefined' ? localStorage.getItem(resumeKey) : null;
+    let upload = savedId
+      ? await this.fetch<VideoUpload>(`/projects/${projectId}/uploads/${savedId}/`).catch(() => null)
+      : null;
+    if (!upload) {
+      upload = await this.fetch<VideoUpload>(`/projects/${projectId}/uploads/`, {
+        method: 'POST',
+        body: JSON.stringify({
+          target,
+          filename: file.name,
+          content_type: file.type,
+          size: file.size,
+        }),
+      });
+      if (typeof window !== 'undefined') localStorage.setItem(resumeKey, upload.id);
+    }
+
+    let failures = 0;
+    while (upload.status !== 'complete') {
+      const buffer = await file.slice(upload.offset, upload.offset + upload.chunk_size).arrayBuffer();
+      const digest = new Uint8Array(await crypto.subtle.digest('SHA-256', buffer));
+      const checksum = btoa(String.fromCharCode(...digest));
+      const current: VideoUpload = upload;
+      try {
+        upload = await this.fetch<VideoUpload>(`/projects/${projectId}/uploads/${current.id}/`, {
+          method: 'PATCH',
+          headers: {
+            'Content-Type': 'application/offset+octet-stream',
+            'Upload-Offset': String(current.offset),
+            'Upload-Checksum': `sha256 ${checksum}`,
+          },
+          body: buffer,
+        });
+        failures = 0;
+        onProgress?.(upload.offset / upload.size);
+      } catch (error) {
+        if (++failures > 5) throw error;
+        await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** failures));
+        // Re-sync with wherever the server got to (offset conflict, or the
+        // chunk landed but the response was lost).
+        upload = await this.fetch<VideoUpload>(`/projects/${projectId}/uploads/${current.id}/`).catch(() => current);
+      }
+    }
+    if (typeof window !== 'undefined') localStorage.removeItem(resumeKey);
+    return upload.upload_token as string;
+  }
+
   // Core fetch method with auth handling
   async fetch<T>(
     endpoint: string,
@@ -217,7 +312,7 @@ class ApiClient {
     };
 
     // Add content type for non-FormData requests
-    if (!(options.body instanceof FormData)) {
+    if (!(options.body instanceof FormData) && !headers['Content-Type']) {
       headers['Content-Type'] = 'application/json';
     }
 
@@ -402,6 +497,11 @@ class ApiClient {
   }
 
   async createGalleryImage(formData: FormData): Promise<GalleryImage> {
+    const image = formData.get('image');
+    if (image instanceof File) {
+      formData.delete('image');
+      formData.append('upload_token', await this.directUpload('/gallery/upload-url/', image));
+    }
     const data = await this.fetch<GalleryImage>('/gallery/', {
       method: 'POST',
       body: formData,
@@ -716,12 +816,10 @@ class ApiClient {
   }
 
   async uploadCustomerPhoto(customerId: number, image: File, caption?: string): Promise<CustomerPhoto> {
-    const formData = new FormData();
-    formData.append('image', image);
-    if (caption) formData.append('caption', caption);
+    const uploadToken = await this.directUpload(`/customers/${customerId}/photo_upload_url/`, image);
     return this.fetch<CustomerPhoto>(`/customers/${customerId}/upload_photo/`, {
       method: 'POST',
-      body: formData,
+      body: JSON.stringify({ upload_token: uploadToken, caption: caption ?? '' }),
     });
   }
 
@@ -1036,6 +1134,10 @@ class ApiClient {
     return this.fetch<DailyStatsResponse>(`/notifications/stats/daily/?days=${days}`);
   }
 
+  async getDashboardStats(): Promise<DashboardStats> {
+    return this.fetch<DashboardStats>('/notifications/stats/dashboard/');
+  }
+
   // ============ Blog Categories ============
 
   async getBlogCategories(): Promise<BlogCategory[]> {
@@ -1181,26 +1283,46 @@ class ApiClient {
   }
 
   // ============ Blog AI Generation ============
+  // Generations run as background jobs (see blog/ai_jobs.py): each call
+  // queues one and resolves with its result once it finishes, so several
+  // can run in parallel. onProgress receives the job while it's running.
 
-  async generateBlogPost(data: AIGeneratePostRequest): Promise<AIGeneratePostResponse> {
-    return this.fetch<AIGeneratePostResponse>('/blog/posts/ai_generate_post/', {
-      method: 'POST',
-      body: JSON.stringify(data),
-    });
+  async getAIJob(id: string): Promise<AIJob> {
+    return this.fetch<AIJob>(`/blog/ai-jobs/${id}/`);
   }
 
-  async generateBlogSection(data: AIGenerateSectionRequest): Promise<AIGenerateSectionResponse> {
-    return this.fetch<AIGenerateSectionResponse>('/blog/posts/ai_generate_section/', {
+  private async runAIJob<T>(
+    endpoint: string,
+    data: object,
+    onProgress?: (job: AIJob) => void
+  ): Promise<T> {
+    const job = await this.fetch<AIJob>(endpoint, {
       method: 'POST',
       body: JSON.stringify(data),
     });
+    const finished = await this.aiJobs.wait(job, onProgress);
+    return finished.result as T;
   }
 
-  async generateBlogSEO(data: AIGenerateSEORequest): Promise<AIGenerateSEOResponse> {
-    return this.fetch<AIGenerateSEOResponse>('/blog/posts/ai_generate_seo/', {
-      method: 'POST',
-      body: JSON.stringify(data),
-    });
+  async generateBlogPost(
+    data: AIGeneratePostRequest,
+    onProgress?: (job: AIJob) => void
+  ): Promise<AIGeneratePostResponse> {
+    return this.runAIJob<AIGeneratePostResponse>('/blog/posts/ai_generate_post/', data, onProgress);
+  }
+
+  async generateBlogSection(
+    data: AIGenerateSectionRequest,
+    onProgress?: (job: AIJob) => void
+  ): Promise<AIGenerateSectionResponse> {
+    return this.runAIJob<AIGenerateSectionResponse>('/blog/posts/ai_generate_section/', data, onProgress);
+  }
+
+  async generateBlogSEO(
+    data: AIGenerateSEORequest,
+    onProgress?: (job: AIJob) => void
+  ): Promise<AIGenerateSEOResponse> {
+    return this.runAIJob<AIGenerateSEOResponse>('/blog/posts/ai_generate_seo/', data, onProgress);
   }
 
   async uploadBlogImage(image: File, altText?: string): Promise<BlogImageUploadResponse> {
@@ -1216,18 +1338,18 @@ class ApiClient {
 
   // ============ AI Image Generation ============
 
-  async enhanceImagePrompt(data: AIEnhancePromptRequest): Promise<AIEnhancePromptResponse> {
-    return this.fetch<AIEnhancePromptResponse>('/blog/posts/ai_enhance_prompt/', {
-      method: 'POST',
-      body: JSON.stringify(data),
-    });
+  async enhanceImagePrompt(
+    data: AIEnhancePromptRequest,
+    onProgress?: (job: AIJob) => void
+  ): Promise<AIEnhancePromptResponse> {
+    return this.runAIJob<AIEnhancePromptResponse>('/blog/posts/ai_enhance_prompt/', data, onProgress);
   }
 
-  async generateAIImage(data: AIGenerateImageRequest): Promise<AIGenerateImageResponse> {
-    return this.fetch<AIGenerateImageResponse>('/blog/posts/ai_generate_image/', {
-      method: 'POST',
-      body: JSON.stringify(data),
-    });
+  async generateAIImage(
+    data: AIGenerateImageRequest,
+    onProgress?: (job: AIJob) => void
+  ): Promise<AIGenerateImageResponse> {
+    return this.runAIJob<AIGenerateImageResponse>('/blog/posts/ai_generate_image/', data, onProgress);
   }
 
   async getAIImageOptions(): Promise<AIImageOptionsResponse> {
@@ -1343,12 +1465,10 @@ class ApiClient {
   }
 
   async uploadEstimatePhoto(id: number, image: File, caption?: string): Promise<EstimatePhoto> {
-    const form = new FormData();
-    form.append('image', image);
-    if (caption) form.append('caption', caption);
+    const uploadToken = await this.directUpload(`/estimates/${id}/photo_upload_url/`, image);
     return this.fetch<EstimatePhoto>(`/estimates/${id}/upload_photo/`, {
       method: 'POST',
-      body: form,
+      body: JSON.stringify({ upload_token: uploadToken, caption: caption ?? '' }),
     });
   }
 
@@ -1516,12 +1636,10 @@ class ApiClient {
   }
 
   async uploadEstimateVisitPhoto(visitId: number, image: File, caption?: string): Promise<EstimateVisitPhoto> {
-    const formData = new FormData();
-    formData.append('image', image);
-    if (caption) formData.append('caption', caption);
+    const uploadToken = await this.directUpload(`/estimate-visits/${visitId}/photo_upload_url/`, image);
     return this.fetch<EstimateVisitPhoto>(`/estimate-visits/${visitId}/upload_photo/`, {
       method: 'POST',
-      body: formData,
+      body: JSON.stringify({ upload_token: uploadToken, caption: caption ?? '' }),
     });
   }
 
@@ -1656,13 +1774,19 @@ class ApiClient {
     });
   }
 
-  async uploadMedia(projectId: number, phaseId: number, file: File, altText?: string): Promise<ProjectMedia> {
-    const formData = new FormData();
-    formData.append('file', file);
-    if (altText) formData.append('alt_text', altText);
+  async uploadMedia(
+    projectId: number,
+    phaseId: number,
+    file: File,
+    altText?: string,
+    onProgress?: (fraction: number) => void
+  ): Promise<ProjectMedia> {
+    const uploadToken = file.type.startsWith('video/')
+      ? await this.uploadProjectVideo(projectId, file, 'project_media', onProgress)
+      : await this.directUpload(`/projects/${projectId}/upload-url/`, file, 'project_media');
     return this.fetch<ProjectMedia>(`/projects/${projectId}/phases/${phaseId}/media/`, {
       method: 'POST',
-      body: formData,
+      body: JSON.stringify({ upload_token: uploadToken, alt_text: altText ?? '' }),
     });
   }
 
@@ -1677,12 +1801,11 @@ class ApiClient {
     });
   }
 
-  async uploadMainVideo(projectId: number, file: File): Promise<Project> {
-    const formData = new FormData();
-    formData.append('file', file);
+  async uploadMainVideo(projectId: number, file: File, onProgress?: (fraction: number) => void): Promise<Project> {
+    const uploadToken = await this.uploadProjectVideo(projectId, file, 'project_main_video', onProgress);
     return this.fetch<Project>(`/projects/${projectId}/main-video/`, {
       method: 'POST',
-      body: formData,
+      body: JSON.stringify({ upload_token: uploadToken }),
     });
   }
 
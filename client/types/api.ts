@@ -274,6 +274,40 @@ export interface ApiError {
   [key: string]: string | string[] | undefined;
 }
 
+// Direct-to-storage upload issued by an upload-url endpoint: PUT the raw
+// file to `url` with `headers`, then send `token` as `upload_token`.
+export type DirectUploadTarget =
+  | 'gallery_image'
+  | 'project_media'
+  | 'project_main_video'
+  | 'customer_photo'
+  | 'estimate_photo'
+  | 'estimate_visit_photo';
+
+// Resumable chunked upload of a project video: PATCH `chunk_size` slices
+// at `offset` until `status` is 'complete', then attach `upload_token`.
+export type VideoUploadTarget = 'project_main_video' | 'project_media';
+
+export interface VideoUpload {
+  id: string;
+  target: VideoUploadTarget;
+  key: string;
+  size: number;
+  offset: number;
+  chunk_size: number;
+  status: 'uploading' | 'complete';
+  upload_token?: string;
+}
+
+export interface DirectUpload {
+  method: 'PUT';
+  url: string;
+  headers: Record<string, string>;
+  token: string;
+  key: string;
+  expires_in: number;
+}
+
 // Category name mapping (frontend to backend)
 export const categoryNameMap: Record<string, string> = {
   backsplashes: 'backsplash',
@@ -932,6 +966,22 @@ export interface DailyStatsResponse {
   };
 }
 
+export interface LocalAdsLeadStats {
+  total: number;
+  by_status: Record<LocalAdsLeadStatus, number>;
+  by_charge_status: Record<LocalAdsChargeStatus, number>;
+  by_lead_type: Record<LocalAdsLeadType, number>;
+}
+
+// All admin dashboard tiles, loaded in one request
+export interface DashboardStats {
+  quotes: QuoteStats;
+  invoices: InvoiceStats;
+  estimates: EstimateStats;
+  leads: LeadStats;
+  local_ads_leads: LocalAdsLeadStats;
+}
+
 // ==================== BLOG TYPES ====================
 
 export type BlogPostStatus = 'draft' | 'published' | 'scheduled';
@@ -989,6 +1039,21 @@ export interface MediaPlaceholderCandidates {
   web: MediaCandidate[];
 }
 
+// Responsive derivatives of a resolved inline image (see
+// blog/services/image_derivatives.py). Keys are blog media storage keys.
+export interface ImageDerivative {
+  width: number;
+  height: number;
+  key: string;
+}
+
+export interface ImageDerivativeManifest {
+  source: string;
+  width: number;
+  height: number;
+  variants: { webp: ImageDerivative[]; avif?: ImageDerivative[] };
+}
+
 export interface MediaPlanEntry {
   id: number;
   type: MediaPlaceholderType;
@@ -998,6 +1063,7 @@ export interface MediaPlanEntry {
   status: MediaPlaceholderStatus;
   resolved_source: MediaResolvedSource | null;
   resolved_url: string | null;
+  derivatives?: ImageDerivativeManifest;
   candidates?: MediaPlaceholderCandidates;
 }
 
@@ -1024,6 +1090,12 @@ export interface SuggestedLinkEntry {
   status: SuggestedLinkStatus;
 }
 
+export interface BlogPostOutlineItem {
+  level: 2 | 3 | 4;
+  text: string;
+  anchor: string;
+}
+
 export interface BlogPost {
   id: number;
   title: string;
@@ -1054,6 +1126,11 @@ export interface BlogPost {
   pending_snapshot: Record<string, unknown> | null;
   has_pending_changes: boolean;
   reading_time: number;
+  word_count: number;
+  outline: BlogPostOutlineItem[];
+  /** Admin detail only: in-body placeholder ids still awaiting resolution. */
+  unresolved_media_ids?: string[];
+  unresolved_link_ids?: string[];
   effective_meta_title: string;
   effective_meta_description: string;
   created_at: string;
@@ -1093,8 +1170,12 @@ export interface BlogPostListItem {
   status: BlogPostStatus;
   publish_date: string | null;
   reading_time: number;
+  /** Opening of the body as plain text. */
+  text_excerpt: string;
   created_at: string;
   last_updated: string;
+  /** Highlighted body excerpt (HTML with <mark>) when listed with `search`; null otherwise. */
+  search_snippet: string | null;
 }
 
 export interface BlogPostCreate {
@@ -1155,6 +1236,7 @@ export interface AIGeneratePostRequest {
   topic: string;
   keywords?: string[];
   tone?: 'professional' | 'friendly' | 'informative';
+  bypass_cache?: boolean; // Regenerate instead of reusing a cached result
 }
 
 export interface AIGeneratePostResponse {
@@ -1172,6 +1254,7 @@ export interface AIGenerateSectionRequest {
   section_type: 'intro' | 'body' | 'conclusion' | 'faq';
   context: string;
   existing_content?: string;
+  bypass_cache?: boolean; // Regenerate instead of reusing a cached result
 }
 
 export interface AIGenerateSectionResponse {
@@ -1183,6 +1266,7 @@ export interface AIGenerateSectionResponse {
 export interface AIGenerateSEORequest {
   title: string;
   content: string;
+  bypass_cache?: boolean; // Regenerate instead of reusing a cached result
 }
 
 export interface AIGenerateSEOResponse {
@@ -1202,6 +1286,7 @@ export interface BlogImageUploadResponse {
 export interface AIEnhancePromptRequest {
   prompt: string;
   context?: string;
+  bypass_cache?: boolean; // Regenerate instead of reusing a cached result
 }
 
 export interface AIEnhancePromptResponse {
@@ -1214,6 +1299,7 @@ export interface AIGenerateImageRequest {
   aspect_ratio: '1:1' | '3:4' | '4:3' | '9:16' | '16:9';
   enhanced?: boolean;
   context?: string;
+  bypass_cache?: boolean; // Regenerate instead of reusing a cached result
 }
 
 export interface AIGenerateImageResponse {
@@ -1223,6 +1309,24 @@ export interface AIGenerateImageResponse {
   error?: string;
 }
 
+// Background AI job (see blog/ai_jobs.py). The generate* endpoints return
+// one of these with 202; `result` holds the matching *Response once done.
+export type AIJobKind = 'post' | 'section' | 'seo' | 'enhance_prompt' | 'image';
+export type AIJobStatus = 'queued' | 'running' | 'succeeded' | 'failed';
+
+export interface AIJob<T = unknown> {
+  id: string;
+  kind: AIJobKind;
+  status: AIJobStatus;
+  progress: number;
+  message: string;
+  result: T | null;
+  error: string | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
 export interface AspectRatioOption {
   value: string;
   label: string;
@@ -1282,10 +1386,16 @@ export type ServiceTypeSlug = typeof SERVICE_TYPES[number]['slug'];
 export type ProjectStatus = 'draft' | 'published';
 export type WorkStatus = 'started' | 'in_progress' | 'completed';
 export type MainVideoType = 'none' | 'video' | 'youtube';
+// Web renditions of an uploaded video; until 'ready' the file URL is the original.
+export type VideoStatus = 'none' | 'pending' | 'processing' | 'ready' | 'failed';
 
 export interface ProjectMedia {
   id: number;
   file: string | null;
+  poster: string | null;
+  hls_url: string | null;
+  original_file: string | null;
+  video_status: VideoStatus;
   youtube_url: string;
   youtube_embed_url: string | null;
   youtube_thumbnail: string | null;
@@ -1314,6 +1424,9 @@ export interface Project {
   is_featured: boolean;
   job_types: ServiceTypeSlug[];
   main_video: string | null;
+  main_video_poster: string | null;
+  main_video_hls_url: string | null;
+  main_video_status: VideoStatus;
   main_video_url: string;
   main_video_type: MainVideoType;
   main_video_embed_url: string | null;
@@ -1333,9 +1446,13 @@ export interface ProjectListItem {
   job_types: ServiceTypeSlug[];
   phase_count: number;
   main_video: string | null;
+  main_video_poster: string | null;
+  main_video_hls_url: string | null;
+  main_video_status: VideoStatus;
   main_video_type: MainVideoType;
   cover_image: string | null;
   cover_media_type: 'image' | 'video' | 'youtube';
+  cover_poster: string | null;
   created_at: string;
   updated_at: string;
 }
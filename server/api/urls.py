@@ -25,7 +25,7 @@ from quotes.views import (
     PortalCustomerSearchView,
     PortalCustomerCreateView,
 )
-from api.views import GoogleReviewsView
+from api.views import GoogleReviewsView, DirectUploadView
 from integrations.urls import api_urlpatterns as integration_api_urls
 from landingpages.views import LandingPageViewSet, LandingPageSectionViewSet
 
@@ -75,6 +75,9 @@ urlpatterns = [
     # Google Reviews
     path('google-reviews/', GoogleReviewsView.as_view(), name='google_reviews'),
 
+    # Direct uploads to local disk (R2 uploads go straight to the bucket)
+    path('uploads/<str:token>/', DirectUploadView.as_view(), name='direct_upload'),
+
     # Integrations API
     path('integrations/', include(integration_api_urls)),
 
@@ -1,3 +1,4 @@
+import io
 import os
 import requests
 from django.core.cache import cache
@@ -5,6 +6,8 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 
+from config import direct_uploads
+
 
 class GoogleReviewsView(APIView):
     """
@@ -66,3 +69,17 @@ class GoogleReviewsView(APIView):
             return Response({
                 'error': f'Failed to fetch reviews: {str(e)}'
             }, status=500)
+
+
+class DirectUploadView(APIView):
+    """
+    Local-disk target of a direct upload (config/direct_uploads.py): the raw
+    file body, PUT by the browser with the URL the issuing endpoint returned.
+    The signed token in the URL is the credential, like a presigned R2 URL.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def put(self, request, token):
+        key = direct_uploads.receive(token, request.stream or io.BytesIO())
+        return Response({'key': key})
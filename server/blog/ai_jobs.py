@@ -0,0 +1,206 @@
+"""
+Background AI generation for the blog editor.
+
+ai_generate_post / _section / _seo, ai_enhance_prompt and ai_generate_image
+used to call Gemini/Pollinations inside the request, tying up a server
+worker for the whole generation and losing the result whenever a long one
+hit a proxy timeout. Those endpoints now call enqueue(), which stores an
+AIJob and returns it straight away (202); tasks.run_ai_job does the work
+on the 'ai' Celery queue.
+
+- Job state, progress and the result (or error) are persisted on the AIJob
+  row, readable at /api/blog/ai-jobs/<id>/ -- nothing is lost if the editor
+  disconnects or reloads mid-generation.
+- Every state change is pushed to the requesting user's
+  `blog_ai_jobs_<user_id>` group, which AIJobConsumer (ws/blog/ai-jobs/)
+  forwards to the browser. On connect the consumer replays the user's
+  active and just-finished jobs, so an event sent before the socket was up
+  isn't missed.
+- Jobs are independent, so the editor can run several at once; how many
+  actually run in parallel is the 'ai' worker pool's concurrency.
+"""
+import logging
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.utils import timezone
+
+from .services import ai_cache
+
+logger = logging.getLogger(__name__)
+
+# How long a finished job is still replayed to a (re)connecting socket.
+REPLAY_WINDOW = timedelta(minutes=10)
+
+
+class AIJobFailed(Exception):
+    """The provider returned an error. `details` is kept as the job's result."""
+
+    def __init__(self, message, details=None):
+        super().__init__(message)
+        self.details = details
+
+
+def group_name(user_id):
+    return f'blog_ai_jobs_{user_id}'
+
+
+def serialize(job):
+    """Payload for the API and the WebSocket."""
+    from .serializers import AIJobSerializer
+
+    return dict(AIJobSerializer(job).data)
+
+
+def replay_jobs(user_id):
+    """Serialized jobs a newly connected socket should be told about: the
+    user's unfinished jobs and those finished within REPLAY_WINDOW."""
+    from .models import AIJob
+
+    recent = AIJob.objects.filter(user_id=user_id, created_at__gte=timezone.now() - REPLAY_WINDOW)
+    active = AIJob.objects.filter(user_id=user_id, status__in=('queued', 'running'))
+    return [serialize(job) for job in (recent | active).distinct()]
+
+
+def _broadcast(job):
+    try:
+        channel_layer = get_channel_layer()
+        if not channel_layer:
+            return
+        async_to_sync(channel_layer.group_send)(
+            group_name(job.user_id),
+            {'type': 'ai_job_update', 'job': serialize(job)}
+        )
+    except Exception as e:
+        logger.error(f"Failed to send AI job update for {job.id}: {e}")
+
+
+def enqueue(user, kind, params):
+    """Create an AIJob for `user` and queue it once the transaction commits."""
+    from .models import AIJob
+    from .tasks import run_ai_job
+
+    job = AIJob.objects.create(user=user, kind=kind, params=params)
+    transaction.on_commit(lambda: run_ai_job.delay(str(job.id)))
+    return job
+
+
+def _checked(result):
+    if 'error' in result:
+        raw_response = result.get('raw_response')
+        raise AIJobFailed(result['error'], details={'raw_response': raw_response} if raw_response else None)
+    return result
+
+
+def _generate_post(params, report):
+    from .services import AIService
+
+    report(10, 'Writing post')
+    return _checked(AIService().generate_full_post(
+        topic=params['topic'],
+        keywords=params.get('keywords'),
+        tone=params.get('tone', 'professional')
+    ))
+
+
+def _generate_section(params, report):
+    from .services import AIService
+
+    report(10, 'Writing section')
+    return _checked(AIService().generate_section(
+        section_type=params['section_type'],
+        context=params['context'],
+        existing_content=params.get('existing_content')
+    ))
+
+
+def _generate_seo(params, report):
+    from .services import AIService
+
+    report(10, 'Writing SEO metadata')
+    return _checked(AIService().generate_seo(title=params['title'], content=params['content']))
+
+
+def _enhance_prompt(params, report):
+    from .services import ImageGenerationService
+
+    report(10, 'Enhancing prompt')
+    enhanced = ImageGenerationService().enhance_prompt(prompt=params['prompt'], context=params.get('context'))
+    return {'enhanced_prompt': enhanced}
+
+
+def _generate_image(params, report):
+    from .services import ImageGenerationService
+
+    service = ImageGenerationService()
+    prompt = params['prompt']
+    if params.get('enhanced'):
+        report(10, 'Enhancing prompt')
+        prompt = service.enhance_prompt(prompt=prompt, context=params.get('context'))
+    report(40, 'Generating image')
+    return _checked(service.generate_image(prompt=prompt, aspect_ratio=params['aspect_ratio']))
+
+
+RUNNERS = {
+    'post': _generate_post,
+    'section': _generate_section,
+    'seo': _generate_seo,
+    'enhance_prompt': _enhance_prompt,
+    'image': _generate_image,
+}
+
+
+def run(job_id):
+    """Run a queued job to completion. A job that's already been claimed
+    (duplicate delivery) is left alone."""
+    from .models import AIJob
+
+    claimed = AIJob.objects.filter(pk=job_id, status='queued').update(
+        status='running', started_at=timezone.now(), progress=5, message='Started'
+    )
+    if not claimed:
+        return None
+    job = AIJob.objects.get(pk=job_id)
+    _broadcast(job)
+
+    def report(progress, message):
+        job.progress, job.message = progress, message
+        job.save(update_fields=['progress', 'message'])
+        _broadcast(job)
+
+    try:
+        with ai_cache.bypassed(job.params.get('bypass_cache', False)):
+            job.result = RUNNERS[job.kind](job.params, report)
+        job.status, job.progress, job.message = 'succeeded', 100, 'Done'
+    except AIJobFailed as e:
+        job.status, job.error, job.result, job.message = 'failed', str(e), e.details, 'Failed'
+    except Exception as e:
+        logger.exception(f"AI job {job.id} ({job.kind}) crashed")
+        job.status, job.error, job.message = 'failed', str(e) or e.__class__.__name__, 'Failed'
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'progress', 'message', 'result', 'error', 'finished_at'])
+    _broadcast(job)
+    return job.status
+
+
+def fail_stale_jobs(older_than, keep_for):
+    """Mark jobs stuck queued/running for longer than `older_than` as failed
+    (worker died mid-generation) and delete finished jobs older than
+    `keep_for`. Returns (failed, deleted)."""
+    from .models import AIJob
+
+    now = timezone.now()
+    stale = list(AIJob.objects.filter(status__in=('queued', 'running'), created_at__lt=now - older_than))
+    for job in stale:
+        job.status, job.error, job.message, job.finished_at = 'failed', 'Timed out', 'Failed', now
+    AIJob.objects.bulk_update(stale, ['status', 'error', 'message', 'finished_at'])
+    for job in stale:
+        _broadcast(job)
+
+    deleted, _ = AIJob.objects.filter(
+        status__in=('succeeded', 'failed'), created_at__lt=now - keep_for
+    ).delete()
+    return len(stale), deleted
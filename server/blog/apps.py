@@ -5,3 +5,7 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Blog'
+
+    def ready(self):
+        # Import signals to register them
+        import blog.signals  # noqa
@@ -0,0 +1,50 @@
+import logging
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from . import ai_jobs
+
+logger = logging.getLogger(__name__)
+
+
+class AIJobConsumer(AsyncJsonWebsocketConsumer):
+    """WebSocket stream of the connected staff user's AI job updates (see
+    blog/ai_jobs.py)."""
+
+    async def connect(self):
+        self.user = self.scope.get('user')
+
+        if not self.user or self.user.is_anonymous or not self.user.is_staff:
+            logger.warning("AI job WebSocket rejected: no authenticated staff user")
+            await self.close(code=4001)
+            return
+
+        self.group_name = ai_jobs.group_name(self.user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+        # Replay what happened while the socket was down (or not yet up).
+        await self.send_json({
+            'type': 'ai_jobs_snapshot',
+            'jobs': await self.get_replay_jobs()
+        })
+
+    async def disconnect(self, close_code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content):
+        if content.get('type') == 'ping':
+            await self.send_json({'type': 'pong'})
+
+    async def ai_job_update(self, event):
+        """Handle a job state change from the channel layer."""
+        await self.send_json({
+            'type': 'ai_job_update',
+            'job': event['job']
+        })
+
+    @database_sync_to_async
+    def get_replay_jobs(self):
+        return ai_jobs.replay_jobs(self.user.id)
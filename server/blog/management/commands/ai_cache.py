@@ -0,0 +1,52 @@
+"""
+Inspect and maintain the AI generation cache (blog/services/ai_cache.py).
+
+--stats prints entries, size, hits and misses per operation; --prune runs
+the same cleanup as the nightly prune_ai_cache beat task; --clear empties
+the cache (optionally only one --operation), e.g. after a prompt template
+change that should not keep serving old answers.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import AICacheEntry
+from blog.services import ai_cache
+
+
+class Command(BaseCommand):
+    help = 'Show statistics for, prune, or clear the AI generation cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stats', action='store_true', help='Print per-operation statistics (default).')
+        parser.add_argument('--prune', action='store_true', help='Drop expired and over-budget entries.')
+        parser.add_argument('--clear', action='store_true', help='Delete every entry (see --operation).')
+        parser.add_argument('--operation', help='With --clear: only entries for this operation.')
+
+    def handle(self, *args, **options):
+        if options['operation'] and not options['clear']:
+            raise CommandError('--operation only applies to --clear.')
+
+        if options['clear']:
+            entries = AICacheEntry.objects.all()
+            if options['operation']:
+                entries = entries.filter(operation=options['operation'])
+            deleted, _ = entries.delete()
+            self.stdout.write(self.style.SUCCESS(f'Cleared {deleted} entr{"y" if deleted == 1 else "ies"}.'))
+        if options['prune']:
+            deleted = ai_cache.prune()
+            self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} entr{"y" if deleted == 1 else "ies"}.'))
+        if options['stats'] or not (options['clear'] or options['prune']):
+            self._stats()
+
+    def _stats(self):
+        stats = ai_cache.stats()
+        if not stats:
+            self.stdout.write('AI cache is empty.')
+            return
+        self.stdout.write(f'{"operation":<16} {"entries":>8} {"KiB":>9} {"hits":>8} {"misses":>8} {"hit rate":>9}')
+        for operation, row in stats.items():
+            calls = row['hits'] + row['misses']
+            rate = f"{row['hits'] / calls:.0%}" if calls else '-'
+            self.stdout.write(
+                f"{operation:<16} {row['entries']:>8} {row['bytes'] / 1024:>9.1f} "
+                f"{row['hits']:>8} {row['misses']:>8} {rate:>9}"
+            )
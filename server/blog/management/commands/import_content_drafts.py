@@ -16,7 +16,12 @@ land as status='scheduled' (see the blog calendar / publish_scheduled_posts).
 
 Media plan candidates (AI-generate, gallery) are pre-fetched automatically
 at import time for every unresolved image placeholder, so they're sitting
-ready the moment a human opens the post in the admin. There is no automated
+ready the moment a human opens the post in the admin. All drafts are parsed
+first and every placeholder's candidates fetched in one concurrent batch
+(--workers; per-provider rate limits live in media_plan_service), with a
+progress line per placeholder. An unresolved placeholder whose prompt is
+unchanged and already has candidates keeps them rather than being fetched
+again. There is no automated
 web-image search -- "web" candidates only ever come from the
 add_web_image_candidate management command, run after a real web image has
 actually been found and vetted (by an agent/session with real web access,
@@ -27,10 +32,14 @@ pipeline via the optional **Featured Image (JSON):** block -- see
 featured_image_plan on BlogPost and resolve_featured_image on the API side.
 Internal link suggestions are computed once, only when a post has none yet
 -- re-run via the refresh_internal_link_suggestions admin action to pick up
-new matches later.
+new matches later, or via the refresh_link_suggestions command to redo a
+whole imported calendar in one pass. AI prompt enhancement is memoized
+(services/ai_cache.py), so re-runs don't pay for the same prompts again;
+--refresh-ai-cache forces fresh ones.
 """
 import json
 import re
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -41,7 +50,10 @@ from django.utils import timezone
 from django.utils.text import slugify
 
 from blog.models import BlogCategory, BlogPost, RELATED_SERVICE_PAGE_LABELS
-from blog.services import fetch_candidates_for_placeholder, suggest_internal_links, insert_link_markers
+from blog.services import (
+    ai_cache, fetch_candidates_for_placeholder, fetch_candidates_for_placeholders,
+    suggest_internal_links, insert_link_markers,
+)
 
 
 BULLET_RE = re.compile(r'^\*\s+\*\*(.+?):\*\*\s*(.*)$', re.MULTILINE)
@@ -236,12 +248,45 @@ def parse_draft(text):
     }
 
 
-def _merge_media_plan(existing_entries, parsed_entries, stdout):
+def _reusable_candidates(existing_entry, prompt):
+    """Candidates an earlier import already fetched for this placeholder, if
+    its prompt is unchanged -- reused (along with any web candidates added
+    since) rather than fetched again. None if there's nothing to reuse."""
+    if not existing_entry or existing_entry.get('prompt') != prompt:
+        return None
+    candidates = existing_entry.get('candidates') or {}
+    return candidates if any(candidates.values()) else None
+
+
+def _prompts_needing_candidates(existing_post, parsed):
+    """Prompts of the parsed draft's unresolved image placeholders (media
+    plan and featured image) that have no candidates to reuse yet."""
+    existing_media = {item.get('id'): item for item in (existing_post.media_plan if existing_post else [])}
+    prompts = []
+    for entry in parsed['media_plan_raw']:
+        existing_entry = existing_media.get(entry['id'])
+        if entry['type'] != 'image':
+            continue
+        if existing_entry and existing_entry.get('status') in ('resolved', 'skipped'):
+            continue
+        if _reusable_candidates(existing_entry, entry['prompt']) is None:
+            prompts.append(entry['prompt'])
+
+    featured = parsed['featured_image_raw']
+    existing_plan = existing_post.featured_image_plan if existing_post else {}
+    if featured and (existing_plan or {}).get('status') not in ('resolved', 'skipped'):
+        if _reusable_candidates(existing_plan, featured['prompt']) is None:
+            prompts.append(featured['prompt'])
+    return prompts
+
+
+def _merge_media_plan(existing_entries, parsed_entries, fetched):
     """Merge freshly-parsed Media Plan entries with whatever's already on
     the post (matched by id). Already-resolved/skipped entries are preserved
     completely untouched (never re-fetch candidates for a decision that's
-    already been made); new or still-unresolved entries get fresh candidates
-    fetched from every image source right now."""
+    already been made); new or still-unresolved entries get the candidates
+    prefetched into `fetched` ({prompt: candidates}), or keep the ones
+    already on the post if their prompt hasn't changed."""
     existing_by_id = {item.get('id'): item for item in (existing_entries or [])}
     merged = []
     for entry in parsed_entries:
@@ -261,13 +306,16 @@ def _merge_media_plan(existing_entries, parsed_entries, stdout):
         }
         if entry['type'] == 'image':
             new_entry['alt_text'] = entry.get('alt_text', '')
-            stdout.write(f'    fetching candidates for media #{entry["id"]}: "{entry["prompt"][:60]}"...')
-            new_entry['candidates'] = fetch_candidates_for_placeholder(entry['prompt'])
+            new_entry['candidates'] = (
+                _reusable_candidates(existing_entry, entry['prompt'])
+                or fetched.get(entry['prompt'])
+                or fetch_candidates_for_placeholder(entry['prompt'])
+            )
         merged.append(new_entry)
     return merged
 
 
-def _merge_featured_image_plan(existing_plan, parsed_entry, stdout):
+def _merge_featured_image_plan(existing_plan, parsed_entry, fetched):
     """Same resolved/skipped-preservation rule as _merge_media_plan, but for
     the single featured_image_plan slot: never re-fetch candidates for a
     decision that's already been made, and leave an absent Featured Image
@@ -277,12 +325,15 @@ def _merge_featured_image_plan(existing_plan, parsed_entry, stdout):
     if existing_plan and existing_plan.get('status') in ('resolved', 'skipped'):
         return existing_plan
 
-    stdout.write(f'    fetching candidates for featured image: "{parsed_entry["prompt"][:60]}"...')
     return {
         'prompt': parsed_entry['prompt'],
         'status': 'unresolved',
         'resolved_source': None,
-        'candidates': fetch_candidates_for_placeholder(parsed_entry['prompt']),
+        'candidates': (
+            _reusable_candidates(existing_plan, parsed_entry['prompt'])
+            or fetched.get(parsed_entry['prompt'])
+            or fetch_candidates_for_placeholder(parsed_entry['prompt'])
+        ),
     }
 
 
@@ -301,6 +352,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Parse, validate, and attempt every write, then roll everything back — nothing is persisted.',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Placeholders to fetch candidates for at once (default: settings.MEDIA_PREFETCH_WORKERS).',
+        )
+        parser.add_argument(
+            '--refresh-ai-cache',
+            action='store_true',
+            help='Call the AI provider again for every prompt instead of reusing cached results.',
+        )
 
     def handle(self, *args, **options):
         if options['dir']:
@@ -319,12 +381,32 @@ class Command(BaseCommand):
         counts = {'created': 0, 'updated': 0, 'skipped_published': 0, 'skipped_error': 0, 'scheduled': 0}
         category_warnings = []
 
+        # Parse everything first, so every placeholder's candidates can be
+        # fetched in one concurrent batch before any post is written.
+        drafts = []
         for path in paths:
             try:
-                with transaction.atomic():
-                    text = path.read_text(encoding='utf-8')
-                    parsed = parse_draft(text)
+                drafts.append((path, parse_draft(path.read_text(encoding='utf-8'))))
+            except (DraftParseError, ValueError) as e:
+                self.stderr.write(self.style.ERROR(f'  {path.name}: {e}'))
+                counts['skipped_error'] += 1
+
+        existing_posts = BlogPost.objects.in_bulk([parsed['slug'] for _, parsed in drafts], field_name='slug')
+        prompts = []
+        for _, parsed in drafts:
+            existing = existing_posts.get(parsed['slug'])
+            if existing and existing.status in ('published', 'scheduled'):
+                continue
+            prompts += _prompts_needing_candidates(existing, parsed)
+
+        # --refresh-ai-cache: regenerate enhanced image prompts instead of
+        # reusing the ones cached by an earlier run (see services/ai_cache.py).
+        with ai_cache.bypassed(options['refresh_ai_cache']):
+            fetched = self._prefetch(prompts, options['workers'])
 
+        for path, parsed in drafts:
+            try:
+                with transaction.atomic():
                     existing = BlogPost.objects.filter(slug=parsed['slug']).first()
                     if existing and existing.status in ('published', 'scheduled'):
                         self.stdout.write(self.style.WARNING(
@@ -373,10 +455,10 @@ class Command(BaseCommand):
                         post.status = 'draft'
 
                     post.media_plan = _merge_media_plan(
-                        existing.media_plan if existing else [], parsed['media_plan_raw'], self.stdout
+                        existing.media_plan if existing else [], parsed['media_plan_raw'], fetched
                     )
                     post.featured_image_plan = _merge_featured_image_plan(
-                        existing.featured_image_plan if existing else {}, parsed['featured_image_raw'], self.stdout
+                        existing.featured_image_plan if existing else {}, parsed['featured_image_raw'], fetched
                     )
                     if parsed['featured_image_raw'] and not post.featured_image_alt:
                         alt_text = parsed['featured_image_raw'].get('alt_text', '').strip()
@@ -427,3 +509,21 @@ class Command(BaseCommand):
             f'{counts["skipped_published"]} skipped (already published/scheduled), '
             f'{counts["skipped_error"]} skipped (errors).'
         ))
+
+    def _prefetch(self, prompts, workers):
+        """Fetch candidates for every prompt concurrently, printing progress.
+        Returns {prompt: candidates}."""
+        unique = list(dict.fromkeys(prompts))
+        if not unique:
+            return {}
+        self.stdout.write(f'Fetching candidates for {len(unique)} placeholder(s)...')
+        started = time.perf_counter()
+
+        def _progress(done, total, prompt, candidates):
+            found = ', '.join(f'{len(items)} {source}' for source, items in candidates.items() if items) or 'nothing'
+            self.stdout.write(f'  [{done}/{total}] "{prompt[:60]}": {found}')
+
+        fetched = fetch_candidates_for_placeholders(unique, workers=workers, on_done=_progress)
+        self.stdout.write(f'Fetched in {time.perf_counter() - started:.1f}s')
+        self.stdout.write('')
+        return fetched
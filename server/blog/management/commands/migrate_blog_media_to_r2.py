@@ -16,15 +16,20 @@ resolved media_plan entry's URL is also embedded in content's <img src>) --
 migrated_cache ensures it's only ever uploaded once per run, so every
 reference ends up pointing at the exact same new key/URL instead of two
 different (but identical) copies.
+
+Runs in two passes over the posts: the first only collects every local key
+referenced, which config/media_migration.py then uploads concurrently
+(resumable, skipping objects already in the bucket); the second rewrites
+the references and writes them in batched transactions.
 """
-import os
 import re
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
-from blog.models import BlogPost
-from blog.storage import save_media_bytes, blog_media_url
+from blog.models import BlogPost, DERIVED_FROM
+from blog.storage import blog_media_storage, blog_media_url
+from config.media_migration import MediaMigration
 
 IMG_SRC_RE = re.compile(r'<img\s+[^>]*?src="([^"]+)"')
 
@@ -46,7 +51,7 @@ def local_key_from_url(url, media_url_prefix):
 class Command(BaseCommand):
     help = (
         'Upload blog media files still on local disk to blog_media_storage '
-        '(R2) and rewrite every reference to them. Use --dry-run first.'
+        '(R2) and rewrite every reference to them. Resumable; use --dry-run first.'
     )
 
     def add_arguments(self, parser):
@@ -54,137 +59,152 @@ class Command(BaseCommand):
             '--dry-run', action='store_true',
             help="Print what would change; don't save or upload anything.",
         )
+        parser.add_argument('--workers', type=int, help='Concurrent uploads (default MEDIA_MIGRATION_WORKERS).')
+        parser.add_argument(
+            '--checkpoint', default='migrate_blog_media_to_r2.checkpoint.json',
+            help='Progress file used to resume an interrupted run.',
+        )
+        parser.add_argument('--reset', action='store_true', help='Ignore and overwrite an existing checkpoint.')
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
-        media_url = settings.MEDIA_URL
-        cache = {}  # local key -> (new_key, new_url); populated on first real upload
-        stats = {'files_uploaded': 0, 'files_missing_locally': 0, 'posts_touched': 0}
+        migration = MediaMigration(
+            blog_media_storage, options['checkpoint'], self.stdout,
+            workers=options['workers'], dry_run=dry_run, reset=options['reset'],
+        )
+
+        # Pass 1: every local key any post references.
+        referenced = []
+
+        def collect(key):
+            referenced.append(key)
+            return None
+
+        for post in BlogPost.objects.all().order_by('id'):
+            self._rewrite_post(post, collect, dry_run)
+        migrated = migration.upload(referenced)
 
         def migrate(key):
-            """Ensure `key` is uploaded (real run) or confirmed present
-            locally (dry run). Returns (new_key, new_url), with new_url
-            None in dry-run mode (nothing was actually uploaded yet, so
-            there's no real URL to report) -- or None entirely if there's
-            no local file at that key to migrate."""
-            if key in cache:
-                return cache[key]
-            local_path = os.path.join(settings.MEDIA_ROOT, key)
-            if not os.path.isfile(local_path):
-                stats['files_missing_locally'] += 1
+            """(new_key, new_url) for an uploaded `key` -- new_url None in
+            dry-run mode (nothing was actually uploaded yet, so there's no
+            real URL to report) -- or None if there was no local file at
+            that key to migrate (or its upload failed)."""
+            if key not in migrated:
                 return None
             if dry_run:
-                cache[key] = (key, None)
-                stats['files_uploaded'] += 1
-                return cache[key]
-            with open(local_path, 'rb') as f:
-                data = f.read()
-            new_key = save_media_bytes(key, data)
-            new_url = blog_media_url(new_key)
-            cache[key] = (new_key, new_url)
-            stats['files_uploaded'] += 1
-            return cache[key]
+                return key, None
+            return migrated[key], blog_media_url(migrated[key])
 
+        # Pass 2: rewrite references to the uploaded keys.
+        posts_touched = 0
+        updates = []
         for post in BlogPost.objects.all().order_by('id'):
-            update_fields = []
-            log_lines = []
-
-            # 1. featured_image
-            if post.featured_image and post.featured_image.name:
-                result = migrate(post.featured_image.name)
-                if result:
-                    new_key, _ = result
-                    if new_key != post.featured_image.name:
-                        log_lines.append(f'featured_image: {post.featured_image.name} -> {new_key}')
-                        if not dry_run:
-                            post.featured_image.name = new_key
-                            update_fields.append('featured_image')
-                    else:
-                        log_lines.append(f'featured_image: {new_key} (uploaded, key unchanged)')
-
-            # 2. content <img src="...">
-            content = post.content or ''
-            content_changed = False
-
-            def repl(match):
-                nonlocal content_changed
-                src = match.group(1)
-                key = local_key_from_url(src, media_url)
-                if key is None:
-                    return match.group(0)
-                result = migrate(key)
-                if result is None:
-                    return match.group(0)
-                new_key, new_url = result
-                content_changed = True
-                if dry_run or not new_url:
-                    log_lines.append(f'content <img>: {src} (would migrate)')
-                    return match.group(0)
-                log_lines.append(f'content <img>: {src} -> {new_url}')
-                return match.group(0).replace(src, new_url)
-
-            new_content = IMG_SRC_RE.sub(repl, content) if content else content
-            if content_changed and not dry_run:
-                post.content = new_content
-                update_fields.append('content')
-
-            # 3. media_plan (list of placeholder dicts, each possibly resolved)
-            media_plan = post.media_plan or []
-            media_plan_changed = False
-            for entry in media_plan:
-                key = local_key_from_url(entry.get('resolved_url'), media_url)
-                if key is None:
-                    continue
-                result = migrate(key)
-                if result is None:
-                    continue
-                new_key, new_url = result
-                media_plan_changed = True
-                if not dry_run and new_url:
-                    log_lines.append(f"media_plan#{entry.get('id')}: {entry['resolved_url']} -> {new_url}")
-                    entry['resolved_url'] = new_url
-                else:
-                    log_lines.append(f"media_plan#{entry.get('id')}: {entry.get('resolved_url')} (would migrate)")
-            if media_plan_changed and not dry_run:
-                post.media_plan = media_plan
-                update_fields.append('media_plan')
-
-            # 4. featured_image_plan (single dict, same shape as one media_plan entry)
-            plan = post.featured_image_plan if isinstance(post.featured_image_plan, dict) else {}
-            plan_key = local_key_from_url(plan.get('resolved_url'), media_url)
-            if plan_key is not None:
-                result = migrate(plan_key)
-                if result is not None:
-                    new_key, new_url = result
-                    if not dry_run and new_url:
-                        log_lines.append(f"featured_image_plan: {plan['resolved_url']} -> {new_url}")
-                        plan['resolved_url'] = new_url
-                        post.featured_image_plan = plan
-                        update_fields.append('featured_image_plan')
-                    else:
-                        log_lines.append(f"featured_image_plan: {plan.get('resolved_url')} (would migrate)")
-
+            update_fields, log_lines = self._rewrite_post(post, migrate, dry_run)
             if log_lines:
-                stats['posts_touched'] += 1
+                posts_touched += 1
                 self.stdout.write(f'Post {post.id} ({post.slug}):')
                 for line in log_lines:
                     self.stdout.write(f'  {line}')
 
             if update_fields and not dry_run:
-                # Raw queryset .update(), not post.save() -- BlogPost.save()
-                # unconditionally re-validates related_service_page/media
-                # resolution state on every save while published, which has
-                # nothing to do with these URL rewrites and could abort an
-                # unrelated post's migration over pre-existing legacy data
-                # (see BlogPostViewSet._persist_post for the same reasoning).
-                BlogPost.objects.filter(pk=post.pk).update(
-                    **{f: getattr(post, f) for f in update_fields}
-                )
+                # Raw .update()s (via apply_updates), not post.save() --
+                # BlogPost.save() unconditionally re-validates
+                # related_service_page/media resolution state on every save
+                # while published, which has nothing to do with these URL
+                # rewrites and could abort an unrelated post's migration over
+                # pre-existing legacy data (see BlogPostViewSet._persist_post
+                # for the same reasoning).
+                if DERIVED_FROM & set(update_fields):
+                    update_fields = list(update_fields) + post.refresh_derived_fields()
+                updates.append((post.pk, {f: getattr(post, f) for f in update_fields}))
+        migration.apply_updates(BlogPost, updates)
 
         mode = 'DRY RUN' if dry_run else 'APPLIED'
         self.stdout.write(self.style.SUCCESS(
-            f'{mode}: {stats["posts_touched"]} post(s) touched, '
-            f'{stats["files_uploaded"]} file(s) uploaded, '
-            f'{stats["files_missing_locally"]} reference(s) pointed at a '
-            f'missing local file (left untouched).'
+            f'{mode}: {posts_touched} post(s) touched, {migration.summary()}.'
         ))
+
+    def _rewrite_post(self, post, migrate, dry_run):
+        """Rewrite every local media reference on `post` through
+        `migrate(key)` -> (new_key, new_url) or None. Returns
+        (update_fields, log_lines); `post` is modified in place."""
+        media_url = settings.MEDIA_URL
+        update_fields = []
+        log_lines = []
+
+        # 1. featured_image
+        if post.featured_image and post.featured_image.name:
+            result = migrate(post.featured_image.name)
+            if result:
+                new_key, _ = result
+                if new_key != post.featured_image.name:
+                    log_lines.append(f'featured_image: {post.featured_image.name} -> {new_key}')
+                    if not dry_run:
+                        post.featured_image.name = new_key
+                        update_fields.append('featured_image')
+                else:
+                    log_lines.append(f'featured_image: {new_key} (uploaded, key unchanged)')
+
+        # 2. content <img src="...">
+        content = post.content or ''
+        content_changed = False
+
+        def repl(match):
+            nonlocal content_changed
+            src = match.group(1)
+            key = local_key_from_url(src, media_url)
+            if key is None:
+                return match.group(0)
+            result = migrate(key)
+            if result is None:
+                return match.group(0)
+            new_key, new_url = result
+            content_changed = True
+            if dry_run or not new_url:
+                log_lines.append(f'content <img>: {src} (would migrate)')
+                return match.group(0)
+            log_lines.append(f'content <img>: {src} -> {new_url}')
+            return match.group(0).replace(src, new_url)
+
+        new_content = IMG_SRC_RE.sub(repl, content) if content else content
+        if content_changed and not dry_run:
+            post.content = new_content
+            update_fields.append('content')
+
+        # 3. media_plan (list of placeholder dicts, each possibly resolved)
+        media_plan = post.media_plan or []
+        media_plan_changed = False
+        for entry in media_plan:
+            key = local_key_from_url(entry.get('resolved_url'), media_url)
+            if key is None:
+                continue
+            result = migrate(key)
+            if result is None:
+                continue
+            new_key, new_url = result
+            media_plan_changed = True
+            if not dry_run and new_url:
+                log_lines.append(f"media_plan#{entry.get('id')}: {entry['resolved_url']} -> {new_url}")
+                entry['resolved_url'] = new_url
+            else:
+                log_lines.append(f"media_plan#{entry.get('id')}: {entry.get('resolved_url')} (would migrate)")
+        if media_plan_changed and not dry_run:
+            post.media_plan = media_plan
+            update_fields.append('media_plan')
+
+        # 4. featured_image_plan (single dict, same shape as one media_plan entry)
+        plan = post.featured_image_plan if isinstance(post.featured_image_plan, dict) else {}
+        plan_key = local_key_from_url(plan.get('resolved_url'), media_url)
+        if plan_key is not None:
+            result = migrate(plan_key)
+            if result is not None:
+                new_key, new_url = result
+                if not dry_run and new_url:
+                    log_lines.append(f"featured_image_plan: {plan['resolved_url']} -> {new_url}")
+                    plan['resolved_url'] = new_url
+                    post.featured_image_plan = plan
+                    update_fields.append('featured_image_plan')
+                else:
+                    log_lines.append(f"featured_image_plan: {plan.get('resolved_url')} (would migrate)")
+
+        return update_fields, log_lines
@@ -0,0 +1,129 @@
+"""
+Recompute internal link suggestions for many posts at once -- after a bulk
+import_content_drafts run, or after retuning STOPWORDS/weights in
+blog/services/link_matching_service.py.
+
+Does for every selected post what the refresh_internal_link_suggestions
+admin action does for one: still-'suggested' entries and their markers are
+replaced, accepted/rejected ones are left alone, and a published post with
+unpublished changes gets its new markers in pending_snapshot rather than the
+live content. Scoring goes through suggest_internal_links_for_all (one pass
+over the stored term index for the whole batch) and all posts are written in
+a single transaction.
+
+--benchmark scores the same posts both ways -- batch and one
+suggest_internal_links() call per post -- reports timings and whether the
+results agree, and writes nothing.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import BlogPost, DERIVED_FIELDS
+from blog.services import suggest_internal_links, suggest_internal_links_for_all, replace_suggested_links
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute internal link suggestions for all (or the selected) posts in one pass. '
+        'Use --dry-run first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--slug', action='append', help='Only this post (repeatable).')
+        parser.add_argument(
+            '--status', action='append', choices=[s for s, _ in BlogPost.STATUS_CHOICES],
+            help='Only posts with this status (repeatable). Default: all.',
+        )
+        parser.add_argument(
+            '--only-missing', action='store_true',
+            help='Only posts with no link suggestions yet (same rule as import_content_drafts).',
+        )
+        parser.add_argument('--limit', type=int, default=5, help='Suggestions per post (default 5).')
+        parser.add_argument('--min-score', type=float, default=0.05, help='Minimum score (default 0.05).')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Print the suggestions that would be written; don't save anything.",
+        )
+        parser.add_argument(
+            '--benchmark', action='store_true',
+            help='Time batch vs per-post scoring for the selected posts and compare results; writes nothing.',
+        )
+
+    def handle(self, *args, **options):
+        posts = BlogPost.objects.prefetch_related('categories')
+        if options['slug']:
+            posts = posts.filter(slug__in=options['slug'])
+        if options['status']:
+            posts = posts.filter(status__in=options['status'])
+        posts = list(posts)
+        if options['only_missing']:
+            posts = [post for post in posts if not post.suggested_links]
+        if not posts:
+            self.stdout.write(self.style.SUCCESS('No posts selected.'))
+            return
+
+        if options['benchmark']:
+            self._benchmark(posts, options)
+            return
+
+        started = time.perf_counter()
+        results = suggest_internal_links_for_all(posts, limit=options['limit'], min_score=options['min_score'])
+        self.stdout.write(f'Scored {len(posts)} post(s) in {time.perf_counter() - started:.2f}s')
+
+        if options['dry_run']:
+            for post in posts:
+                targets = ', '.join(f"{s['target_slug']} ({s['score']})" for s in results[post.pk]) or '-'
+                self.stdout.write(f'  {post.slug}: {targets}')
+            self.stdout.write(self.style.SUCCESS(f'DRY RUN: {len(posts)} post(s) would be updated.'))
+            return
+
+        for post in posts:
+            # Same target as BlogPostViewSet._effective_content/_save_effective_content.
+            if post.pending_snapshot is not None:
+                snapshot = dict(post.pending_snapshot)
+                snapshot['content'], post.suggested_links = replace_suggested_links(
+                    snapshot.get('content', post.content or ''), post.suggested_links, results[post.pk]
+                )
+                post.pending_snapshot = snapshot
+            else:
+                post.content, post.suggested_links = replace_suggested_links(
+                    post.content or '', post.suggested_links, results[post.pk]
+                )
+
+            post.refresh_derived_fields()
+
+        # bulk_update, not save(): same reasoning as BlogPostViewSet._persist_post.
+        # Link markers are tags, so the term and search indexes don't change.
+        with transaction.atomic():
+            BlogPost.objects.bulk_update(
+                posts, ['content', 'pending_snapshot', 'suggested_links'] + DERIVED_FIELDS, batch_size=200
+            )
+
+        total = sum(len(results[post.pk]) for post in posts)
+        self.stdout.write(self.style.SUCCESS(f'APPLIED: {total} suggestion(s) written across {len(posts)} post(s).'))
+
+    def _benchmark(self, posts, options):
+        limit, min_score = options['limit'], options['min_score']
+        # Warm the index first so neither timing includes indexing.
+        suggest_internal_links_for_all(posts[:1], limit=limit, min_score=min_score)
+
+        started = time.perf_counter()
+        batch = suggest_internal_links_for_all(posts, limit=limit, min_score=min_score)
+        batch_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        per_post = {post.pk: suggest_internal_links(post, limit=limit, min_score=min_score) for post in posts}
+        per_post_seconds = time.perf_counter() - started
+
+        differing = [post.slug for post in posts if batch[post.pk] != per_post[post.pk]]
+        speedup = per_post_seconds / batch_seconds if batch_seconds else 0
+        self.stdout.write(f'batch:    {batch_seconds:.3f}s for {len(posts)} post(s)')
+        self.stdout.write(f'per-post: {per_post_seconds:.3f}s ({speedup:.1f}x slower)')
+        if differing:
+            self.stdout.write(self.style.WARNING(
+                f'{len(differing)} post(s) differ between the two paths: {", ".join(differing[:10])}'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Results identical for all {len(posts)} post(s).'))
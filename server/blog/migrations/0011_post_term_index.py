@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_alter_blogpost_featured_image_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostTermVector',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='term_vector', serialize=False, to='blog.blogpost')),
+                ('norm', models.FloatField()),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Post Term Vector',
+                'verbose_name_plural': 'Post Term Vectors',
+            },
+        ),
+        migrations.CreateModel(
+            name='PostTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(db_index=True, max_length=255)),
+                ('weight', models.FloatField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='blog.blogpost')),
+            ],
+            options={
+                'verbose_name': 'Post Term',
+                'verbose_name_plural': 'Post Terms',
+                'constraints': [models.UniqueConstraint(fields=('post', 'term'), name='blog_postterm_unique_post_term')],
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+import html
+import re
+
+from django.db import migrations
+
+# Frozen copies of blog/search.py's schema and index_post() as of this
+# migration, so later changes there can't change what it does.
+TABLE = 'blog_post_search'
+TAG_RE = re.compile(r'<[^>]+>')
+
+SQLITE_SCHEMA = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} "
+    f"USING fts5(title, excerpt, body, tokenize='porter unicode61 remove_diacritics 2')",
+]
+POSTGRES_SCHEMA = [
+    f"""CREATE TABLE IF NOT EXISTS {TABLE} (
+        post_id bigint PRIMARY KEY REFERENCES blog_blogpost (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        body text NOT NULL,
+        document tsvector NOT NULL
+    )""",
+    f"CREATE INDEX IF NOT EXISTS {TABLE}_document_idx ON {TABLE} USING GIN (document)",
+]
+
+
+def html_to_text(value):
+    return ' '.join(html.unescape(TAG_RE.sub(' ', value or '')).split())
+
+
+def create_search_index(apps, schema_editor):
+    """Create the engine-specific search table (see blog/search.py) and
+    index every existing post."""
+    connection = schema_editor.connection
+    statements = {'sqlite': SQLITE_SCHEMA, 'postgresql': POSTGRES_SCHEMA}.get(connection.vendor)
+    if not statements:
+        return
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+        for post in BlogPost.objects.using(connection.alias).only('title', 'excerpt', 'content').iterator():
+            title, excerpt, body = html_to_text(post.title), html_to_text(post.excerpt), html_to_text(post.content)
+            if connection.vendor == 'sqlite':
+                cursor.execute(
+                    f'INSERT INTO {TABLE} (rowid, title, excerpt, body) VALUES (%s, %s, %s, %s)',
+                    [post.pk, title, excerpt, body],
+                )
+            else:
+                cursor.execute(
+                    f"""INSERT INTO {TABLE} (post_id, body, document) VALUES (
+                        %s, %s,
+                        setweight(to_tsvector('english', %s), 'A')
+                        || setweight(to_tsvector('english', %s), 'B')
+                        || setweight(to_tsvector('english', %s), 'D')
+                    )
+                    ON CONFLICT (post_id) DO UPDATE SET body = EXCLUDED.body, document = EXCLUDED.document""",
+                    [post.pk, body, title, excerpt, body],
+                )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+class Migration(migrations.Migration):
+    """No model change -- the search table lives outside the ORM because
+    its shape differs per database engine (FTS5 virtual table on SQLite,
+    tsvector + GIN index on Postgres)."""
+
+    dependencies = [
+        ('blog', '0011_post_term_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,111 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:53
+
+import html
+import re
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+# A frozen copy of blog.models.derive_content_fields() as of this
+# migration, so later changes to it can't change what this backfill does.
+MEDIA_MARKER_RE = re.compile(r'data-media-marker="(\d+)"')
+LINK_MARKER_RE = re.compile(r'data-link-marker="(\d+)"')
+TAG_RE = re.compile(r'<[^>]+>')
+HEADING_RE = re.compile(r'<h([2-4])\b[^>]*>(.*?)</h\1>', re.IGNORECASE | re.DOTALL)
+WORDS_PER_MINUTE = 200
+TEXT_EXCERPT_LENGTH = 300
+
+DERIVED_FIELDS = [
+    'word_count', 'reading_time', 'text_excerpt', 'outline',
+    'unresolved_media_ids', 'unresolved_link_ids', 'has_unresolved_media',
+]
+
+
+def html_to_text(value):
+    return ' '.join(html.unescape(TAG_RE.sub(' ', value or '')).split())
+
+
+def derive_content_fields(content, media_plan, suggested_links):
+    text = html_to_text(content)
+    word_count = len(text.split())
+    if len(text) > TEXT_EXCERPT_LENGTH:
+        text = text[:TEXT_EXCERPT_LENGTH].rsplit(' ', 1)[0] + '…'
+    outline = []
+    for level, inner in HEADING_RE.findall(content or ''):
+        heading = html_to_text(inner)
+        if heading:
+            outline.append({'level': int(level), 'text': heading, 'anchor': slugify(heading)})
+    media_by_id = {str(item.get('id')): item for item in (media_plan or [])}
+    link_by_id = {str(item.get('id')): item for item in (suggested_links or [])}
+    unresolved_media = sorted({
+        marker_id for marker_id in MEDIA_MARKER_RE.findall(content or '')
+        if media_by_id.get(marker_id, {}).get('status') not in ('resolved', 'skipped')
+    }, key=int)
+    unresolved_links = sorted({
+        marker_id for marker_id in LINK_MARKER_RE.findall(content or '')
+        if link_by_id.get(marker_id, {}).get('status') not in ('accepted', 'rejected')
+    }, key=int)
+    return {
+        'word_count': word_count,
+        'reading_time': max(1, round(word_count / WORDS_PER_MINUTE)),
+        'text_excerpt': text,
+        'outline': outline,
+        'unresolved_media_ids': unresolved_media,
+        'unresolved_link_ids': unresolved_links,
+        'has_unresolved_media': bool(unresolved_media or unresolved_links),
+    }
+
+
+def backfill_derived_fields(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    posts = list(BlogPost.objects.only('content', 'media_plan', 'suggested_links'))
+    for post in posts:
+        for name, value in derive_content_fields(post.content, post.media_plan, post.suggested_links).items():
+            setattr(post, name, value)
+    BlogPost.objects.bulk_update(posts, DERIVED_FIELDS, batch_size=200)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='has_unresolved_media',
+            field=models.BooleanField(db_index=True, default=False, editable=False, help_text='Any in-body media/link placeholder still needs resolving -- flags stuck scheduled posts in the admin calendar and holds them back in publish_scheduled_posts.'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='outline',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='h2-h4 headings in body order: [{"level", "text", "anchor"}]'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, help_text='Minutes'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='text_excerpt',
+            field=models.TextField(blank=True, editable=False, help_text='Opening of the body as plain text'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='unresolved_link_ids',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='unresolved_media_ids',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_derived_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_ai_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AICacheEntry',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('operation', models.CharField(db_index=True, max_length=50)),
+                ('model', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready')], default='pending', max_length=10)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('miss_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('last_used_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'AI Cache Entry',
+                'verbose_name_plural': 'AI Cache Entries',
+            },
+        ),
+    ]
@@ -1,5 +1,8 @@
+import html
 import re
+import uuid
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
@@ -47,6 +50,67 @@ RELATED_SERVICE_PAGE_LABELS = {
 MEDIA_MARKER_RE = re.compile(r'data-media-marker="(\d+)"')
 LINK_MARKER_RE = re.compile(r'data-link-marker="(\d+)"')
 
+TAG_RE = re.compile(r'<[^>]+>')
+HEADING_RE = re.compile(r'<h([2-4])\b[^>]*>(.*?)</h\1>', re.IGNORECASE | re.DOTALL)
+
+WORDS_PER_MINUTE = 200
+TEXT_EXCERPT_LENGTH = 300
+
+# Columns derive_content_fields() fills in, and the fields they're derived
+# from. Anything that writes one of the latter without going through
+# BlogPost.save() (QuerySet.update(), bulk_update()) must call
+# refresh_derived_fields() and write DERIVED_FIELDS along with it.
+DERIVED_FIELDS = [
+    'word_count', 'reading_time', 'text_excerpt', 'outline',
+    'unresolved_media_ids', 'unresolved_link_ids', 'has_unresolved_media',
+]
+DERIVED_FROM = {'content', 'media_plan', 'suggested_links'}
+
+
+def html_to_text(value):
+    """Tag-stripped, entity-decoded, whitespace-collapsed text of an HTML string."""
+    return ' '.join(html.unescape(TAG_RE.sub(' ', value or '')).split())
+
+
+def unresolved_marker_ids(content, media_plan, suggested_links):
+    """(media ids, link ids) of in-body placeholders whose media_plan /
+    suggested_links entry isn't resolved yet, as sorted lists of strings."""
+    media_by_id = {str(item.get('id')): item for item in (media_plan or [])}
+    link_by_id = {str(item.get('id')): item for item in (suggested_links or [])}
+
+    unresolved_media = sorted({
+        marker_id for marker_id in MEDIA_MARKER_RE.findall(content or '')
+        if media_by_id.get(marker_id, {}).get('status') not in ('resolved', 'skipped')
+    }, key=int)
+    unresolved_links = sorted({
+        marker_id for marker_id in LINK_MARKER_RE.findall(content or '')
+        if link_by_id.get(marker_id, {}).get('status') not in ('accepted', 'rejected')
+    }, key=int)
+    return unresolved_media, unresolved_links
+
+
+def derive_content_fields(content, media_plan, suggested_links):
+    """Values of every DERIVED_FIELDS column for the given source fields."""
+    text = html_to_text(content)
+    word_count = len(text.split())
+    if len(text) > TEXT_EXCERPT_LENGTH:
+        text = text[:TEXT_EXCERPT_LENGTH].rsplit(' ', 1)[0] + '…'
+    outline = []
+    for level, inner in HEADING_RE.findall(content or ''):
+        heading = html_to_text(inner)
+        if heading:
+            outline.append({'level': int(level), 'text': heading, 'anchor': slugify(heading)})
+    unresolved_media, unresolved_links = unresolved_marker_ids(content, media_plan, suggested_links)
+    return {
+        'word_count': word_count,
+        'reading_time': max(1, round(word_count / WORDS_PER_MINUTE)),
+        'text_excerpt': text,
+        'outline': outline,
+        'unresolved_media_ids': unresolved_media,
+        'unresolved_link_ids': unresolved_links,
+        'has_unresolved_media': bool(unresolved_media or unresolved_links),
+    }
+
 
 class BlogCategory(models.Model):
     """Category for organizing blog posts."""
@@ -80,6 +144,20 @@ class BlogCategory(models.Model):
         return not self.content_types or content_type in self.content_types
 
 
+class BlogPostQuerySet(models.QuerySet):
+    # Large HTML/JSON fields only the editor and detail views need.
+    HEAVY_FIELDS = ('content', 'pending_snapshot', 'media_plan', 'suggested_links', 'featured_image_plan', 'faq_data')
+
+    def summaries(self):
+        """Rows for list/calendar views: the heavy fields are deferred and
+        has_pending_changes is answered by an annotation instead."""
+        return self.defer(*self.HEAVY_FIELDS).annotate(
+            pending_changes_flag=models.ExpressionWrapper(
+                models.Q(pending_snapshot__isnull=False), output_field=models.BooleanField()
+            )
+        )
+
+
 class BlogPost(models.Model):
     """Blog post with SEO features and AI generation support."""
 
@@ -268,6 +346,30 @@ class BlogPost(models.Model):
         help_text='Autosaved unpublished edits for an already-published post; null when there are none.'
     )
 
+    # Derived from content/media_plan/suggested_links on every write (see
+    # derive_content_fields), so list, calendar and scheduler code can read
+    # them without loading or re-parsing the HTML body.
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=1, editable=False, help_text='Minutes')
+    text_excerpt = models.TextField(blank=True, editable=False, help_text='Opening of the body as plain text')
+    outline = models.JSONField(
+        default=list,
+        blank=True,
+        editable=False,
+        help_text='h2-h4 headings in body order: [{"level", "text", "anchor"}]'
+    )
+    unresolved_media_ids = models.JSONField(default=list, blank=True, editable=False)
+    unresolved_link_ids = models.JSONField(default=list, blank=True, editable=False)
+    has_unresolved_media = models.BooleanField(
+        default=False,
+        db_index=True,
+        editable=False,
+        help_text='Any in-body media/link placeholder still needs resolving -- flags stuck scheduled '
+                   'posts in the admin calendar and holds them back in publish_scheduled_posts.'
+    )
+
+    objects = BlogPostQuerySet.as_manager()
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
@@ -292,28 +394,17 @@ class BlogPost(models.Model):
             })
 
     def _unresolved_media_and_link_ids(self):
-        """Shared scan used by both the publish-gate validator and the
-        `has_unresolved_media` calendar flag -- never raises, just reports."""
-        media_by_id = {str(item.get('id')): item for item in (self.media_plan or [])}
-        link_by_id = {str(item.get('id')): item for item in (self.suggested_links or [])}
-
-        unresolved_media = sorted({
-            marker_id for marker_id in MEDIA_MARKER_RE.findall(self.content or '')
-            if media_by_id.get(marker_id, {}).get('status') not in ('resolved', 'skipped')
-        }, key=int)
-        unresolved_links = sorted({
-            marker_id for marker_id in LINK_MARKER_RE.findall(self.content or '')
-            if link_by_id.get(marker_id, {}).get('status') not in ('accepted', 'rejected')
-        }, key=int)
-        return unresolved_media, unresolved_links
-
-    @property
-    def has_unresolved_media(self):
-        """True if any in-body media/link placeholder still needs resolving --
-        used to flag stuck scheduled posts in the admin calendar and by
-        publish_scheduled_posts before attempting to auto-publish."""
-        unresolved_media, unresolved_links = self._unresolved_media_and_link_ids()
-        return bool(unresolved_media or unresolved_links)
+        """Live scan of the current field values, used by the publish-gate
+        validator -- never raises, just reports. Readers that only need the
+        saved state use the unresolved_*_ids / has_unresolved_media columns."""
+        return unresolved_marker_ids(self.content, self.media_plan, self.suggested_links)
+
+    def refresh_derived_fields(self):
+        """Recompute the DERIVED_FIELDS columns from the current content,
+        media_plan and suggested_links. Returns DERIVED_FIELDS."""
+        for name, value in derive_content_fields(self.content, self.media_plan, self.suggested_links).items():
+            setattr(self, name, value)
+        return DERIVED_FIELDS
 
     def _validate_media_and_links(self):
         """Block publish while any in-body media/link placeholder is still unresolved.
@@ -377,6 +468,12 @@ class BlogPost(models.Model):
             if update_fields is not None:
                 kwargs['update_fields'] = list(set(update_fields) | {'content', 'related_link_auto_appended'})
 
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or DERIVED_FROM & set(update_fields):
+            self.refresh_derived_fields()
+            if update_fields is not None:
+                kwargs['update_fields'] = list(set(update_fields) | set(DERIVED_FIELDS))
+
         super().save(*args, **kwargs)
 
     @property
@@ -399,10 +496,136 @@ class BlogPost(models.Model):
         """True when there's an autosaved draft snapshot not yet published --
         drives the "unpublished changes" marker in the admin list/calendar
         and the editor header."""
+        if 'pending_changes_flag' in self.__dict__:
+            # BlogPostQuerySet.summaries() row: pending_snapshot is deferred.
+            return self.pending_changes_flag
         return self.pending_snapshot is not None
 
+
+class PostTermVector(models.Model):
+    """Stored term vector of one post for internal-link matching (see
+    services/link_matching_service.py). The vector's entries live in PostTerm,
+    which doubles as the term -> post inverted index; this row holds the
+    vector's norm and a fingerprint used to skip rewrites when a save didn't
+    change the post's tokens."""
+    post = models.OneToOneField(
+        BlogPost,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='term_vector'
+    )
+    norm = models.FloatField()
+    fingerprint = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Post Term Vector'
+        verbose_name_plural = 'Post Term Vectors'
+
+    def __str__(self):
+        return f'Term vector for post {self.post_id}'
+
+
+class PostTerm(models.Model):
+    """One weighted term of a post's term vector."""
+    post = models.ForeignKey(
+        BlogPost,
+        on_delete=models.CASCADE,
+        related_name='terms'
+    )
+    term = models.CharField(max_length=255, db_index=True)
+    weight = models.FloatField()
+
+    class Meta:
+        verbose_name = 'Post Term'
+        verbose_name_plural = 'Post Terms'
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'term'], name='blog_postterm_unique_post_term'),
+        ]
+
+    def __str__(self):
+        return f'{self.term} ({self.weight:.3f})'
+
+
+class AIJob(models.Model):
+    """One background AI generation requested from the editor (see
+    blog/ai_jobs.py). Holds the request, progress and the final result so
+    the editor can pick it up after a reconnect or page reload."""
+
+    KIND_CHOICES = [
+        ('post', 'Full Post'),
+        ('section', 'Section'),
+        ('seo', 'SEO Metadata'),
+        ('enhance_prompt', 'Image Prompt Enhancement'),
+        ('image', 'Image'),
+    ]
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='blog_ai_jobs'
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued', db_index=True)
+    params = models.JSONField(default=dict)
+    progress = models.PositiveSmallIntegerField(default=0)
+    message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'AI Job'
+        verbose_name_plural = 'AI Jobs'
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='blog_aijob_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_kind_display()} job {self.id} ({self.status})'
+
     @property
-    def reading_time(self):
-        """Estimate reading time in minutes."""
-        word_count = len(self.content.split())
-        return max(1, round(word_count / 200))
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed')
+
+
+class AICacheEntry(models.Model):
+    """One memoized AI text-generation result (see
+    services/ai_cache.py), keyed on a hash of the operation, model and
+    normalized prompt. A 'pending' row marks a call in flight, so identical
+    concurrent requests wait for it instead of calling upstream again."""
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+    ]
+
+    key = models.CharField(max_length=64, primary_key=True)
+    operation = models.CharField(max_length=50, db_index=True)
+    model = models.CharField(max_length=100)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    result = models.JSONField(null=True, blank=True)
+    size = models.PositiveIntegerField(default=0)
+    hit_count = models.PositiveIntegerField(default=0)
+    miss_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    last_used_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = 'AI Cache Entry'
+        verbose_name_plural = 'AI Cache Entries'
+
+    def __str__(self):
+        return f'{self.operation} {self.key[:12]} ({self.status})'
@@ -0,0 +1,145 @@
+"""
+Scheduled publishing.
+
+A scheduled post goes live from a Celery task armed with an ETA of its
+scheduled_publish_date, so it publishes on time rather than on the next beat
+tick. ETAs are only armed for posts due within SCHEDULE_HORIZON: with the
+Redis broker a message whose ETA lies beyond the visibility timeout gets
+redelivered over and over, so posts scheduled further out are armed later by
+the beat sweep (tasks.publish_scheduled_posts), which also publishes
+anything an ETA missed.
+
+Arming is idempotent and stale ETAs are harmless: the task publishes a post
+only if it is still scheduled for no later than the time it was armed for,
+and publish_due_posts() claims rows with SELECT ... FOR UPDATE SKIP LOCKED,
+so a reschedule or a duplicate arm can never publish a post twice or early.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+# Must exceed the beat sweep interval, so every post gets armed before it's due.
+SCHEDULE_HORIZON = timedelta(minutes=10)
+
+
+def arm(post):
+    """Arm the publish ETA for a scheduled post that's due within the horizon
+    (once the current transaction commits)."""
+    from .tasks import publish_scheduled_post
+
+    if post.status != 'scheduled' or not post.scheduled_publish_date:
+        return
+    if post.scheduled_publish_date > timezone.now() + SCHEDULE_HORIZON:
+        return
+    post_id, eta = post.pk, post.scheduled_publish_date
+    transaction.on_commit(
+        lambda: publish_scheduled_post.apply_async((post_id, eta.isoformat()), eta=eta)
+    )
+
+
+def arm_upcoming():
+    """Arm ETAs for every scheduled post entering the horizon. Returns the count."""
+    from .models import BlogPost
+
+    upcoming = BlogPost.objects.filter(
+        status='scheduled',
+        scheduled_publish_date__gt=timezone.now(),
+        scheduled_publish_date__lte=timezone.now() + SCHEDULE_HORIZON,
+    ).only('status', 'scheduled_publish_date')
+    count = 0
+    for post in upcoming:
+        arm(post)
+        count += 1
+    return count
+
+
+def publish_due_posts(due_by=None, post_ids=None):
+    """
+    Publish every scheduled post whose scheduled_publish_date is at or before
+    `due_by` (default: now), optionally limited to `post_ids`.
+
+    Complete posts are flipped in one batched UPDATE; posts that need the
+    Related Service Page CTA appended on going live (see BlogPost.save) are
+    written together in one bulk_update with their new content. Posts that
+    couldn't pass BlogPost's publish validation -- unresolved placeholders,
+    or a Blog post without a Related Service Page -- stay scheduled.
+
+    Returns (published ids, [(id, title, reason)] skipped).
+    """
+    from . import search
+    from .models import BlogPost, DERIVED_FIELDS
+    from .services.link_matching_service import index_post
+
+    due = BlogPost.objects.filter(status='scheduled', scheduled_publish_date__lte=due_by or timezone.now())
+    if post_ids is not None:
+        due = due.filter(pk__in=post_ids)
+
+    published, skipped, with_cta = [], [], []
+    with transaction.atomic():
+        for post in due.select_for_update(skip_locked=True):
+            if post.has_unresolved_media:
+                skipped.append((post.pk, post.title, 'unresolved media/link placeholders'))
+                continue
+            if post.content_type == 'blog' and not post.related_service_page:
+                skipped.append((post.pk, post.title, 'no Related Service Page'))
+                continue
+            if post.related_service_page and not post._content_links_to(post.related_service_page):
+                post._append_cta_link(post.related_service_page)
+                post.refresh_derived_fields()
+                post.status = 'published'
+                post.publish_date = post.scheduled_publish_date
+                with_cta.append(post)
+            published.append(post.pk)
+
+        plain = set(published) - {post.pk for post in with_cta}
+        if plain:
+            BlogPost.objects.filter(pk__in=plain).update(
+                status='published', publish_date=F('scheduled_publish_date')
+            )
+        if with_cta:
+            BlogPost.objects.bulk_update(
+                with_cta,
+                ['status', 'publish_date', 'content', 'related_link_auto_appended'] + DERIVED_FIELDS,
+            )
+            # bulk_update sends no post_save; the CTA text changes the indexed body.
+            for post in with_cta:
+                index_post(post)
+                search.index_post(post)
+
+    if published:
+        transaction.on_commit(lambda: _warm_after_publish(published))
+    return published, skipped
+
+
+def _warm_after_publish(post_ids):
+    from .tasks import warm_blog_caches
+
+    delay = getattr(settings, 'BLOG_CACHE_WARM_DELAY', 61)
+    if getattr(settings, 'BLOG_CACHE_WARM_BASE_URL', ''):
+        warm_blog_caches.apply_async((post_ids,), countdown=delay)
+
+
+def warm_urls(post_ids):
+    """Public pages whose cached render changes when `post_ids` go live: each
+    post's page, its section index, the pages of the posts it now shows up
+    as related on, and the sitemap."""
+    from .models import BlogPost
+    from .views import CONTENT_TYPE_ROUTE_PREFIX
+
+    base = settings.BLOG_CACHE_WARM_BASE_URL.rstrip('/')
+    paths = {'/sitemap.xml'}
+    posts = BlogPost.objects.filter(pk__in=post_ids).prefetch_related('categories')
+    for post in posts:
+        prefix = CONTENT_TYPE_ROUTE_PREFIX.get(post.content_type, 'blog')
+        paths.add(f'/{prefix}')
+        paths.add(f'/{prefix}/{post.slug}')
+        related = (
+            BlogPost.objects.filter(status='published', categories__in=post.categories.all())
+            .exclude(pk=post.pk).distinct().values_list('content_type', 'slug')[:4]
+        )
+        for content_type, slug in related:
+            paths.add(f"/{CONTENT_TYPE_ROUTE_PREFIX.get(content_type, 'blog')}/{slug}")
+    return [f'{base}{path}' for path in sorted(paths)]
@@ -0,0 +1,183 @@
+"""
+Full-text search over blog posts, for the `search` query param of the blog
+post list (public blog search and the admin content lists alike).
+
+Each post has a search document built from its tag-stripped title, excerpt
+and body, kept in an engine-specific table that isn't a Django model:
+
+- SQLite: an FTS5 virtual table (porter stemmer), ranked with bm25() with
+  title and excerpt weighted above the body.
+- Postgres: a tsvector column (english config) with a GIN index, ranked
+  with ts_rank() over setweight()-ed title (A), excerpt (B) and body (D).
+
+Either way matching is stemmed, every search word must match (the last one
+typed may be a prefix), results come back annotated with `search_rank` and
+a highlighted `search_snippet` of the body, and the settings module can
+switch engines via DATABASE_URL without anything else changing.
+
+Documents are written by index_post(), called from blog/signals.py on save
+and from BlogPostViewSet._persist_post for .update() writes; migration 0012
+creates the tables and indexes existing posts.
+"""
+import html
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+from .models import html_to_text
+
+TABLE = 'blog_post_search'
+
+WORD_RE = re.compile(r'\w+')
+
+# Highlight delimiters handed to snippet()/ts_headline(): private-use code
+# points that can't occur in post text, so the snippet can be HTML-escaped
+# first and the delimiters swapped for <mark> afterwards.
+HIGHLIGHT_START = '\ue000'
+HIGHLIGHT_END = '\ue001'
+
+# bm25() column weights: title, excerpt, body.
+FTS5_WEIGHTS = (10.0, 4.0, 1.0)
+
+SQLITE_SCHEMA = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} "
+    f"USING fts5(title, excerpt, body, tokenize='porter unicode61 remove_diacritics 2')",
+]
+POSTGRES_SCHEMA = [
+    f"""CREATE TABLE IF NOT EXISTS {TABLE} (
+        post_id bigint PRIMARY KEY REFERENCES blog_blogpost (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        body text NOT NULL,
+        document tsvector NOT NULL
+    )""",
+    f"CREATE INDEX IF NOT EXISTS {TABLE}_document_idx ON {TABLE} USING GIN (document)",
+]
+
+
+def create_schema(connection):
+    statements = {'sqlite': SQLITE_SCHEMA, 'postgresql': POSTGRES_SCHEMA}.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def drop_schema(connection):
+    if connection.vendor in ('sqlite', 'postgresql'):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+def index_post(post, using='default'):
+    """Write (or rewrite) `post`'s search document."""
+    connection = connections[using]
+    title, excerpt, body = html_to_text(post.title), html_to_text(post.excerpt), html_to_text(post.content)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            # FTS5 has no upsert; rowid is the post id.
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [post.pk])
+            cursor.execute(
+                f'INSERT INTO {TABLE} (rowid, title, excerpt, body) VALUES (%s, %s, %s, %s)',
+                [post.pk, title, excerpt, body],
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                f"""INSERT INTO {TABLE} (post_id, body, document) VALUES (
+                    %s, %s,
+                    setweight(to_tsvector('english', %s), 'A')
+                    || setweight(to_tsvector('english', %s), 'B')
+                    || setweight(to_tsvector('english', %s), 'D')
+                )
+                ON CONFLICT (post_id) DO UPDATE SET body = EXCLUDED.body, document = EXCLUDED.document""",
+                [post.pk, body, title, excerpt, body],
+            )
+
+
+def remove_post(post_id, using='default'):
+    """Drop a deleted post's document (Postgres cascades on its own)."""
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [post_id])
+
+
+def _words(text):
+    return WORD_RE.findall(text.lower())
+
+
+def search(queryset, text):
+    """Filter a BlogPost queryset to posts matching `text`, annotated with
+    search_rank (higher is better) and search_snippet. On database engines
+    without a search index, falls back to substring matching."""
+    words = _words(text)
+    if not words:
+        return queryset
+    vendor = connections[queryset.db].vendor
+    # The correlated subqueries below refer to the outer BlogPost row.
+    post_id = f'"{queryset.model._meta.db_table}"."id"'
+
+    if vendor == 'sqlite':
+        match = ' '.join(f'"{word}"' for word in words[:-1]) + f' "{words[-1]}"*'
+        where = f'{TABLE} MATCH %s'
+        weights = ', '.join(str(weight) for weight in FTS5_WEIGHTS)
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {TABLE} WHERE {where}', [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT -bm25({TABLE}, {weights}) FROM {TABLE} WHERE {where} AND rowid = {post_id}', [match]
+            ),
+            search_snippet=RawSQL(
+                f'SELECT snippet({TABLE}, 2, %s, %s, %s, 24) FROM {TABLE} WHERE {where} AND rowid = {post_id}',
+                [HIGHLIGHT_START, HIGHLIGHT_END, '…', match],
+            ),
+        )
+
+    if vendor == 'postgresql':
+        tsquery = ' & '.join(words[:-1] + [f'{words[-1]}:*'])
+        query = "to_tsquery('english', %s)"
+        options = f'StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_END}", MaxWords=30, MinWords=12, MaxFragments=2'
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT post_id FROM {TABLE} WHERE document @@ {query}', [tsquery])
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT ts_rank(document, {query}) FROM {TABLE} WHERE post_id = {post_id}', [tsquery]
+            ),
+            search_snippet=RawSQL(
+                f"SELECT ts_headline('english', body, {query}, %s) FROM {TABLE} WHERE post_id = {post_id}",
+                [tsquery, options],
+            ),
+        )
+
+    condition = Q()
+    for word in words:
+        condition &= Q(title__icontains=word) | Q(excerpt__icontains=word) | Q(content__icontains=word)
+    return queryset.filter(condition)
+
+
+def render_snippet(snippet):
+    """HTML for a search_snippet: escaped text with the matches in <mark>."""
+    if not snippet:
+        return None
+    return (
+        html.escape(snippet)
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_END, '</mark>')
+    )
+
+
+class BlogSearchFilter(BaseFilterBackend):
+    """Drop-in replacement for DRF's SearchFilter on BlogPostViewSet (same
+    `search` param) backed by the full-text index. Results are ordered by
+    relevance unless the request asks for an explicit `ordering`, so this
+    must come after OrderingFilter in filter_backends."""
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        queryset = search(queryset, text)
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get('ordering'):
+            queryset = queryset.order_by('-search_rank', '-publish_date', '-created_at')
+        return queryset
@@ -1,6 +1,7 @@
 from django.conf import settings
 from rest_framework import serializers
-from .models import BlogPost, BlogCategory
+from .models import AIJob, BlogPost, BlogCategory
+from .search import render_snippet
 
 
 class FeaturedImageURLMixin:
@@ -80,6 +81,7 @@ class BlogPostListSerializer(FeaturedImageURLMixin, serializers.ModelSerializer)
     categories = BlogCategoryMinimalSerializer(many=True, read_only=True)
     reading_time = serializers.ReadOnlyField()
     has_pending_changes = serializers.ReadOnlyField()
+    search_snippet = serializers.SerializerMethodField()
 
     class Meta:
         model = BlogPost
@@ -89,9 +91,14 @@ class BlogPostListSerializer(FeaturedImageURLMixin, serializers.ModelSerializer)
             'categories', 'location', 'content_type',
             'related_service_page', 'related_link_auto_appended',
             'status', 'publish_date', 'has_pending_changes',
-            'reading_time', 'created_at', 'last_updated'
+            'reading_time', 'text_excerpt', 'created_at', 'last_updated',
+            'search_snippet',
         ]
 
+    def get_search_snippet(self, obj):
+        """Highlighted body excerpt when listed via ?search=, else null."""
+        return render_snippet(getattr(obj, 'search_snippet', None))
+
 
 class BlogPostDetailSerializer(FeaturedImageURLMixin, RelatedServicePageValidationMixin, serializers.ModelSerializer):
     """Full serializer for blog post detail views."""
@@ -120,7 +127,8 @@ class BlogPostDetailSerializer(FeaturedImageURLMixin, RelatedServicePageValidati
             'media_plan', 'suggested_links',
             'status', 'publish_date', 'scheduled_publish_date',
             'last_published_at', 'pending_snapshot', 'has_pending_changes',
-            'reading_time', 'effective_meta_title', 'effective_meta_description',
+            'reading_time', 'word_count', 'outline', 'unresolved_media_ids', 'unresolved_link_ids',
+            'effective_meta_title', 'effective_meta_description',
             'created_at', 'last_updated'
         ]
         # media_plan/suggested_links/featured_image_plan are read-only here
@@ -133,8 +141,8 @@ class BlogPostDetailSerializer(FeaturedImageURLMixin, RelatedServicePageValidati
         # pending_snapshot/last_published_at are read-only for the same
         # reason -- they're only ever mutated through autosave/publish_changes.
         read_only_fields = [
-            'id', 'created_at', 'last_updated', 'reading_time',
-            'related_link_auto_appended', 'media_plan', 'suggested_links',
+            'id', 'created_at', 'last_updated', 'reading_time', 'word_count', 'outline',
+            'unresolved_media_ids', 'unresolved_link_ids', 'related_link_auto_appended', 'media_plan', 'suggested_links',
             'featured_image_plan', 'pending_snapshot', 'last_published_at',
         ]
 
@@ -224,7 +232,7 @@ class BlogPostPublicSerializer(FeaturedImageURLMixin, serializers.ModelSerialize
             'has_faq_schema', 'faq_data',
             'categories', 'location', 'content_type',
             'related_service_page', 'related_link_auto_appended',
-            'publish_date', 'reading_time', 'last_updated'
+            'publish_date', 'reading_time', 'word_count', 'outline', 'last_updated'
         ]
 
 
@@ -240,6 +248,7 @@ class AIGeneratePostSerializer(serializers.Serializer):
         choices=['professional', 'friendly', 'informative'],
         default='professional'
     )
+    bypass_cache = serializers.BooleanField(default=False)  # Skip the AI cache (see services/ai_cache.py)
 
 
 class AIGenerateSectionSerializer(serializers.Serializer):
@@ -249,12 +258,14 @@ class AIGenerateSectionSerializer(serializers.Serializer):
     )
     context = serializers.CharField(max_length=1000)
     existing_content = serializers.CharField(required=False, allow_blank=True)
+    bypass_cache = serializers.BooleanField(default=False)  # Skip the AI cache (see services/ai_cache.py)
 
 
 class AIGenerateSEOSerializer(serializers.Serializer):
     """Serializer for AI SEO generation request."""
     title = serializers.CharField(max_length=200)
     content = serializers.CharField()
+    bypass_cache = serializers.BooleanField(default=False)  # Skip the AI cache (see services/ai_cache.py)
 
 
 class ImageUploadSerializer(serializers.Serializer):
@@ -267,6 +278,7 @@ class AIEnhancePromptSerializer(serializers.Serializer):
     """Serializer for AI image prompt enhancement request."""
     prompt = serializers.CharField(max_length=500)
     context = serializers.CharField(required=False, allow_blank=True)
+    bypass_cache = serializers.BooleanField(default=False)  # Skip the AI cache (see services/ai_cache.py)
 
 
 class AIGenerateImageSerializer(serializers.Serializer):
@@ -278,6 +290,23 @@ class AIGenerateImageSerializer(serializers.Serializer):
     )
     enhanced = serializers.BooleanField(default=False)
     context = serializers.CharField(required=False, allow_blank=True)
+    bypass_cache = serializers.BooleanField(default=False)  # Skip the AI cache (see services/ai_cache.py)
+
+
+class AIJobSerializer(serializers.ModelSerializer):
+    """Serializer for a background AI job (see ai_jobs.py)."""
+    error = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AIJob
+        fields = [
+            'id', 'kind', 'status', 'progress', 'message', 'result', 'error',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+    def get_error(self, obj):
+        return obj.error or None
 
 
 class BlogPostCalendarSerializer(serializers.ModelSerializer):
@@ -1,13 +1,18 @@
 from .ai_service import AIService
 from .image_service import ImageService
 from .image_gen_service import ImageGenerationService
-from .link_matching_service import suggest_internal_links, insert_link_markers
+from .link_matching_service import (
+    suggest_internal_links, suggest_internal_links_for_all, insert_link_markers, replace_suggested_links,
+)
 from .web_image_service import download_and_save_image, WebImageDownloadError
-from .media_plan_service import fetch_candidates_for_placeholder
+from .media_plan_service import fetch_candidates_for_placeholder, fetch_candidates_for_placeholders
+from . import ai_cache
 
 __all__ = [
     'AIService', 'ImageService', 'ImageGenerationService',
-    'suggest_internal_links', 'insert_link_markers',
+    'suggest_internal_links', 'suggest_internal_links_for_all', 'insert_link_markers',
+    'replace_suggested_links',
     'download_and_save_image', 'WebImageDownloadError',
-    'fetch_candidates_for_placeholder',
+    'fetch_candidates_for_placeholder', 'fetch_candidates_for_placeholders',
+    'ai_cache',
 ]
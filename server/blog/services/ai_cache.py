@@ -0,0 +1,226 @@
+"""
+Durable memoization of text-generation calls (AIService, and
+ImageGenerationService.enhance_prompt).
+
+Editors retrying a generation, re-opening a draft and re-running
+import_content_drafts used to re-issue identical prompts, each costing
+seconds and API quota. Calls now go through memoize(), which stores results
+in AICacheEntry keyed on sha256(operation, model, normalized prompt) -- the
+prompt already embeds every input (topic, context, existing content...), so
+identical inputs map to the same entry.
+
+- Only successful results are stored: an exception, or a dict carrying
+  'error' (e.g. an unparseable response), is returned but never cached.
+- Identical requests in flight at the same time -- two tabs, two Celery
+  threads, two worker processes -- are deduplicated through the same table:
+  the first caller inserts a 'pending' row and makes the upstream call,
+  the others wait for it to turn 'ready'. A pending row older than
+  AI_CACHE_INFLIGHT_TIMEOUT is treated as abandoned and taken over.
+- Entries expire after AI_CACHE_MAX_AGE_DAYS; prune() also trims the table
+  back under AI_CACHE_MAX_BYTES, least recently used first (beat task
+  tasks.prune_ai_cache, or `manage.py ai_cache --prune`).
+- `with bypassed():` (or AI_CACHE_ENABLED=False) skips the lookup and
+  overwrites the entry with a fresh result -- the editor's "regenerate",
+  import_content_drafts --refresh-ai-cache.
+- stats() reports entries, bytes, hits and misses per operation
+  (`manage.py ai_cache --stats`).
+"""
+import contextlib
+import contextvars
+import hashlib
+import json
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_bypass = contextvars.ContextVar('ai_cache_bypass', default=False)
+
+# How often a caller waiting on someone else's identical request re-checks.
+WAIT_INTERVAL = 0.5
+
+
+@contextlib.contextmanager
+def bypassed(active=True):
+    """Within this block, memoize() always calls upstream (and refreshes
+    the stored entry). `active=False` makes it a no-op, for conditional use."""
+    token = _bypass.set(_bypass.get() or active)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def _enabled():
+    return getattr(settings, 'AI_CACHE_ENABLED', True)
+
+
+def _max_age():
+    return timedelta(days=getattr(settings, 'AI_CACHE_MAX_AGE_DAYS', 30))
+
+
+def _inflight_timeout():
+    return getattr(settings, 'AI_CACHE_INFLIGHT_TIMEOUT', 180)
+
+
+def cache_key(operation, model, prompt):
+    normalized = ' '.join(prompt.split())
+    return hashlib.sha256(f'{operation}\0{model}\0{normalized}'.encode()).hexdigest()
+
+
+def _is_cacheable(result):
+    return not (isinstance(result, dict) and 'error' in result)
+
+
+def _claim(key, operation, model):
+    """Try to become the caller that computes `key`. Returns True if this
+    caller should make the upstream call, False if another caller is."""
+    from ..models import AICacheEntry
+
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            AICacheEntry.objects.create(key=key, operation=operation, model=model, status='pending', last_used_at=now)
+        return True
+    except IntegrityError:
+        pass
+    # Existing row: take it over if it has expired, or if it's a pending
+    # row whose owner has gone away.
+    stale_pending = now - timedelta(seconds=_inflight_timeout())
+    takeover = (
+        AICacheEntry.objects.filter(key=key, status='ready', updated_at__lt=now - _max_age())
+        | AICacheEntry.objects.filter(key=key, status='pending', updated_at__lt=stale_pending)
+    )
+    return bool(takeover.update(status='pending', updated_at=now))
+
+
+def _wait_for(key):
+    """Wait for another caller's in-flight computation of `key`. Returns
+    the entry once ready, or None if it vanished (the owner failed) or
+    timed out."""
+    from ..models import AICacheEntry
+
+    deadline = time.monotonic() + _inflight_timeout()
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = AICacheEntry.objects.filter(key=key).first()
+        if entry is None:
+            return None
+        if entry.status == 'ready':
+            return entry
+    return None
+
+
+def _record_hit(entry):
+    from ..models import AICacheEntry
+
+    AICacheEntry.objects.filter(key=entry.key).update(hit_count=F('hit_count') + 1, last_used_at=timezone.now())
+    logger.info(f"AI cache hit: {entry.operation} ({entry.key[:12]})")
+
+
+def memoize(operation, model, prompt, compute):
+    """
+    Return compute()'s result for this (operation, model, prompt), from the
+    cache when possible. `compute` must return something JSON-serializable.
+    """
+    from ..models import AICacheEntry
+
+    if not _enabled():
+        return compute()
+
+    key = cache_key(operation, model, prompt)
+    bypass = _bypass.get()
+
+    if not bypass:
+        entry = AICacheEntry.objects.filter(key=key, status='ready').first()
+        if entry is not None and entry.updated_at >= timezone.now() - _max_age():
+            _record_hit(entry)
+            return entry.result
+
+    owner = _claim(key, operation, model)
+    if not owner and not bypass:
+        entry = _wait_for(key)
+        if entry is not None:
+            _record_hit(entry)
+            return entry.result
+        # Owner failed or stalled -- fall through and compute ourselves.
+        owner = _claim(key, operation, model)
+
+    logger.info(f"AI cache miss: {operation} ({key[:12]})")
+    try:
+        result = compute()
+    except Exception:
+        if owner:
+            AICacheEntry.objects.filter(key=key, status='pending').delete()
+        raise
+
+    if not _is_cacheable(result):
+        if owner:
+            AICacheEntry.objects.filter(key=key, status='pending').delete()
+        return result
+
+    AICacheEntry.objects.update_or_create(
+        key=key,
+        defaults={
+            'operation': operation,
+            'model': model,
+            'status': 'ready',
+            'result': result,
+            'size': len(json.dumps(result).encode()),
+            'last_used_at': timezone.now(),
+        },
+    )
+    AICacheEntry.objects.filter(key=key).update(miss_count=F('miss_count') + 1)
+    return result
+
+
+def prune():
+    """Delete expired entries, abandoned pending rows, and least recently
+    used entries beyond AI_CACHE_MAX_BYTES. Returns the number deleted."""
+    from ..models import AICacheEntry
+
+    now = timezone.now()
+    deleted, _ = AICacheEntry.objects.filter(updated_at__lt=now - _max_age()).delete()
+    stale, _ = AICacheEntry.objects.filter(
+        status='pending', updated_at__lt=now - timedelta(seconds=_inflight_timeout())
+    ).delete()
+    deleted += stale
+
+    budget = getattr(settings, 'AI_CACHE_MAX_BYTES', 50 * 1024 * 1024)
+    total, evict = 0, []
+    for key, size in AICacheEntry.objects.filter(status='ready').order_by('-last_used_at').values_list('key', 'size'):
+        total += size
+        if total > budget:
+            evict.append(key)
+    for start in range(0, len(evict), 500):
+        count, _ = AICacheEntry.objects.filter(key__in=evict[start:start + 500]).delete()
+        deleted += count
+    return deleted
+
+
+def stats():
+    """{operation: {'entries', 'bytes', 'hits', 'misses'}} over the live
+    entries (counts of evicted entries go with them)."""
+    from ..models import AICacheEntry
+
+    rows = (
+        AICacheEntry.objects.filter(status='ready')
+        .values('operation')
+        .annotate(entries=Count('key'), bytes=Sum('size'), hits=Sum('hit_count'), misses=Sum('miss_count'))
+        .order_by('operation')
+    )
+    return {
+        row['operation']: {
+            'entries': row['entries'],
+            'bytes': row['bytes'] or 0,
+            'hits': row['hits'] or 0,
+            'misses': row['misses'] or 0,
+        }
+        for row in rows
+    }
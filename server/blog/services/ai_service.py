@@ -2,9 +2,25 @@ import json
 import re
 from django.conf import settings
 
+from . import ai_cache
+
+
+def gemini_client(api_key):
+    """A Gemini client whose every request gives up after AI_JOB_TIME_LIMIT.
+    This is the only deadline an AI job has: the 'ai' worker runs a threads
+    pool, where Celery can't enforce task time limits."""
+    from google import genai
+    from google.genai import types
+
+    timeout_ms = getattr(settings, 'AI_JOB_TIME_LIMIT', 5 * 60) * 1000
+    return genai.Client(api_key=api_key, http_options=types.HttpOptions(timeout=timeout_ms))
+
 
 class AIService:
-    """Service for AI-powered content generation using Google Gemini."""
+    """Service for AI-powered content generation using Google Gemini.
+    Results are memoized per (operation, model, prompt), see ai_cache.py."""
+
+    MODEL = 'gemini-2.5-flash'
 
     def __init__(self):
         self.api_key = getattr(settings, 'GEMINI_API_KEY', None)
@@ -20,8 +36,7 @@ class AIService:
             raise ValueError("GEMINI_API_KEY not configured in settings")
 
         try:
-            from google import genai
-            self.client = genai.Client(api_key=self.api_key)
+            self.client = gemini_client(self.api_key)
             self._initialized = True
         except ImportError:
             raise ImportError("google-genai package not installed")
@@ -29,11 +44,18 @@ class AIService:
     def _generate(self, prompt):
         """Generate content using the Gemini API."""
         response = self.client.models.generate_content(
-            model='gemini-2.5-flash',
+            model=self.MODEL,
             contents=prompt
         )
         return response.text
 
+    def _generate_json(self, operation, prompt):
+        """Generate and parse a JSON response, through the AI cache."""
+        return ai_cache.memoize(
+            operation, self.MODEL, prompt,
+            lambda: self._parse_json_response(self._generate(prompt))
+        )
+
     def generate_full_post(self, topic, keywords=None, tone='professional'):
         """
         Generate a complete blog post from a topic.
@@ -77,8 +99,7 @@ Return your response as valid JSON with this exact structure:
 
 Return ONLY the JSON, no markdown code blocks or additional text."""
 
-        response = self._generate(prompt)
-        return self._parse_json_response(response)
+        return self._generate_json('full_post', prompt)
 
     def generate_section(self, section_type, context, existing_content=None):
         """
@@ -152,8 +173,7 @@ Return as JSON:
         if not prompt:
             raise ValueError(f"Invalid section_type: {section_type}")
 
-        response = self._generate(prompt)
-        return self._parse_json_response(response)
+        return self._generate_json('section', prompt)
 
     def generate_seo(self, title, content):
         """
@@ -189,8 +209,7 @@ Return as JSON:
 
 Return ONLY the JSON."""
 
-        response = self._generate(prompt)
-        return self._parse_json_response(response)
+        return self._generate_json('seo', prompt)
 
     def improve_content(self, content, instructions):
         """
@@ -220,8 +239,7 @@ Requirements:
 
 Return as JSON: {{"content": "Improved HTML content"}}"""
 
-        response = self._generate(prompt)
-        return self._parse_json_response(response)
+        return self._generate_json('improve_content', prompt)
 
     def _enforce_character_limits(self, data):
         """Enforce character limits on generated fields."""
@@ -0,0 +1,238 @@
+"""
+Responsive derivatives for inline blog images.
+
+Every resolved media_plan image is encoded once into a set of width-stepped
+copies (BLOG_IMAGE_WIDTHS, never wider than the original) as WebP, plus AVIF
+when BLOG_IMAGE_AVIF is on and Pillow can write it. resolve_media_placeholder
+writes the <img> tag with its intrinsic width/height straight away (read
+from the image header), so the layout is fixed from the first render;
+tasks.generate_image_derivatives produces the files in the background and
+only then adds srcset/sizes, so mobile visitors fetch the 400/800px copy
+instead of the full-size upload -- and a tag never lists copies that
+failed to encode or were never made.
+
+Derivative keys are a function of the source key alone:
+
+    blog/content/foo_ab12.png -> blog/derivatives/content/foo_ab12/800w.webp
+
+and a manifest.json next to them (written last) records what was
+produced. A source that
+already has a manifest is never re-encoded. The <img src> keeps pointing
+at the original file, as the fallback for anything that ignores srcset;
+AVIF copies are listed in the manifest only, since post content can't
+carry <picture>/<source type> through the editor.
+
+Encoding runs in a process pool (BLOG_IMAGE_WORKERS), one job per source
+image and format, so a post with ten images encodes them side by side
+instead of one after another.
+"""
+import io
+import json
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from PIL import Image, ImageOps, features
+
+from ..storage import blog_media_url, media_file_exists, open_media_file, save_media_bytes
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVES_ROOT = 'blog/derivatives'
+MANIFEST_NAME = 'manifest.json'
+
+DEFAULT_WIDTHS = (400, 800, 1200, 1600)
+# Rendered width of the article column (ContentDetailPage: 3 of 4 columns
+# inside max-w-4xl); full viewport width below the lg breakpoint.
+DEFAULT_SIZES = '(min-width: 1024px) 656px, 100vw'
+
+FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+    'avif': {'format': 'AVIF', 'quality': 55},
+}
+
+# EXIF orientations that swap width and height once transposed.
+_ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def _widths():
+    return sorted(getattr(settings, 'BLOG_IMAGE_WIDTHS', DEFAULT_WIDTHS))
+
+
+def _formats():
+    formats = ['webp']
+    if getattr(settings, 'BLOG_IMAGE_AVIF', False) and features.check('avif'):
+        formats.append('avif')
+    return formats
+
+
+def derivative_prefix(key):
+    """Storage 'directory' holding the derivatives of source `key`."""
+    relative = key[len('blog/'):] if key.startswith('blog/') else key
+    return f'{DERIVATIVES_ROOT}/{os.path.splitext(relative)[0]}'
+
+
+def target_widths(width):
+    """Derivative widths for a source `width` pixels wide: every configured
+    step narrower than the source, plus the source width itself capped at
+    the widest step."""
+    steps = _widths()
+    return sorted({w for w in steps if w < width} | {min(width, steps[-1])})
+
+
+def plan(key):
+    """
+    Manifest for source `key`, computed from the image header alone -- no
+    decoding or encoding. Returns None if `key` isn't a readable image.
+
+    {'source': key, 'width': ..., 'height': ...,
+     'variants': {'webp': [{'width': ..., 'height': ..., 'key': ...}, ...],
+                  'avif': [...]}}
+    """
+    try:
+        with open_media_file(key) as f:
+            with Image.open(f) as img:
+                width, height = img.size
+                if img.getexif().get(0x0112) in _ROTATED_ORIENTATIONS:
+                    width, height = height, width
+    except Exception as e:
+        logger.warning(f"Can't plan derivatives for {key}: {e}")
+        return None
+
+    prefix = derivative_prefix(key)
+    variants = {}
+    for fmt in _formats():
+        variants[fmt] = [
+            {'width': w, 'height': max(1, round(height * w / width)), 'key': f'{prefix}/{w}w.{fmt}'}
+            for w in target_widths(width)
+        ]
+    return {'source': key, 'width': width, 'height': height, 'variants': variants}
+
+
+def load_manifest(key):
+    """The stored manifest for source `key`, or None if its derivatives
+    haven't been generated yet."""
+    manifest_key = f'{derivative_prefix(key)}/{MANIFEST_NAME}'
+    if not media_file_exists(manifest_key):
+        return None
+    with open_media_file(manifest_key) as f:
+        return json.loads(f.read())
+
+
+def _encode(source, fmt, variants):
+    """Process-pool worker: decode `source` once and encode each variant
+    (largest first, each resized from the previous). Returns [(key, bytes)].
+    Touches neither Django nor storage, so it's safe in a forked child."""
+    options = dict(FORMATS[fmt])
+    image_format = options.pop('format')
+    img = ImageOps.exif_transpose(Image.open(io.BytesIO(source)))
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'transparency' in img.info or img.mode in ('LA', 'PA') else 'RGB')
+
+    encoded = []
+    for variant in sorted(variants, key=lambda v: v['width'], reverse=True):
+        size = (variant['width'], variant['height'])
+        if img.size != size:
+            img = img.resize(size, Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        img.save(buffer, format=image_format, **options)
+        encoded.append((variant['key'], buffer.getvalue()))
+    return encoded
+
+
+def _executor(jobs):
+    workers = min(getattr(settings, 'BLOG_IMAGE_WORKERS', os.cpu_count() or 1), jobs)
+    # A daemonic process (e.g. some Celery pool configurations) may not
+    # start children; Pillow releases the GIL while resizing/encoding, so
+    # threads are the next best thing there.
+    if workers > 1 and not multiprocessing.current_process().daemon:
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def generate(keys):
+    """
+    Make sure every source key in `keys` has its derivatives and manifest
+    in storage, encoding whatever is missing in one pool. Returns
+    {key: manifest} for each key that is (now) processed; unreadable
+    sources are left out.
+    """
+    manifests, pending = {}, {}
+    for key in dict.fromkeys(keys):
+        manifest = load_manifest(key)
+        if manifest is not None:
+            manifests[key] = manifest
+            continue
+        manifest = plan(key)
+        if manifest is not None:
+            pending[key] = manifest
+    if not pending:
+        return manifests
+
+    sources = {}
+    for key in pending:
+        with open_media_file(key) as f:
+            sources[key] = f.read()
+
+    jobs = [
+        (key, fmt, variants)
+        for key, manifest in pending.items()
+        for fmt, variants in manifest['variants'].items()
+    ]
+    failed = set()
+    with _executor(len(jobs)) as pool:
+        futures = [(key, pool.submit(_encode, sources[key], fmt, variants)) for key, fmt, variants in jobs]
+        for key, future in futures:
+            try:
+                encoded = future.result()
+            except Exception as e:
+                logger.error(f"Encoding derivatives of {key} failed: {e}")
+                failed.add(key)
+                continue
+            for variant_key, data in encoded:
+                # Keys are deterministic: a leftover from an interrupted run
+                # is the same encode, so keep it rather than save a copy.
+                if not media_file_exists(variant_key):
+                    save_media_bytes(variant_key, data)
+
+    for key, manifest in pending.items():
+        if key in failed:
+            continue
+        manifest_key = f'{derivative_prefix(key)}/{MANIFEST_NAME}'
+        if not media_file_exists(manifest_key):
+            save_media_bytes(manifest_key, json.dumps(manifest).encode())
+        manifests[key] = manifest
+    return manifests
+
+
+def responsive_attrs(manifest, srcset=True):
+    """srcset/sizes/width/height attribute string for an <img> showing the
+    image `manifest` describes; width/height only with srcset=False (for a
+    planned manifest whose files don't exist yet)."""
+    webp = manifest['variants']['webp']
+    largest = webp[-1]
+    dimensions = f'width="{largest["width"]}" height="{largest["height"]}"'
+    if not srcset:
+        return dimensions
+    candidates = ', '.join(f"{blog_media_url(v['key'])} {v['width']}w" for v in webp)
+    sizes = getattr(settings, 'BLOG_IMAGE_SIZES', DEFAULT_SIZES)
+    return f'srcset="{candidates}" sizes="{sizes}" {dimensions}'
+
+
+_RESPONSIVE_ATTR_RE = r'\s(?:srcset|sizes|width|height)="[^"]*"'
+
+
+def apply_responsive_attrs(content, media_id, manifest, srcset=True):
+    """Set (or replace) the responsive attributes on the <img
+    data-media-id="media_id"> tag in `content` (see responsive_attrs)."""
+    tag_pattern = r'<img[^>]*data-media-id="' + re.escape(str(media_id)) + r'"[^>]*>'
+    attrs = responsive_attrs(manifest, srcset=srcset)
+
+    def _rewrite(match):
+        tag = re.sub(_RESPONSIVE_ATTR_RE, '', match.group(0))
+        return re.sub(r'\s*/?>$', lambda end: f' {attrs}{end.group(0)}', tag, count=1)
+
+    return re.sub(tag_pattern, _rewrite, content or '', count=1)
@@ -5,12 +5,16 @@ import urllib.parse
 from django.conf import settings
 
 from ..storage import save_media_bytes, blog_media_url
+from . import ai_cache
+from .ai_service import gemini_client
 
 
 class ImageGenerationService:
     """Service for AI image generation using multiple providers."""
 
     ASPECT_RATIOS = ['1:1', '3:4', '4:3', '9:16', '16:9']
+    # Text model used for enhance_prompt (memoized, see ai_cache.py).
+    PROMPT_MODEL = 'gemini-2.5-flash'
 
     def __init__(self):
         self.api_key = getattr(settings, 'GEMINI_API_KEY', None)
@@ -24,8 +28,7 @@ class ImageGenerationService:
 
         if self.api_key:
             try:
-                from google import genai
-                self.client = genai.Client(api_key=self.api_key)
+                self.client = gemini_client(self.api_key)
             except ImportError:
                 pass
         self._initialized = True
@@ -55,11 +58,13 @@ Requirements:
 Return ONLY the enhanced prompt, nothing else."""
 
         try:
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=enhancement_prompt
+            return ai_cache.memoize(
+                'enhance_prompt', self.PROMPT_MODEL, enhancement_prompt,
+                lambda: self.client.models.generate_content(
+                    model=self.PROMPT_MODEL,
+                    contents=enhancement_prompt
+                ).text.strip()
             )
-            return response.text.strip()
         except Exception:
             return prompt
 
@@ -11,11 +11,20 @@ Deliberately NOT classic TF-IDF: corpus-relative IDF needs hundreds of
 documents to have real discriminating range, and actively misbehaves at
 Tola Tiles' actual scale (10s of posts) -- see _term_vector's docstring for
 the concrete failure mode this was tuned against.
+
+Candidate vectors are persisted (PostTermVector + PostTerm, kept current by
+index_post() from blog/signals.py), and PostTerm doubles as a term -> post
+inverted index: scoring a post only reads the index rows for its own terms
+plus the posts sharing one of its categories, instead of loading and
+re-tokenizing every published post on every call.
 """
+import hashlib
 import math
 import re
 from collections import Counter
 
+from django.db import transaction
+
 TAG_RE = re.compile(r'<[^>]+>')
 WORD_RE = re.compile(r"[a-z']{3,}")
 
@@ -73,13 +82,17 @@ def _term_vector(tokens):
     return {term: 1 + math.log(count) for term, count in tf.items()}
 
 
+def _norm(vector):
+    return math.sqrt(sum(v * v for v in vector.values()))
+
+
 def _cosine(v1, v2):
     common = set(v1) & set(v2)
     if not common:
         return 0.0
     dot = sum(v1[t] * v2[t] for t in common)
-    n1 = math.sqrt(sum(v * v for v in v1.values()))
-    n2 = math.sqrt(sum(v * v for v in v2.values()))
+    n1 = _norm(v1)
+    n2 = _norm(v2)
     return dot / (n1 * n2) if n1 and n2 else 0.0
 
 
@@ -108,52 +121,216 @@ def _best_anchor_paragraph(post_content, candidate_title_tokens):
     return best_text[:140]
 
 
+# Post fields _document_tokens() reads; saves touching none of them leave
+# the stored vector alone.
+INDEXED_FIELDS = frozenset({'title', 'excerpt', 'content'})
+
+# PostTerm.term max_length. WORD_RE has no upper bound, but a "word" this
+# long can only be junk (e.g. an unbroken base64 blob) -- it still counts
+# towards the stored norm, it just never becomes an index row.
+MAX_TERM_LENGTH = 255
+
+
+def index_post(post):
+    """Store `post`'s term vector and inverted-index rows. A no-op when its
+    tokens haven't changed since the last call."""
+    from ..models import PostTerm, PostTermVector
+
+    vector = _term_vector(_document_tokens(post))
+    fingerprint = hashlib.sha256(repr(sorted(vector.items())).encode()).hexdigest()
+    stored = PostTermVector.objects.filter(post_id=post.pk).values_list('fingerprint', flat=True).first()
+    if stored == fingerprint:
+        return
+
+    with transaction.atomic():
+        PostTerm.objects.filter(post_id=post.pk).delete()
+        PostTerm.objects.bulk_create([
+            PostTerm(post_id=post.pk, term=term, weight=weight)
+            for term, weight in vector.items()
+            if len(term) <= MAX_TERM_LENGTH
+        ])
+        PostTermVector.objects.update_or_create(
+            post_id=post.pk, defaults={'norm': _norm(vector), 'fingerprint': fingerprint}
+        )
+
+
+def _index_unindexed_posts(**filters):
+    """Index posts that predate the index (or were written without
+    signals); normally finds nothing. Defaults to published posts."""
+    from ..models import BlogPost
+
+    filters = filters or {'status': 'published'}
+    for post in BlogPost.objects.filter(term_vector__isnull=True, **filters).only(*INDEXED_FIELDS):
+        index_post(post)
+
+
+def _bonus_categories(post):
+    """Ids of `post`'s categories that count towards the category bonus.
+
+    Only categories with a specific (non-empty) content_types list carry
+    topical signal -- cross-cutting tags like the city categories (empty
+    list, per BlogCategory.applies_to()) are too generic to mean "these
+    two posts are about the same thing."
+    """
+    return {c.id for c in post.categories.all() if c.content_types}
+
+
+def _scores(dots, norms, source_norm, bonus_ids, min_score):
+    """{candidate id: score} for candidates scoring at least min_score,
+    given their dot products with the source vector and the candidates
+    sharing a bonus category with it."""
+    scores = {}
+    for post_id in set(dots) | bonus_ids:
+        norm = norms.get(post_id)
+        sim = dots[post_id] / (source_norm * norm) if post_id in dots and source_norm and norm else 0.0
+        bonus = 0.15 if post_id in bonus_ids else 0.0
+        score = round(min(1.0, 0.85 * sim + bonus), 3)
+        if score >= min_score:
+            scores[post_id] = score
+    return scores
+
+
+def _suggestion(post, cand, score):
+    return {
+        'target_slug': cand.slug,
+        'target_title': cand.title,
+        'target_content_type': cand.content_type,
+        'score': score,
+        'anchor_text_hint': _best_anchor_paragraph(post.content, _tokenize(cand.title)),
+    }
+
+
 def suggest_internal_links(post, limit=5, min_score=0.05):
     """Suggest other published posts to cross-link to, based on cosine
     similarity of weighted-term-frequency vectors over title/excerpt/content
     plus a bonus for shared (non-cross-cutting) categories.
 
+    Only posts sharing at least one term or bonus category with `post` can
+    score above zero, so only those are looked at: their dot products come
+    from the PostTerm rows for `post`'s terms, their norms from
+    PostTermVector.
+
     Returns a list of dicts WITHOUT 'id' (the caller/insert_link_markers
     assigns stable sequential ids when placing markers in content).
     """
-    from ..models import BlogPost  # local import: avoid app-loading order issues
-
-    candidates = list(
-        BlogPost.objects.filter(status='published')
-        .exclude(pk=post.pk)
-        .prefetch_related('categories')
-    )
-    if not candidates:
+    from ..models import BlogPost, PostTerm, PostTermVector  # local import: avoid app-loading order issues
+
+    _index_unindexed_posts()
+    candidates = BlogPost.objects.filter(status='published').exclude(pk=post.pk)
+
+    # The source post is scored as it is now (possibly unsaved), not as indexed.
+    source_vec = _term_vector(_document_tokens(post))
+    source_norm = _norm(source_vec)
+    source_cats = _bonus_categories(post)
+
+    dots = {}
+    if source_norm:
+        for post_id, term, weight in (
+            PostTerm.objects.filter(term__in=list(source_vec), post__in=candidates)
+            .values_list('post_id', 'term', 'weight')
+        ):
+            dots[post_id] = dots.get(post_id, 0.0) + source_vec[term] * weight
+    norms = dict(PostTermVector.objects.filter(post_id__in=list(dots)).values_list('post_id', 'norm'))
+
+    bonus_ids = set()
+    if source_cats:
+        bonus_ids = set(
+            BlogPost.categories.through.objects
+            .filter(blogcategory_id__in=source_cats, blogpost__in=candidates)
+            .values_list('blogpost_id', flat=True)
+        )
+
+    scores = _scores(dots, norms, source_norm, bonus_ids, min_score)
+    if not scores:
         return []
 
-    corpus = {c.pk: _document_tokens(c) for c in candidates}
-    source_tokens = _document_tokens(post)
-
-    source_vec = _term_vector(source_tokens)
-    # Only categories with a specific (non-empty) content_types list carry
-    # topical signal -- cross-cutting tags like the city categories (empty
-    # list, per BlogCategory.applies_to()) are too generic to mean "these
-    # two posts are about the same thing."
-    source_cats = {c.id for c in post.categories.all() if c.content_types}
-
-    results = []
-    for cand in candidates:
-        cand_vec = _term_vector(corpus[cand.pk])
-        sim = _cosine(source_vec, cand_vec)
-        cand_cats = {c.id for c in cand.categories.all() if c.content_types}
-        bonus = 0.15 if (source_cats & cand_cats) else 0.0
-        score = round(min(1.0, 0.85 * sim + bonus), 3)
-        if score >= min_score:
-            results.append({
-                'target_slug': cand.slug,
-                'target_title': cand.title,
-                'target_content_type': cand.content_type,
-                'score': score,
-                'anchor_text_hint': _best_anchor_paragraph(post.content, _tokenize(cand.title)),
-            })
-
-    results.sort(key=lambda r: r['score'], reverse=True)
-    return results[:limit]
+    # Default BlogPost ordering, so equal scores tie-break as before.
+    matches = list(candidates.filter(pk__in=list(scores)).only('slug', 'title', 'content_type'))
+    matches.sort(key=lambda cand: scores[cand.pk], reverse=True)
+    return [_suggestion(post, cand, scores[cand.pk]) for cand in matches[:limit]]
+
+
+def suggest_internal_links_for_all(posts, limit=5, min_score=0.05):
+    """suggest_internal_links() for every post in `posts` at once.
+
+    Scores the whole batch in one pass over the stored index instead of one
+    set of queries per post: the PostTerm table is read once into per-term
+    posting lists of published posts, and each source post's dot
+    products are accumulated along the postings of its own terms -- a sparse
+    document-term matrix product, so the work grows with the number of
+    shared (term, post) pairs rather than with posts squared. Sources are
+    scored from their indexed vectors, which match their saved fields.
+
+    Returns {post pk: suggestions}, the same lists suggest_internal_links()
+    would return for each post.
+    """
+    from ..models import BlogCategory, BlogPost, PostTerm, PostTermVector
+
+    posts = list(posts)
+    if not posts:
+        return {}
+    _index_unindexed_posts()
+    indexed = set(PostTermVector.objects.values_list('post_id', flat=True))
+    for post in posts:
+        if post.pk not in indexed:
+            index_post(post)
+
+    # Candidates in default BlogPost ordering; rank breaks score ties.
+    published = list(BlogPost.objects.filter(status='published').only('slug', 'title', 'content_type'))
+    rank = {cand.pk: i for i, cand in enumerate(published)}
+    by_pk = {cand.pk: cand for cand in published}
+    source_pks = {post.pk for post in posts}
+
+    postings = {}        # term -> [(published post id, weight)]
+    source_vectors = {}  # source post id -> {term: weight}
+    for post_id, term, weight in PostTerm.objects.values_list('post_id', 'term', 'weight').iterator():
+        if post_id in by_pk:
+            postings.setdefault(term, []).append((post_id, weight))
+        if post_id in source_pks:
+            source_vectors.setdefault(post_id, {})[term] = weight
+    norms = dict(PostTermVector.objects.values_list('post_id', 'norm'))
+
+    bonus_categories = {cat_id for cat_id, content_types in BlogCategory.objects.values_list('id', 'content_types')
+                        if content_types}
+    bonus_cats = {}  # post id -> bonus category ids
+    members = {}     # bonus category id -> published post ids
+    for post_id, cat_id in BlogPost.categories.through.objects.values_list('blogpost_id', 'blogcategory_id'):
+        if cat_id in bonus_categories:
+            bonus_cats.setdefault(post_id, set()).add(cat_id)
+            if post_id in by_pk:
+                members.setdefault(cat_id, set()).add(post_id)
+
+    results = {}
+    for post in posts:
+        dots = {}
+        for term, weight in source_vectors.get(post.pk, {}).items():
+            for post_id, cand_weight in postings.get(term, ()):
+                dots[post_id] = dots.get(post_id, 0.0) + weight * cand_weight
+        bonus_ids = set()
+        for cat_id in bonus_cats.get(post.pk, ()):
+            bonus_ids |= members.get(cat_id, set())
+        dots.pop(post.pk, None)
+        bonus_ids.discard(post.pk)
+
+        scores = _scores(dots, norms, norms.get(post.pk), bonus_ids, min_score)
+        top = sorted(scores, key=lambda post_id: (-scores[post_id], rank[post_id]))[:limit]
+        results[post.pk] = [_suggestion(post, by_pk[post_id], scores[post_id]) for post_id in top]
+    return results
+
+
+def replace_suggested_links(content, suggested_links, suggestions):
+    """Swap a post's still-'suggested' link entries (and their markers in
+    `content`) for `suggestions`. Accepted/rejected entries and their
+    markers are left untouched. Returns (new_content, new_suggested_links)."""
+    kept = [item for item in suggested_links or [] if item.get('status') != 'suggested']
+    for item in suggested_links or []:
+        if item.get('status') == 'suggested':
+            pattern = r'<span[^>]*data-link-marker="' + re.escape(str(item.get('id'))) + r'"[^>]*>\s*</span>'
+            content = re.sub(pattern, '', content)
+
+    next_id = max([item.get('id', 0) for item in kept], default=0) + 1
+    content, new_links = insert_link_markers(content, suggestions, start_id=next_id)
+    return content, kept + new_links
 
 
 def insert_link_markers(content, suggestions, start_id=1):
@@ -12,9 +12,22 @@ candidates for every placeholder so they're ready the moment a human opens
 the post). Each source is independent and best-effort -- a failure in one
 (bad key, rate limit, network, safety filter) never blocks the others; it
 just leaves that source's list empty.
+
+fetch_candidates_for_placeholders() runs many placeholders at once on a
+bounded thread pool (MEDIA_PREFETCH_WORKERS). Every upstream call goes
+through a per-provider limiter (MEDIA_PREFETCH_LIMITS): at most
+`concurrency` calls in flight, at most `per_minute` started per minute, and
+up to `retries` retries with exponential backoff -- shared by all threads,
+so raising the worker count never exceeds a provider's rate limit.
 """
+import contextvars
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from django.conf import settings
+from django.db import connections
 from django.db.models import Q
 
 from gallery.models import GalleryImage
@@ -22,6 +35,68 @@ from .image_gen_service import ImageGenerationService
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_LIMITS = {
+    'enhance_prompt': {'concurrency': 4, 'per_minute': 60, 'retries': 0},
+    'generate_image': {'concurrency': 2, 'per_minute': 20, 'retries': 2},
+    'gallery': {'concurrency': 4, 'per_minute': 0, 'retries': 1},
+}
+RETRY_BASE_DELAY = 2  # seconds; doubled on every further attempt
+
+
+class _Provider:
+    """Concurrency cap, start-rate limit and retry-with-backoff for calls to
+    one upstream source. Thread-safe; one instance per source per process."""
+
+    def __init__(self, name, concurrency=1, per_minute=0, retries=0):
+        self.name = name
+        self.retries = retries
+        self._slots = threading.BoundedSemaphore(max(1, concurrency))
+        self._interval = 60 / per_minute if per_minute else 0
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def _wait_turn(self):
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+        time.sleep(start - now)
+
+    def call(self, fn, *args, ok=None, **kwargs):
+        """fn(*args, **kwargs), retried while it raises or `ok(result)` is
+        false. Returns the last result, or re-raises the last exception."""
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(RETRY_BASE_DELAY * 2 ** (attempt - 1))
+            self._wait_turn()
+            try:
+                with self._slots:
+                    result = fn(*args, **kwargs)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                logger.info('%s failed, retrying (%d/%d)', self.name, attempt + 1, self.retries, exc_info=True)
+                continue
+            if ok is None or ok(result) or attempt == self.retries:
+                return result
+            logger.info('%s returned %r, retrying (%d/%d)', self.name, result, attempt + 1, self.retries)
+        return result
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def _provider(name):
+    with _providers_lock:
+        if name not in _providers:
+            limits = {**DEFAULT_LIMITS[name], **getattr(settings, 'MEDIA_PREFETCH_LIMITS', {}).get(name, {})}
+            _providers[name] = _Provider(name, **limits)
+        return _providers[name]
+
+
 _CATEGORY_KEYWORDS = {
     'backsplash': ['backsplash', 'kitchen wall', 'tile wall'],
     'shower': ['shower', 'bath', 'bathroom', 'waterproof', 'drain'],
@@ -85,8 +160,11 @@ def fetch_candidates_for_placeholder(prompt, aspect_ratio='16:9'):
 
     try:
         service = ImageGenerationService()
-        enhanced_prompt = service.enhance_prompt(prompt)
-        result = service.generate_image(enhanced_prompt, aspect_ratio=aspect_ratio)
+        enhanced_prompt = _provider('enhance_prompt').call(service.enhance_prompt, prompt)
+        result = _provider('generate_image').call(
+            service.generate_image, enhanced_prompt, aspect_ratio=aspect_ratio,
+            ok=lambda result: bool(result) and 'url' in result,
+        )
         if result and 'url' in result:
             candidates['ai'] = [{
                 'thumbnail_url': result['url'],
@@ -97,8 +175,46 @@ def fetch_candidates_for_placeholder(prompt, aspect_ratio='16:9'):
         logger.warning('AI image generation failed for prompt %r', prompt, exc_info=True)
 
     try:
-        candidates['gallery'] = _gallery_candidates(prompt)
+        candidates['gallery'] = _provider('gallery').call(_gallery_candidates, prompt)
     except Exception:
         logger.warning('Gallery candidate search failed for prompt %r', prompt, exc_info=True)
 
     return candidates
+
+
+def _fetch_in_thread(prompt, aspect_ratio):
+    try:
+        return fetch_candidates_for_placeholder(prompt, aspect_ratio)
+    finally:
+        # Pool threads open their own DB connections (gallery search, AI cache).
+        connections.close_all()
+
+
+def fetch_candidates_for_placeholders(prompts, aspect_ratio='16:9', workers=None, on_done=None):
+    """fetch_candidates_for_placeholder for every prompt in `prompts`,
+    concurrently. Returns {prompt: candidates}; duplicate prompts are fetched
+    once. `on_done(done, total, prompt, candidates)` is called from the
+    calling thread as each prompt finishes. Never raises for a single
+    prompt -- one that fails outright just gets empty candidates."""
+    unique = list(dict.fromkeys(prompts))
+    if not unique:
+        return {}
+    workers = workers or getattr(settings, 'MEDIA_PREFETCH_WORKERS', 8)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(unique))) as pool:
+        # copy_context: pool threads don't inherit contextvars (e.g. ai_cache.bypassed()).
+        futures = {
+            pool.submit(contextvars.copy_context().run, _fetch_in_thread, prompt, aspect_ratio): prompt
+            for prompt in unique
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            prompt = futures[future]
+            try:
+                results[prompt] = future.result()
+            except Exception:
+                logger.exception('Candidate fetch crashed for prompt %r', prompt)
+                results[prompt] = {'ai': [], 'gallery': [], 'web': []}
+            if on_done:
+                on_done(done, len(unique), prompt, results[prompt])
+    return results
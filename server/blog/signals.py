@@ -0,0 +1,38 @@
+"""Signal handlers keeping the internal-link term index and the search
+index current, and arming publish ETAs for scheduled posts."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import BlogPost
+
+
+@receiver(post_save, sender=BlogPost, dispatch_uid='blog_index_post_terms')
+def index_post_terms(sender, instance, raw=False, update_fields=None, using='default', **kwargs):
+    """Re-index a post's term vector and search document when its
+    title/excerpt/content may have changed."""
+    from . import search
+    from .services.link_matching_service import INDEXED_FIELDS, index_post
+
+    if raw or (update_fields is not None and not INDEXED_FIELDS & set(update_fields)):
+        return
+    index_post(instance)
+    search.index_post(instance, using=using)
+
+
+@receiver(post_save, sender=BlogPost, dispatch_uid='blog_arm_scheduled_publish')
+def arm_scheduled_publish(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Arm the publish ETA when a post is scheduled or rescheduled."""
+    from . import scheduling
+
+    if raw or instance.status != 'scheduled':
+        return
+    if update_fields is not None and not {'status', 'scheduled_publish_date'} & set(update_fields):
+        return
+    scheduling.arm(instance)
+
+
+@receiver(post_delete, sender=BlogPost, dispatch_uid='blog_remove_search_document')
+def remove_search_document(sender, instance, using='default', **kwargs):
+    from . import search
+    search.remove_post(instance.pk, using=using)
@@ -22,9 +22,10 @@ import re
 import unicodedata
 
 from django.conf import settings
-from django.core.files.base import ContentFile
 from django.core.files.storage import FileSystemStorage
 
+from config.storage_adapter import StorageAdapter
+
 
 def _build_storage():
     if getattr(settings, 'USE_R2_STORAGE', False):
@@ -54,6 +55,9 @@ def _build_storage():
 # Built once at import time and reused -- mirrors how django.core.files.storage
 # .default_storage itself is a module-level singleton.
 blog_media_storage = _build_storage()
+# Server-side copy/rename and cached exists() on top of it (see
+# config/storage_adapter.py).
+blog_media = StorageAdapter(blog_media_storage)
 
 
 def slugify_filename(name: str) -> str:
@@ -69,7 +73,7 @@ def save_media_bytes(key: str, content: bytes) -> str:
     """Save raw bytes at storage key `key` (e.g. 'blog/ai-generated/x.png').
     Returns the actual key saved under (the storage backend appends a
     dedup suffix if `key` is already taken)."""
-    return blog_media_storage.save(key, ContentFile(content))
+    return blog_media.save(key, content)
 
 
 def blog_media_url(key: str) -> str:
@@ -95,13 +99,18 @@ def open_media_file(key: str):
     return blog_media_storage.open(key, 'rb')
 
 
+def media_file_exists(key: str) -> bool:
+    """Whether `key` exists (answered from a short-lived cache, see
+    config/storage_adapter.py)."""
+    return blog_media.exists(key)
+
+
 def delete_media_file(key: str) -> None:
-    if key and blog_media_storage.exists(key):
-        blog_media_storage.delete(key)
+    blog_media.delete(key)
 
 
 def rename_media_file(key: str, desired_basename: str) -> str:
-    """Rename (local storage) or copy+delete (R2/remote storage) the file
+    """Rename (local storage) or server-side copy+delete (R2) the file
     at `key` to slugify_filename(desired_basename) + its existing
     extension, in the same 'directory'. Returns the new key (unchanged if
     the slugified name already matches the current basename). De-dupes
@@ -116,15 +125,12 @@ def rename_media_file(key: str, desired_basename: str) -> str:
         return key
 
     counter = 1
-    while blog_media_storage.exists(new_key):
+    while blog_media.exists(new_key):
         candidate = f'{base}-{counter}{ext}'
         new_key = os.path.join(directory, candidate) if directory else candidate
         counter += 1
 
-    with blog_media_storage.open(key, 'rb') as f:
-        blog_media_storage.save(new_key, ContentFile(f.read()))
-    blog_media_storage.delete(key)
-    return new_key
+    return blog_media.move(key, new_key)
 
 
 def is_local_storage() -> bool:
@@ -1,7 +1,7 @@
 import logging
 
 from celery import shared_task
-from django.utils import timezone
+from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
@@ -9,43 +9,162 @@ logger = logging.getLogger(__name__)
 @shared_task
 def publish_scheduled_posts():
     """
-    Check for scheduled posts that should be published and update their status.
-    This task runs every 5 minutes via Celery Beat.
+    Safety sweep for scheduled publishing (see blog/scheduling.py). Posts
+    normally go live from their own ETA task (publish_scheduled_post); this
+    runs every 5 minutes via Celery Beat to publish anything an ETA missed
+    (worker down, broker flushed) and to arm ETAs for posts coming due.
 
     Posts with unresolved media/link placeholders (see BlogPost.has_unresolved_media)
     are deliberately skipped rather than published incomplete or crashing the
     whole batch -- they stay 'scheduled' and get retried on the next tick.
     """
+    from .scheduling import arm_upcoming, publish_due_posts
+
+    published, skipped = publish_due_posts()
+    for pk, title, reason in skipped:
+        logger.warning(
+            'Skipping scheduled publish for "%s" (id=%s) -- %s. Will retry next tick.',
+            title, pk, reason,
+        )
+    armed = arm_upcoming()
+
+    count = len(published)
+    if count > 0:
+        print(f"Published {count} scheduled blog post(s)")
+    if skipped:
+        print(f"Skipped {len(skipped)} scheduled blog post(s) that can't be published yet")
+
+    return f"Published {count} scheduled posts, skipped {len(skipped)} incomplete, armed {armed}"
+
+
+@shared_task
+def publish_scheduled_post(post_id, scheduled_for):
+    """
+    ETA task armed for one scheduled post (see blog/scheduling.py). A no-op
+    if the post was published already, unscheduled, or rescheduled to a later
+    time since this was armed.
+    """
+    from django.utils.dateparse import parse_datetime
+    from .scheduling import publish_due_posts
+
+    published, skipped = publish_due_posts(due_by=parse_datetime(scheduled_for), post_ids=[post_id])
+    for pk, title, reason in skipped:
+        logger.warning('Scheduled publish for "%s" (id=%s) held back -- %s.', title, pk, reason)
+    return {'published': published, 'skipped': [pk for pk, _, _ in skipped]}
+
+
+@shared_task
+def warm_blog_caches(post_ids):
+    """
+    Request the public pages affected by newly published posts (see
+    scheduling.warm_urls) so the frontend re-renders them now rather than
+    on the first visitor's request.
+    """
+    import requests
+    from .scheduling import warm_urls
+
+    warmed = 0
+    for url in warm_urls(post_ids):
+        try:
+            response = requests.get(url, timeout=getattr(settings, 'BLOG_CACHE_WARM_TIMEOUT', 20))
+            if response.ok:
+                warmed += 1
+            else:
+                logger.warning(f"Cache warm {url} returned {response.status_code}")
+        except requests.RequestException as e:
+            logger.warning(f"Cache warm {url} failed: {e}")
+    return {'warmed': warmed}
+
+
+@shared_task
+def generate_image_derivatives(post_id):
+    """
+    Encode the responsive derivatives of every resolved inline image in a
+    post (see services/image_derivatives.py) and make sure each <img
+    data-media-id> tag -- in the live content and in a pending snapshot --
+    carries the matching srcset/sizes/width/height. srcset is only ever
+    added here, for images whose derivatives generate() has actually
+    stored -- one whose encode failed keeps its plain src. Queued by
+    resolve_media_placeholder; also backfills images resolved before
+    derivatives existed.
+    """
+    from django.db import transaction
     from .models import BlogPost
+    from .services import image_derivatives
+    from .storage import blog_media_key_from_url
+
+    def _source_key(entry):
+        if entry.get('type') != 'image' or entry.get('status') != 'resolved':
+            return None
+        key = blog_media_key_from_url(entry.get('resolved_url'))
+        return key if key and key.startswith('blog/') else None
+
+    post = BlogPost.objects.filter(pk=post_id).only('media_plan').first()
+    if post is None:
+        return {'images': 0}
+    keys = [key for key in map(_source_key, post.media_plan or []) if key]
+    if not keys:
+        return {'images': 0}
+
+    # Encoding happens outside the transaction; only the tag rewrite locks the row.
+    manifests = image_derivatives.generate(keys)
+
+    with transaction.atomic():
+        post = BlogPost.objects.select_for_update().get(pk=post_id)
+        content = post.content or ''
+        snapshot = dict(post.pending_snapshot) if post.pending_snapshot is not None else None
+        for entry in post.media_plan or []:
+            manifest = manifests.get(_source_key(entry))
+            if manifest is None:
+                continue
+            entry['derivatives'] = manifest
+            content = image_derivatives.apply_responsive_attrs(content, entry['id'], manifest)
+            if snapshot is not None and 'content' in snapshot:
+                snapshot['content'] = image_derivatives.apply_responsive_attrs(
+                    snapshot['content'], entry['id'], manifest
+                )
+        # Attribute-only edits: derived columns and search/term indexes are unaffected.
+        BlogPost.objects.filter(pk=post_id).update(
+            content=content, pending_snapshot=snapshot, media_plan=post.media_plan
+        )
+    return {'images': len(manifests)}
+
+
+@shared_task
+def run_ai_job(job_id):
+    """Run one editor AI generation (see blog/ai_jobs.py). Routed to the 'ai'
+    queue, whose threads pool ignores Celery time limits -- the deadline is
+    the Gemini client's request timeout (services/ai_service.gemini_client)."""
+    from .ai_jobs import run
+
+    return run(job_id)
 
-    now = timezone.now()
 
-    # Find all scheduled posts whose scheduled_publish_date has passed
-    scheduled_posts = BlogPost.objects.filter(
-        status='scheduled',
-        scheduled_publish_date__lte=now
+@shared_task
+def cleanup_ai_jobs():
+    """
+    Fail AI jobs that have been queued/running for longer than
+    AI_JOB_TIME_LIMIT allows (worker killed mid-generation), so the editor stops
+    waiting on them, and prune finished jobs after AI_JOB_RETENTION_DAYS.
+    Runs via Celery Beat.
+    """
+    from datetime import timedelta
+    from .ai_jobs import fail_stale_jobs
+
+    failed, deleted = fail_stale_jobs(
+        older_than=timedelta(seconds=2 * getattr(settings, 'AI_JOB_TIME_LIMIT', 5 * 60)),
+        keep_for=timedelta(days=getattr(settings, 'AI_JOB_RETENTION_DAYS', 7)),
     )
+    return f"Failed {failed} stale AI jobs, deleted {deleted} old ones"
 
-    count = 0
-    skipped = 0
-    for post in scheduled_posts:
-        if post.has_unresolved_media:
-            logger.warning(
-                'Skipping scheduled publish for "%s" (id=%s) -- unresolved media/link '
-                'placeholders still present. Will retry next tick.',
-                post.title, post.pk,
-            )
-            skipped += 1
-            continue
-
-        post.status = 'published'
-        post.publish_date = post.scheduled_publish_date
-        post.save(update_fields=['status', 'publish_date'])
-        count += 1
 
-    if count > 0:
-        print(f"Published {count} scheduled blog post(s)")
-    if skipped > 0:
-        print(f"Skipped {skipped} scheduled blog post(s) with unresolved media/links")
+@shared_task
+def prune_ai_cache():
+    """
+    Drop expired and least recently used AI cache entries (see
+    services/ai_cache.py). Runs via Celery Beat.
+    """
+    from .services import ai_cache
 
-    return f"Published {count} scheduled posts, skipped {skipped} incomplete"
+    deleted = ai_cache.prune()
+    return f"Pruned {deleted} AI cache entries"
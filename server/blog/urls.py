@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BlogPostViewSet, BlogCategoryViewSet
+from .views import AIJobViewSet, BlogPostViewSet, BlogCategoryViewSet
 
 router = DefaultRouter()
 router.register(r'posts', BlogPostViewSet, basename='blogpost')
 router.register(r'categories', BlogCategoryViewSet, basename='blogcategory')
+router.register(r'ai-jobs', AIJobViewSet, basename='aijob')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -3,6 +3,7 @@ import os
 import re
 import uuid
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 from rest_framework import viewsets, status
@@ -12,7 +13,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 
 from .storage import (
     save_media_bytes,
@@ -24,7 +25,9 @@ from .storage import (
     is_local_storage,
 )
 
-from .models import BlogPost, BlogCategory
+from . import ai_jobs, search
+from .models import AIJob, BlogPost, BlogCategory, DERIVED_FROM
+from .search import BlogSearchFilter
 
 # Route prefix per content type for constructing internal cross-link hrefs --
 # must stay in sync with CONTENT_TYPE_ROUTE_PREFIX in client/lib/contentTypes.ts
@@ -50,8 +53,11 @@ from .serializers import (
     AIGenerateSectionSerializer,
     AIGenerateSEOSerializer,
     ImageUploadSerializer,
+    AIJobSerializer,
 )
-from .services import AIService, ImageService
+from .services import ImageService, image_derivatives
+from .services.link_matching_service import INDEXED_FIELDS, index_post
+from .tasks import generate_image_derivatives
 
 
 class BlogCategoryViewSet(viewsets.ModelViewSet):
@@ -66,14 +72,28 @@ class BlogCategoryViewSet(viewsets.ModelViewSet):
         return [IsAuthenticated(), IsAdminUser()]
 
 
+class AIJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """The current user's background AI jobs (see ai_jobs.py) -- for
+    picking up a result after a reload, or polling when the WebSocket is
+    unavailable."""
+    serializer_class = AIJobSerializer
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status', 'kind']
+
+    def get_queryset(self):
+        return AIJob.objects.filter(user=self.request.user)
+
+
 class BlogPostViewSet(viewsets.ModelViewSet):
     """ViewSet for managing blog posts with AI generation features."""
     queryset = BlogPost.objects.all()
     lookup_field = 'slug'
     parser_classes = [MultiPartParser, FormParser, JSONParser]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    # BlogSearchFilter (full-text `search`, see blog/search.py) orders by
+    # relevance, so it must run after OrderingFilter.
+    filter_backends = [DjangoFilterBackend, OrderingFilter, BlogSearchFilter]
     filterset_fields = ['status', 'categories', 'is_indexed', 'has_faq_schema', 'content_type']
-    search_fields = ['title', 'content', 'excerpt']
     ordering_fields = ['publish_date', 'created_at', 'last_updated', 'title']
     ordering = ['-publish_date', '-created_at']
 
@@ -115,6 +135,8 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         if content_type:
             queryset = queryset.filter(content_type=content_type)
 
+        if self.action == 'list':
+            queryset = queryset.summaries()
         return queryset.prefetch_related('categories')
 
     def perform_create(self, serializer):
@@ -199,85 +221,29 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         serializer = BlogPostListSerializer(related_posts, many=True)
         return Response(serializer.data)
 
-    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
-    def ai_generate_post(self, request):
-        """Generate a complete blog post using AI."""
-        serializer = AIGeneratePostSerializer(data=request.data)
+    def _enqueue_ai_job(self, request, kind, serializer_class):
+        """Validate an AI generation request and queue it as a background
+        job (see ai_jobs.py). Returns the job at once with 202; progress and
+        the result arrive over ws/blog/ai-jobs/ or from /api/blog/ai-jobs/<id>/."""
+        serializer = serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
+        job = ai_jobs.enqueue(request.user, kind, serializer.validated_data)
+        return Response(ai_jobs.serialize(job), status=status.HTTP_202_ACCEPTED)
 
-        try:
-            ai_service = AIService()
-            result = ai_service.generate_full_post(
-                topic=serializer.validated_data['topic'],
-                keywords=serializer.validated_data.get('keywords'),
-                tone=serializer.validated_data.get('tone', 'professional')
-            )
-
-            if 'error' in result:
-                return Response(
-                    {'error': result['error'], 'raw_response': result.get('raw_response')},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-
-            return Response(result)
-        except Exception as e:
-            return Response(
-                {'error': str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
+    def ai_generate_post(self, request):
+        """Generate a complete blog post using AI (background job)."""
+        return self._enqueue_ai_job(request, 'post', AIGeneratePostSerializer)
 
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
     def ai_generate_section(self, request):
-        """Generate a specific section using AI."""
-        serializer = AIGenerateSectionSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-
-        try:
-            ai_service = AIService()
-            result = ai_service.generate_section(
-                section_type=serializer.validated_data['section_type'],
-                context=serializer.validated_data['context'],
-                existing_content=serializer.validated_data.get('existing_content')
-            )
-
-            if 'error' in result:
-                return Response(
-                    {'error': result['error']},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-
-            return Response(result)
-        except Exception as e:
-            return Response(
-                {'error': str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        """Generate a specific section using AI (background job)."""
+        return self._enqueue_ai_job(request, 'section', AIGenerateSectionSerializer)
 
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
     def ai_generate_seo(self, request):
-        """Generate SEO metadata using AI."""
-        serializer = AIGenerateSEOSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-
-        try:
-            ai_service = AIService()
-            result = ai_service.generate_seo(
-                title=serializer.validated_data['title'],
-                content=serializer.validated_data['content']
-            )
-
-            if 'error' in result:
-                return Response(
-                    {'error': result['error']},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-
-            return Response(result)
-        except Exception as e:
-            return Response(
-                {'error': str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        """Generate SEO metadata using AI (background job)."""
+        return self._enqueue_ai_job(request, 'seo', AIGenerateSEOSerializer)
 
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
     def upload_image(self, request):
@@ -317,64 +283,15 @@ class BlogPostViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
     def ai_enhance_prompt(self, request):
-        """Enhance an image generation prompt using AI."""
+        """Enhance an image generation prompt using AI (background job)."""
         from .serializers import AIEnhancePromptSerializer
-
-        serializer = AIEnhancePromptSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-
-        try:
-            from .services import ImageGenerationService
-            service = ImageGenerationService()
-            enhanced = service.enhance_prompt(
-                prompt=serializer.validated_data['prompt'],
-                context=serializer.validated_data.get('context')
-            )
-            return Response({'enhanced_prompt': enhanced})
-        except Exception as e:
-            return Response(
-                {'error': str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        return self._enqueue_ai_job(request, 'enhance_prompt', AIEnhancePromptSerializer)
 
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
     def ai_generate_image(self, request):
-        """Generate an image using AI."""
+        """Generate an image using AI (background job)."""
         from .serializers import AIGenerateImageSerializer
-
-        serializer = AIGenerateImageSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-
-        try:
-            from .services import ImageGenerationService
-            service = ImageGenerationService()
-
-            prompt = serializer.validated_data['prompt']
-
-            # Optionally enhance the prompt first
-            if serializer.validated_data.get('enhanced'):
-                prompt = service.enhance_prompt(
-                    prompt=prompt,
-                    context=serializer.validated_data.get('context')
-                )
-
-            result = service.generate_image(
-                prompt=prompt,
-                aspect_ratio=serializer.validated_data['aspect_ratio']
-            )
-
-            if 'error' in result:
-                return Response(
-                    {'error': result['error']},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            return Response(result)
-        except Exception as e:
-            return Response(
-                {'error': str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        return self._enqueue_ai_job(request, 'image', AIGenerateImageSerializer)
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsAdminUser])
     def ai_image_options(self, request):
@@ -424,7 +341,7 @@ class BlogPostViewSet(viewsets.ModelViewSet):
             Q(status='scheduled', scheduled_publish_date__range=[start_date, end_date]) |
             Q(status='published', publish_date__range=[start_date, end_date]) |
             Q(status='draft', created_at__range=[start_date, end_date])
-        ).prefetch_related('categories').order_by('scheduled_publish_date', 'publish_date', 'created_at')
+        ).summaries().prefetch_related('categories').order_by('scheduled_publish_date', 'publish_date', 'created_at')
 
         serializer = BlogPostCalendarSerializer(posts, many=True)
         return Response(serializer.data)
@@ -488,10 +405,19 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         legacy-invalid data (e.g. missing related_service_page), exactly as
         it did here. Only publish_changes and the generic create/update
         flow -- the actual "am I allowed to publish this" boundaries --
-        still go through post.save() and get the real check."""
+        still go through post.save() and get the real check.
+
+        .update() also skips save()'s derived columns (DERIVED_FIELDS) and
+        sends no post_save, so those, the internal-link term index and the
+        search index are refreshed here instead (see blog/signals.py)."""
+        if DERIVED_FROM & set(update_fields):
+            update_fields = list(update_fields) + post.refresh_derived_fields()
         BlogPost.objects.filter(pk=post.pk).update(
             **{f: getattr(post, f) for f in update_fields}
         )
+        if INDEXED_FIELDS & set(update_fields):
+            index_post(post)
+            search.index_post(post)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
     def autosave(self, request, slug=None):
@@ -603,6 +529,8 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         marker_pattern = r'<span[^>]*data-media-marker="' + re.escape(media_id) + r'"[^>]*>\s*</span>'
         content = self._effective_content(post)
 
+        entry.pop('derivatives', None)
+        queue_derivatives = False
         if request.data.get('status') == 'skipped':
             entry['status'] = 'skipped'
             entry['resolved_source'] = None
@@ -653,12 +581,24 @@ class BlogPostViewSet(viewsets.ModelViewSet):
                 # ResizableImage.addAttributes -- it's registered there too, or
                 # the editor would strip it the first time this node round-trips).
                 replacement = f'<img src="{resolved_url}" alt="{alt_text}" data-media-id="{media_id}" loading="lazy" />'
+                # Only the intrinsic size now; generate_image_derivatives adds
+                # srcset/sizes once the derivative files actually exist (see
+                # services/image_derivatives.py).
+                key = blog_media_key_from_url(resolved_url)
+                manifest = image_derivatives.plan(key) if key else None
+                if manifest is not None:
+                    queue_derivatives = True
+                    replacement = image_derivatives.apply_responsive_attrs(
+                        replacement, media_id, manifest, srcset=False
+                    )
 
             content = re.sub(marker_pattern, replacement, content, count=1)
 
         post.media_plan = media_plan
         update_fields = self._save_effective_content(post, content) + ['media_plan']
         self._persist_post(post, update_fields)
+        if queue_derivatives:
+            transaction.on_commit(lambda: generate_image_derivatives.delay(post.pk))
         return Response(BlogPostDetailSerializer(post, context={'request': request}).data)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsAdminUser])
@@ -863,23 +803,12 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         left untouched; only entries still 'suggested' get replaced -- useful
         for a post imported early in the content calendar to pick up better
         matches once more posts exist later."""
-        from .services import suggest_internal_links, insert_link_markers
+        from .services import suggest_internal_links, replace_suggested_links
 
         post = self.get_object()
-        existing = post.suggested_links or []
-        kept = [item for item in existing if item.get('status') != 'suggested']
-
-        content = self._effective_content(post)
-        for item in existing:
-            if item.get('status') == 'suggested':
-                pattern = r'<span[^>]*data-link-marker="' + re.escape(str(item.get('id'))) + r'"[^>]*>\s*</span>'
-                content = re.sub(pattern, '', content)
-
-        next_id = max([item.get('id', 0) for item in kept], default=0) + 1
-        new_suggestions = suggest_internal_links(post)
-        content, new_links = insert_link_markers(content, new_suggestions, start_id=next_id)
-
-        post.suggested_links = kept + new_links
+        content, post.suggested_links = replace_suggested_links(
+            self._effective_content(post), post.suggested_links, suggest_internal_links(post)
+        )
         update_fields = self._save_effective_content(post, content) + ['suggested_links']
         self._persist_post(post, update_fields)
         return Response(BlogPostDetailSerializer(post, context={'request': request}).data)
@@ -20,6 +20,7 @@ from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
 from notifications.middleware import JWTAuthMiddlewareStack
 from notifications.routing import websocket_urlpatterns
+from blog.routing import websocket_urlpatterns as blog_websocket_urlpatterns
 
 
 application = ProtocolTypeRouter({
@@ -28,7 +29,7 @@ application = ProtocolTypeRouter({
     # WebSocket connections use JWT authentication
     'websocket': AllowedHostsOriginValidator(
         JWTAuthMiddlewareStack(
-            URLRouter(websocket_urlpatterns)
+            URLRouter(websocket_urlpatterns + blog_websocket_urlpatterns)
         )
     ),
 })
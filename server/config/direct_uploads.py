@@ -0,0 +1,203 @@
+"""
+Direct uploads: the browser sends large media straight to storage instead
+of streaming a multipart body through Daphne, where Django buffers the
+whole thing before it ever reaches R2.
+
+1. The client asks the owning endpoint for an upload URL (e.g.
+   POST /api/projects/<pk>/upload-url/ {target, filename, content_type,
+   size}). issue() checks the type and size against the target and returns
+   {method: 'PUT', url, headers, token, key, expires_in}.
+   - R2 (S3Boto3Storage): a presigned PUT straight to the bucket. R2 has
+     no presigned POST policies, so the size can't be enforced by the
+     bucket; claim() checks it afterwards. The bucket needs a CORS rule
+     allowing PUT from the site's origin.
+   - Local disk: PUT /api/uploads/<token>/ (DirectUploadView), which
+     receive() streams to storage in chunks, without multipart parsing.
+2. The client PUTs the raw file to `url` with `headers`.
+3. The client sends `upload_token` to the same endpoint that takes a file
+   upload (gallery create, main-video, phase media, upload_photo). claim()
+   checks the object landed with the declared size and hands back its key,
+   which the view assigns to the FileField -- saving the row fires the
+   usual post-processing (convert_image_to_webp for gallery images).
+
+The token is signed (django.core.signing) and carries the target, key,
+size and `scope` -- the object it was issued for, e.g. 'project:12' -- so
+it can only be attached where it was asked for, and only once. Objects
+uploaded but never claimed are left in storage.
+"""
+import mimetypes
+import os
+import tempfile
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.urls import reverse
+from rest_framework.exceptions import ValidationError
+
+from .media_utils import slugify_filename
+from .storage_adapter import is_s3
+
+SALT = 'config.direct_uploads'
+CHUNK_SIZE = 1024 * 1024
+
+# target -> (model, FileField name, accepted kind)
+TARGETS = {
+    'gallery_image': ('gallery.GalleryImage', 'image', 'image'),
+    'project_media': ('projects.ProjectMedia', 'file', 'media'),
+    'project_main_video': ('projects.Project', 'main_video', 'video'),
+    'customer_photo': ('quotes.CustomerPhoto', 'image', 'image'),
+    'estimate_photo': ('quotes.EstimatePhoto', 'image', 'image'),
+    'estimate_visit_photo': ('quotes.EstimateVisitPhoto', 'image', 'image'),
+}
+CONTENT_TYPES = {
+    'image': ('image/',),
+    'video': ('video/',),
+    'media': ('image/', 'video/'),
+}
+
+
+def _field(target):
+    model_label, field_name, _ = TARGETS[target]
+    return apps.get_model(model_label)._meta.get_field(field_name)
+
+
+def _max_bytes(kind):
+    if kind == 'image':
+        return getattr(settings, 'DIRECT_UPLOAD_MAX_IMAGE_MB', 25) * 1024 * 1024
+    return getattr(settings, 'DIRECT_UPLOAD_MAX_VIDEO_MB', 2048) * 1024 * 1024
+
+
+def _expires_in():
+    return getattr(settings, 'DIRECT_UPLOAD_EXPIRE_SECONDS', 15 * 60)
+
+
+def prepare(target, data):
+    """Validate an upload request ({filename, content_type, size}) for
+    `target` and pick the storage key it will land at. Returns
+    (key, content_type, size)."""
+    if target not in TARGETS:
+        raise ValidationError({'target': f'Unknown upload target {target!r}.'})
+    kind = TARGETS[target][2]
+    filename = (data.get('filename') or '').strip()
+    # Browsers leave File.type empty for extensions they don't know.
+    content_type = (data.get('content_type') or mimetypes.guess_type(filename)[0] or '').strip().lower()
+    try:
+        size = int(data.get('size'))
+    except (TypeError, ValueError):
+        raise ValidationError({'size': 'File size in bytes is required.'})
+
+    if not filename:
+        raise ValidationError({'filename': 'File name is required.'})
+    if not content_type.startswith(CONTENT_TYPES[kind]):
+        raise ValidationError({'content_type': f'Unsupported file type {content_type or "(none)"} for this upload.'})
+    if size <= 0 or size > _max_bytes(kind):
+        raise ValidationError({'size': f'File must be between 1 byte and {_max_bytes(kind) // (1024 * 1024)} MB.'})
+
+    stem, ext = os.path.splitext(filename)
+    ext = ext.lower() or mimetypes.guess_extension(content_type) or ''
+    # A fresh suffix per upload, so the key is never taken and storage.save()
+    # (local) keeps it as-is.
+    key = _field(target).generate_filename(None, f'{slugify_filename(stem)}-{uuid.uuid4().hex[:12]}{ext}')
+    return key, content_type, size
+
+
+def sign(target, key, size, content_type, scope):
+    """The upload token claim() accepts for the object at `key`."""
+    return signing.dumps(
+        {'target': target, 'key': key, 'size': size, 'content_type': content_type, 'scope': scope},
+        salt=SALT,
+    )
+
+
+def storage_for(target):
+    return _field(target).storage
+
+
+def is_attached(target, key):
+    """True if a row of `target`'s model already points at `key`."""
+    field = _field(target)
+    return field.model._default_manager.filter(**{field.name: key}).exists()
+
+
+def issue(request, target, scope):
+    """Validate request.data ({filename, content_type, size}) for `target`
+    and return the upload instructions for the client."""
+    key, content_type, size = prepare(target, request.data)
+    token = sign(target, key, size, content_type, scope)
+
+    storage = storage_for(target)
+    if is_s3(storage):
+        url = storage.connection.meta.client.generate_presigned_url(
+            'put_object',
+            Params={'Bucket': storage.bucket_name, 'Key': key, 'ContentType': content_type},
+            ExpiresIn=_expires_in(),
+            HttpMethod='PUT',
+        )
+    else:
+        url = request.build_absolute_uri(reverse('direct_upload', args=[token]))
+    return {
+        'method': 'PUT',
+        'url': url,
+        'headers': {'Content-Type': content_type},
+        'token': token,
+        'key': key,
+        'expires_in': _expires_in(),
+    }
+
+
+def _load(token, max_age):
+    try:
+        return signing.loads(token, salt=SALT, max_age=max_age)
+    except signing.SignatureExpired:
+        raise ValidationError({'upload_token': 'Upload token has expired.'})
+    except signing.BadSignature:
+        raise ValidationError({'upload_token': 'Invalid upload token.'})
+
+
+def receive(token, stream):
+    """Local-disk counterpart of the presigned PUT: write the request body
+    `stream` to the token's key, refusing anything longer than declared."""
+    data = _load(token, _expires_in())
+    storage = _field(data['target']).storage
+    if is_s3(storage):
+        raise ValidationError({'upload_token': 'This upload goes directly to the bucket.'})
+
+    with tempfile.NamedTemporaryFile(dir=getattr(settings, 'FILE_UPLOAD_TEMP_DIR', None)) as tmp:
+        written = 0
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            written += len(chunk)
+            if written > data['size']:
+                raise ValidationError({'detail': 'Upload is larger than the declared size.'})
+            tmp.write(chunk)
+        if written != data['size']:
+            raise ValidationError({'detail': f'Received {written} of {data["size"]} bytes.'})
+        tmp.seek(0)
+        saved = storage.save(data['key'], File(tmp))
+    if saved != data['key']:
+        storage.delete(saved)
+        raise ValidationError({'detail': 'Upload key is already taken.'})
+    return saved
+
+
+def claim(token, target, scope):
+    """Check a finished upload for `target`/`scope` and return its storage
+    key, ready to assign to the model's FileField."""
+    data = _load(token, getattr(settings, 'DIRECT_UPLOAD_CLAIM_SECONDS', 24 * 60 * 60))
+    if data['target'] != target or data['scope'] != scope:
+        raise ValidationError({'upload_token': 'Upload token was issued for something else.'})
+
+    field = _field(target)
+    key = data['key']
+    if is_attached(target, key):
+        raise ValidationError({'upload_token': 'This upload has already been attached.'})
+    try:
+        size = field.storage.size(key)
+    except Exception:
+        raise ValidationError({'upload_token': 'The file has not been uploaded yet.'})
+    if size != data['size']:
+        field.storage.delete(key)
+        raise ValidationError({'upload_token': f'Uploaded file is {size} bytes, expected {data["size"]}.'})
+    return key
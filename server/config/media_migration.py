@@ -0,0 +1,247 @@
+"""
+Shared engine behind the migrate_{blog,gallery,financial}_media_to_r2
+commands: copies files that still live under MEDIA_ROOT into a storage
+backend (R2 via S3Boto3Storage, or any other Django Storage), then rewrites
+the database references that point at them.
+
+Each command collects the keys it references, hands them to
+MediaMigration.upload() -- which returns {local key: key in the destination
+storage} -- and applies its reference rewrites through apply_updates().
+
+- Uploads run on a thread pool (--workers, default MEDIA_MIGRATION_WORKERS).
+  Files over MULTIPART_THRESHOLD go up as concurrent multipart uploads via
+  boto3's transfer manager.
+- Before uploading, the destination is checked: an object already at the
+  key with the same size and the same checksum (sha256 metadata written by
+  this engine, or the single-part ETag md5) is skipped, not re-sent. An
+  object with different content is kept; the file goes to a fresh key,
+  unless the storage overwrites by design (financial PDFs).
+- Every finished key is written to a JSON checkpoint (atomically replaced,
+  same format as regenerate_pdfs). Re-running after an interruption skips
+  straight past everything already done; a checkpoint written for a
+  different destination is ignored, --reset discards it.
+- Progress is reported every PROGRESS_INTERVAL seconds (files, bytes, MB/s,
+  ETA), plus a summary at the end.
+- apply_updates() writes the reference rewrites in batches of
+  MEDIA_MIGRATION_BATCH_SIZE rows, one transaction per batch.
+"""
+import hashlib
+import json
+import mimetypes
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+
+from .storage_adapter import is_s3
+
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 16 * 1024 * 1024
+PROGRESS_INTERVAL = 5  # seconds
+CHECKPOINT_INTERVAL = 2  # seconds between checkpoint writes while uploading
+
+
+def destination_label(storage):
+    """Identifies where `storage` writes to, for the checkpoint signature."""
+    if is_s3(storage):
+        return f's3:{storage.bucket_name}'
+    return f'local:{getattr(storage, "location", "")}'
+
+
+def _digests(path):
+    md5, sha256 = hashlib.md5(), hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            md5.update(chunk)
+            sha256.update(chunk)
+    return md5.hexdigest(), sha256.hexdigest()
+
+
+def _same_object(head, size, md5, sha256):
+    if head['ContentLength'] != size:
+        return False
+    return head.get('Metadata', {}).get('sha256') == sha256 or head.get('ETag', '').strip('"') == md5
+
+
+class MediaMigration:
+    """One migration run: uploads to `storage`, checkpointed at
+    `checkpoint_path`, reporting to `stdout` (a command's self.stdout)."""
+
+    def __init__(self, storage, checkpoint_path, stdout, workers=None, dry_run=False, reset=False):
+        self.storage = storage
+        self.checkpoint_path = checkpoint_path
+        self.stdout = stdout
+        self.workers = workers or getattr(settings, 'MEDIA_MIGRATION_WORKERS', 8)
+        self.dry_run = dry_run
+        self.signature = {'destination': destination_label(storage)}
+        self.done = {} if dry_run else self._load_checkpoint(reset)
+        self.stats = {'uploaded': 0, 'skipped': 0, 'resumed': 0, 'missing': 0, 'failed': 0, 'bytes': 0}
+        self._transfer_config = None
+
+    # -- checkpoint --------------------------------------------------------
+
+    def _load_checkpoint(self, reset):
+        path = self.checkpoint_path
+        if reset or not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('signature') != self.signature:
+            self.stdout.write(f'Checkpoint {path} was written for a different destination; starting over.')
+            return {}
+        return data.get('done', {})
+
+    def _save_checkpoint(self):
+        tmp_path = f'{self.checkpoint_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'signature': self.signature, 'done': self.done}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    # -- transfer ----------------------------------------------------------
+
+    def _s3_transfer_config(self):
+        if self._transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+            self._transfer_config = TransferConfig(
+                multipart_threshold=MULTIPART_THRESHOLD,
+                multipart_chunksize=MULTIPART_CHUNKSIZE,
+                max_concurrency=4,
+            )
+        return self._transfer_config
+
+    def _transfer(self, key):
+        """Pool worker. Returns (status, destination key, size in bytes)."""
+        local_path = os.path.join(settings.MEDIA_ROOT, key)
+        if not os.path.isfile(local_path):
+            return 'missing', None, 0
+        size = os.path.getsize(local_path)
+        if self.dry_run:
+            return 'uploaded', key, size
+        if is_s3(self.storage):
+            return self._transfer_s3(key, local_path, size)
+        return self._transfer_storage(key, local_path, size)
+
+    def _transfer_s3(self, key, local_path, size):
+        from botocore.exceptions import ClientError
+
+        # storage.connection is a per-thread boto3 resource; its client is
+        # safe to use from this thread.
+        client = self.storage.connection.meta.client
+        bucket = self.storage.bucket_name
+        md5, sha256 = _digests(local_path)
+        try:
+            head = client.head_object(Bucket=bucket, Key=key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+                raise
+            head = None
+
+        target = key
+        if head is not None:
+            if _same_object(head, size, md5, sha256):
+                return 'skipped', key, size
+            if not self.storage.file_overwrite:
+                target = self.storage.get_available_name(key)
+
+        extra_args = dict(self.storage.get_object_parameters(target))
+        content_type = mimetypes.guess_type(target)[0]
+        if content_type:
+            extra_args.setdefault('ContentType', content_type)
+        extra_args['Metadata'] = {**extra_args.get('Metadata', {}), 'sha256': sha256}
+        client.upload_file(local_path, bucket, target, ExtraArgs=extra_args, Config=self._s3_transfer_config())
+        return 'uploaded', target, size
+
+    def _transfer_storage(self, key, local_path, size):
+        if self.storage.exists(key):
+            if self.storage.size(key) == size:
+                return 'skipped', key, size
+        with open(local_path, 'rb') as f:
+            return 'uploaded', self.storage.save(key, File(f)), size
+
+    def upload(self, keys):
+        """Make sure every key in `keys` (relative to MEDIA_ROOT) is in the
+        destination storage. Returns {key: destination key}; keys with no
+        local file (and no checkpoint entry) or whose upload failed are left
+        out, so their references stay untouched."""
+        keys = list(dict.fromkeys(key for key in keys if key))
+        results = {}
+        todo = []
+        for key in keys:
+            if key in self.done:
+                results[key] = self.done[key]
+                self.stats['resumed'] += 1
+            else:
+                todo.append(key)
+        if self.stats['resumed']:
+            self.stdout.write(f'{self.stats["resumed"]} file(s) already done in checkpoint {self.checkpoint_path}')
+        if not todo:
+            return results
+
+        started = last_report = last_save = time.monotonic()
+        processed = 0
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(todo))) as pool:
+            futures = {pool.submit(self._transfer, key): key for key in todo}
+            for future in as_completed(futures):
+                key = futures[future]
+                processed += 1
+                try:
+                    status, new_key, size = future.result()
+                except Exception as e:
+                    self.stats['failed'] += 1
+                    self.stdout.write(f'  FAILED {key}: {e}')
+                    continue
+                self.stats[status] += 1
+                if status == 'missing':
+                    continue
+                self.stats['bytes'] += size
+                results[key] = new_key
+                if self.dry_run:
+                    continue
+                self.done[key] = new_key
+                now = time.monotonic()
+                if now - last_save >= CHECKPOINT_INTERVAL:
+                    self._save_checkpoint()
+                    last_save = now
+                if now - last_report >= PROGRESS_INTERVAL:
+                    self._report(processed, len(todo), started)
+                    last_report = now
+
+        if not self.dry_run:
+            self._save_checkpoint()
+        self._report(processed, len(todo), started)
+        return results
+
+    def _report(self, processed, total, started):
+        elapsed = time.monotonic() - started
+        rate = processed / elapsed if elapsed else 0
+        eta = (total - processed) / rate if rate else 0
+        mb = self.stats['bytes'] / (1024 * 1024)
+        self.stdout.write(
+            f'{processed}/{total} file(s) | {mb:.1f} MB | {mb / elapsed if elapsed else 0:.1f} MB/s | '
+            f'{rate:.1f} files/s | ETA {int(eta // 60)}m{int(eta % 60):02d}s'
+        )
+
+    # -- references --------------------------------------------------------
+
+    def apply_updates(self, model, updates):
+        """Apply [(pk, {field: value})] to `model` rows in batched
+        transactions (raw .update(), no save() side effects). No-op on a
+        dry run."""
+        if self.dry_run:
+            return
+        batch_size = getattr(settings, 'MEDIA_MIGRATION_BATCH_SIZE', 200)
+        for start in range(0, len(updates), batch_size):
+            with transaction.atomic():
+                for pk, fields in updates[start:start + batch_size]:
+                    model.objects.filter(pk=pk).update(**fields)
+
+    def summary(self):
+        s = self.stats
+        return (
+            f'{s["uploaded"]} file(s) uploaded, {s["skipped"]} already present, '
+            f'{s["resumed"]} resumed from checkpoint, {s["failed"]} failed, '
+            f'{s["missing"]} reference(s) pointed at a missing local file (left untouched)'
+        )
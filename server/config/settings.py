@@ -6,6 +6,7 @@ Generated by 'django-admin startproject' using Django 5.0.1.
 
 from pathlib import Path
 from datetime import timedelta
+import json
 import os
 from dotenv import load_dotenv
 
@@ -207,6 +208,54 @@ R2_CUSTOM_DOMAIN = R2_PUBLIC_URL.replace('https://', '').replace('http://', '')
 # not derived by probing the storage backend at request time.
 MEDIA_PUBLIC_URL_PREFIX = f'{R2_PUBLIC_URL}/' if USE_R2_STORAGE else MEDIA_URL
 
+# How long the media storage helpers trust a cached exists() answer, in
+# seconds (config/storage_adapter.py).
+STORAGE_EXISTS_CACHE_SECONDS = int(os.environ.get('STORAGE_EXISTS_CACHE_SECONDS', 10))
+
+# migrate_*_media_to_r2 (config/media_migration.py): concurrent uploads, and
+# rows per reference-rewrite transaction.
+MEDIA_MIGRATION_WORKERS = int(os.environ.get('MEDIA_MIGRATION_WORKERS', 8))
+MEDIA_MIGRATION_BATCH_SIZE = int(os.environ.get('MEDIA_MIGRATION_BATCH_SIZE', 200))
+
+# Direct-to-storage uploads (config/direct_uploads.py): how long an issued
+# upload URL is valid, how long the finished upload can still be attached,
+# and the size caps per kind of file.
+DIRECT_UPLOAD_EXPIRE_SECONDS = int(os.environ.get('DIRECT_UPLOAD_EXPIRE_SECONDS', 15 * 60))
+DIRECT_UPLOAD_CLAIM_SECONDS = int(os.environ.get('DIRECT_UPLOAD_CLAIM_SECONDS', 24 * 60 * 60))
+DIRECT_UPLOAD_MAX_IMAGE_MB = int(os.environ.get('DIRECT_UPLOAD_MAX_IMAGE_MB', 25))
+DIRECT_UPLOAD_MAX_VIDEO_MB = int(os.environ.get('DIRECT_UPLOAD_MAX_VIDEO_MB', 2048))
+
+# Resumable project video uploads (projects/chunked_uploads.py): chunk size
+# (5 MB minimum, S3's smallest multipart part), where local uploads collect
+# their chunks, and how long an untouched upload is kept before cleanup.
+CHUNKED_UPLOAD_CHUNK_MB = int(os.environ.get('CHUNKED_UPLOAD_CHUNK_MB', 8))
+CHUNKED_UPLOAD_TEMP_DIR = os.environ.get('CHUNKED_UPLOAD_TEMP_DIR', '')
+CHUNKED_UPLOAD_EXPIRE_HOURS = int(os.environ.get('CHUNKED_UPLOAD_EXPIRE_HOURS', 24))
+
+# Web renditions of project videos (projects/video_pipeline.py): ffmpeg
+# binaries, long-edge and bitrate caps of the H.264 MP4, its quality (CRF),
+# whether to also cut HLS segments, and the per-ffmpeg-run timeout.
+FFMPEG_BINARY = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
+FFPROBE_BINARY = os.environ.get('FFPROBE_BINARY', 'ffprobe')
+PROJECT_VIDEO_MAX_DIMENSION = int(os.environ.get('PROJECT_VIDEO_MAX_DIMENSION', 1920))
+PROJECT_VIDEO_MAXRATE_KBPS = int(os.environ.get('PROJECT_VIDEO_MAXRATE_KBPS', 6000))
+PROJECT_VIDEO_CRF = int(os.environ.get('PROJECT_VIDEO_CRF', 23))
+PROJECT_VIDEO_HLS = os.environ.get('PROJECT_VIDEO_HLS', 'False') == 'True'
+PROJECT_VIDEO_TIMEOUT = int(os.environ.get('PROJECT_VIDEO_TIMEOUT', 60 * 60))
+
+# Responsive derivatives of inline blog images (see
+# blog/services/image_derivatives.py). AVIF is much slower to encode and is
+# only produced if Pillow was built with it.
+BLOG_IMAGE_WIDTHS = [int(w) for w in os.environ.get('BLOG_IMAGE_WIDTHS', '400,800,1200,1600').split(',')]
+BLOG_IMAGE_AVIF = os.environ.get('BLOG_IMAGE_AVIF', 'False') == 'True'
+BLOG_IMAGE_WORKERS = int(os.environ.get('BLOG_IMAGE_WORKERS', os.cpu_count() or 1))
+
+# import_content_drafts candidate prefetch (blog/services/media_plan_service.py):
+# placeholders fetched at once, and per-provider limits overriding
+# DEFAULT_LIMITS there, e.g. {"generate_image": {"per_minute": 10}}.
+MEDIA_PREFETCH_WORKERS = int(os.environ.get('MEDIA_PREFETCH_WORKERS', 8))
+MEDIA_PREFETCH_LIMITS = json.loads(os.environ.get('MEDIA_PREFETCH_LIMITS', '{}'))
+
 # --- Financial document storage: local disk by default, private Cloudflare R2
 # bucket in production (see quotes/storage.py) ---
 # Scoped to the quotes app only (quote/invoice/receipt/estimate PDFs) -- every
@@ -231,6 +280,19 @@ USE_R2_FINANCIAL_STORAGE = bool(
 # mid-read, short enough that a leaked link doesn't stay live indefinitely.
 R2_FINANCIAL_URL_EXPIRE_SECONDS = int(os.environ.get('R2_FINANCIAL_URL_EXPIRE_SECONDS', 60 * 60 * 24))  # 24h
 
+# Quote/invoice PDFs are re-rendered in the background after each save (see
+# quotes/pdf_jobs.py). Saves landing within the debounce window of each other
+# collapse into one render; generate_pdf waits up to PDF_RENDER_WAIT_SECONDS
+# on that render before handing back a job status to poll instead. A render
+# lock older than PDF_RENDER_LOCK_TIMEOUT is assumed to belong to a dead worker.
+PDF_RENDER_DEBOUNCE_SECONDS = int(os.environ.get('PDF_RENDER_DEBOUNCE_SECONDS', 3))
+PDF_RENDER_WAIT_SECONDS = int(os.environ.get('PDF_RENDER_WAIT_SECONDS', 30))
+PDF_RENDER_LOCK_TIMEOUT = 5 * 60
+# Local copies of remote images referenced by PDF templates (company logo
+# etc.), fetched once per file -- see quotes/pdf_engine.py. Keep it under
+# BASE_DIR: xhtml2pdf only reads local files below the working directory.
+PDF_ASSET_CACHE_DIR = os.environ.get('PDF_ASSET_CACHE_DIR', str(BASE_DIR / '.pdf-asset-cache'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -296,7 +358,11 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    # Resumable video uploads (projects/chunked_uploads.py)
+    'upload-offset',
+    'upload-checksum',
 ]
+CORS_EXPOSE_HEADERS = ['upload-offset']
 
 
 # Cache Configuration
@@ -314,6 +380,13 @@ CACHES = {
 # Cache timeouts for different resources
 CACHE_TTL_CATEGORIES = 60 * 10  # 10 minutes
 CACHE_TTL_GALLERY = 60 * 5  # 5 minutes
+# Upper bound on stats/dashboard staleness (notifications/stats.py). Saves
+# invalidate immediately in the process that made them; with the per-process
+# LocMemCache other workers catch up within this window.
+STATS_CACHE_SECONDS = int(os.environ.get('STATS_CACHE_SECONDS', 60))
+# Same bound for the cached public project lists (projects/listing.py),
+# invalidated on every project, phase and media write.
+PROJECT_LIST_CACHE_SECONDS = int(os.environ.get('PROJECT_LIST_CACHE_SECONDS', 60 * 5))
 
 
 # Celery Configuration
@@ -326,6 +399,26 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
 
+# PDF rendering runs on its own queue so a dedicated, pre-warmed worker pool
+# (see quotes/pdf_engine.py) serves it and a burst of renders can't starve
+# email/notification tasks. Workers must consume the 'pdf' queue
+# (celery -A config worker -Q pdf) for these to run.
+CELERY_TASK_ROUTES = {
+    'quotes.tasks.render_pdf_job': {'queue': 'pdf'},
+    'quotes.tasks.generate_quote_pdf': {'queue': 'pdf'},
+    'quotes.tasks.generate_invoice_pdf': {'queue': 'pdf'},
+    'quotes.tasks.generate_installment_receipt_pdf': {'queue': 'pdf'},
+    'quotes.tasks.generate_invoice_receipt_pdf': {'queue': 'pdf'},
+    'quotes.tasks.regenerate_pdf_batch': {'queue': 'pdf'},
+    # Editor AI generations (blog/ai_jobs.py) are network-bound and slow, so
+    # they get their own thread-pool worker (celery -A config worker -Q ai
+    # --pool=threads) rather than holding prefork slots other tasks need.
+    'blog.tasks.run_ai_job': {'queue': 'ai'},
+    # Project video renditions (projects/video_pipeline.py) are long,
+    # CPU-heavy ffmpeg runs: a separate low-concurrency worker (-Q video).
+    'projects.tasks.process_project_video': {'queue': 'video'},
+}
+
 # Celery Beat Schedule (periodic tasks)
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
@@ -334,10 +427,44 @@ from celery.schedules import crontab
 CELERY_BEAT_SCHEDULE = {
     'publish-scheduled-blog-posts': {
         'task': 'blog.tasks.publish_scheduled_posts',
-        'schedule': crontab(minute='*/5'),  # Every 5 minutes
+        'schedule': crontab(minute='*/5'),  # Safety sweep; posts normally publish from their ETA task
+    },
+    'refresh-daily-stats': {
+        'task': 'notifications.tasks.refresh_daily_stats',
+        'schedule': crontab(minute='*/15'),  # Every 15 minutes
+    },
+    'reconcile-unread-counts': {
+        'task': 'notifications.tasks.reconcile_unread_counts',
+        'schedule': crontab(minute=7),  # Hourly
+    },
+    'cleanup-blog-ai-jobs': {
+        'task': 'blog.tasks.cleanup_ai_jobs',
+        'schedule': crontab(minute='*/15'),  # Every 15 minutes
+    },
+    'prune-blog-ai-cache': {
+        'task': 'blog.tasks.prune_ai_cache',
+        'schedule': crontab(hour=4, minute=30),  # Daily at 4:30 AM
+    },
+    'cleanup-project-video-uploads': {
+        'task': 'projects.tasks.cleanup_video_uploads',
+        'schedule': crontab(minute=40),  # Hourly
     },
 }
 
+# Background editor AI jobs (blog/ai_jobs.py): per-request time limit for
+# Gemini calls (enforced by the client, since the 'ai' worker's threads pool
+# ignores Celery time limits), and how long finished jobs (and their
+# results) are kept.
+AI_JOB_TIME_LIMIT = int(os.environ.get('AI_JOB_TIME_LIMIT', 5 * 60))
+AI_JOB_RETENTION_DAYS = int(os.environ.get('AI_JOB_RETENTION_DAYS', 7))
+
+# Memoized AI text generations (blog/services/ai_cache.py): entry lifetime,
+# total size budget, and how long a duplicate request waits on the first.
+AI_CACHE_ENABLED = os.environ.get('AI_CACHE_ENABLED', 'True') == 'True'
+AI_CACHE_MAX_AGE_DAYS = int(os.environ.get('AI_CACHE_MAX_AGE_DAYS', 30))
+AI_CACHE_MAX_BYTES = int(os.environ.get('AI_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+AI_CACHE_INFLIGHT_TIMEOUT = int(os.environ.get('AI_CACHE_INFLIGHT_TIMEOUT', 180))
+
 
 # WhiteNoise settings for static files
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
@@ -363,6 +490,12 @@ SERVER_EMAIL = DEFAULT_FROM_EMAIL
 # Frontend URL for redirects
 FRONTEND_URL = os.environ.get('FRONTEND_URL', 'https://tolatiles.com')
 
+# After scheduled posts go live, blog.tasks.warm_blog_caches requests their
+# public pages once the Next.js ISR window (revalidate: 60) has passed, so the
+# first visitor gets a fresh render. Empty disables warming.
+BLOG_CACHE_WARM_BASE_URL = os.environ.get('BLOG_CACHE_WARM_BASE_URL', '' if DEBUG else FRONTEND_URL)
+BLOG_CACHE_WARM_DELAY = int(os.environ.get('BLOG_CACHE_WARM_DELAY', '61'))
+
 # Public origin for media URLs returned by the API. Server-side fetches from the
 # Next.js frontend hit this backend directly at http://backend:8000 (see 'backend'
 # in ALLOWED_HOSTS above), bypassing nginx to dodge its public rate limiter. If we
@@ -401,10 +534,20 @@ CHANNEL_LAYERS = {
 }
 
 
+# Per-user unread notification counters (notifications/unread.py)
+UNREAD_COUNTER_REDIS_URL = os.environ.get(
+    'UNREAD_COUNTER_REDIS_URL', f"redis://{os.environ.get('REDIS_HOST', 'localhost')}:6379/0"
+)
+UNREAD_COUNTER_TTL = 60 * 60
+
+
 # Web Push (VAPID) Configuration
 VAPID_PUBLIC_KEY = os.environ.get('VAPID_PUBLIC_KEY', '')
 VAPID_PRIVATE_KEY = os.environ.get('VAPID_PRIVATE_KEY', '')
 VAPID_CLAIMS_EMAIL = os.environ.get('VAPID_CLAIMS_EMAIL', 'menitola@tolatiles.com')
+# Concurrent sends per push batch, and per-request timeout (notifications/push.py)
+PUSH_MAX_WORKERS = int(os.environ.get('PUSH_MAX_WORKERS', 8))
+PUSH_TIMEOUT = int(os.environ.get('PUSH_TIMEOUT', 10))
 
 
 # Gemini AI Configuration
@@ -0,0 +1,188 @@
+"""
+Thin adapter over the per-app media storages (blog/storage.py,
+gallery/storage.py, quotes/storage.py) for the operations Django's Storage
+API can only express as several round-trips:
+
+- copy()      S3 CopyObject, server-side -- no download/re-upload. Local:
+              hardlink (falling back to a copy), then os.replace onto dest.
+- move()      copy() + delete on S3; os.replace on local disk.
+- overwrite() a single PUT to the exact key (no exists/delete/save dance,
+              and no dedup suffix even where file_overwrite=False). Local:
+              write a temp file next to the target, then os.replace.
+- delete()    no existence check first: S3 DeleteObject and
+              FileSystemStorage.delete are both no-ops on a missing key.
+- exists()    answered from a short-lived cache (STORAGE_EXISTS_CACHE_SECONDS)
+              that the adapter's own writes and deletes keep current, so the
+              repeated checks one request or task makes only hit R2 once.
+
+Both backends behave the same: same keys, same overwrite/no-clobber rules,
+FileNotFoundError when the source of a copy/move doesn't exist. The cache is
+per process; another process's changes show up once an entry expires.
+
+The S3 paths are tested against config/tests/s3_standin.py, a local-disk
+S3 stand-in that records each request.
+"""
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+
+def is_s3(storage):
+    """True for S3Boto3Storage (and the test stand-in)."""
+    return hasattr(storage, 'bucket_name') and hasattr(storage, 'connection')
+
+
+def _missing(error):
+    return error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+
+
+class StorageAdapter:
+    """Wraps one storage instance; the app storage modules each build one
+    at import time next to their storage."""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self._exists = {}  # key -> (expires_at, exists)
+        self._lock = threading.Lock()
+
+    # -- existence cache ---------------------------------------------------
+
+    def _ttl(self):
+        return getattr(settings, 'STORAGE_EXISTS_CACHE_SECONDS', 10)
+
+    def _remember(self, key, exists):
+        with self._lock:
+            self._exists[key] = (time.monotonic() + self._ttl(), exists)
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._exists.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def exists(self, key):
+        if not key:
+            return False
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        exists = self.storage.exists(key)
+        self._remember(key, exists)
+        return exists
+
+    # -- S3 ----------------------------------------------------------------
+
+    @property
+    def _client(self):
+        # storage.connection is a per-thread boto3 resource.
+        return self.storage.connection.meta.client
+
+    def _put_params(self, key):
+        params = dict(self.storage.get_object_parameters(key))
+        content_type = mimetypes.guess_type(key)[0]
+        if content_type:
+            params.setdefault('ContentType', content_type)
+        return params
+
+    # -- local -------------------------------------------------------------
+
+    def _local_path(self, key):
+        path = self.storage.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def _replace_with_temp(self, path, write):
+        """Create a temp file next to `path`, fill it via write(temp_path),
+        then atomically move it onto `path`."""
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        os.close(fd)
+        try:
+            write(temp_path)
+            if self.storage.file_permissions_mode is not None:
+                os.chmod(temp_path, self.storage.file_permissions_mode)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    # -- operations --------------------------------------------------------
+
+    def save(self, key, content):
+        """storage.save(): a taken key gets a dedup suffix (or is
+        overwritten, per the storage's policy). Returns the key saved under."""
+        saved = self.storage.save(key, ContentFile(content))
+        self._remember(saved, True)
+        return saved
+
+    def overwrite(self, key, content):
+        """Write `content` at exactly `key`, replacing any existing file."""
+        if is_s3(self.storage):
+            self._client.put_object(
+                Bucket=self.storage.bucket_name, Key=key, Body=content, **self._put_params(key)
+            )
+        else:
+            def write(temp_path):
+                with open(temp_path, 'wb') as f:
+                    f.write(content)
+            self._replace_with_temp(self._local_path(key), write)
+        self._remember(key, True)
+        return key
+
+    def copy(self, src_key, dest_key):
+        """Copy `src_key` to `dest_key`, replacing anything there. Raises
+        FileNotFoundError if `src_key` doesn't exist."""
+        if is_s3(self.storage):
+            from botocore.exceptions import ClientError
+
+            bucket = self.storage.bucket_name
+            try:
+                self._client.copy_object(
+                    Bucket=bucket, Key=dest_key, CopySource={'Bucket': bucket, 'Key': src_key}
+                )
+            except ClientError as e:
+                if _missing(e):
+                    self._remember(src_key, False)
+                    raise FileNotFoundError(src_key) from e
+                raise
+        else:
+            src_path = self.storage.path(src_key)
+
+            def write(temp_path):
+                os.remove(temp_path)
+                try:
+                    os.link(src_path, temp_path)
+                except FileNotFoundError:
+                    raise
+                except OSError:
+                    # Hardlinks unsupported (other filesystem, Windows share...).
+                    shutil.copy2(src_path, temp_path)
+            self._replace_with_temp(self._local_path(dest_key), write)
+        self._remember(src_key, True)
+        self._remember(dest_key, True)
+        return dest_key
+
+    def move(self, src_key, dest_key):
+        """Move `src_key` to `dest_key` (the caller picks a free dest).
+        Raises FileNotFoundError if `src_key` doesn't exist."""
+        if is_s3(self.storage):
+            self.copy(src_key, dest_key)
+            self.delete(src_key)
+        else:
+            os.replace(self.storage.path(src_key), self._local_path(dest_key))
+            self._remember(src_key, False)
+            self._remember(dest_key, True)
+        return dest_key
+
+    def delete(self, key):
+        if not key:
+            return
+        self.storage.delete(key)
+        self._remember(key, False)
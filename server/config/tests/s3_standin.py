@@ -0,0 +1,150 @@
+"""
+Local stand-in for an S3Boto3Storage bucket, for tests of the S3 code paths
+of config/storage_adapter.py and config/media_migration.py without R2 or
+network access (see test_storage_adapter.py):
+
+    from config.tests.s3_standin import S3StandInStorage
+    from config.storage_adapter import StorageAdapter
+
+    storage = S3StandInStorage(tmp_dir, file_overwrite=False)
+    adapter = StorageAdapter(storage)
+    adapter.copy('a.png', 'b.png')
+    storage.calls  # [('CopyObject', 'b.png')]
+
+Objects are plain files under `location` (so storage.open()/url() work as
+for FileSystemStorage); `storage.connection.meta.client` answers the boto3
+calls those modules make -- head_object, put_object, copy_object,
+delete_object, upload_file, generate_presigned_url and the multipart
+upload calls -- with S3's semantics and error shapes, and
+every request (including storage.exists()) is recorded in `storage.calls`
+to check round-trip counts.
+"""
+import hashlib
+import os
+import shutil
+from types import SimpleNamespace
+
+from botocore.exceptions import ClientError
+from django.core.files.storage import FileSystemStorage
+
+
+def _not_found(operation, key):
+    return ClientError({'Error': {'Code': 'NoSuchKey', 'Message': key}}, operation)
+
+
+class _Client:
+    def __init__(self, storage):
+        self.storage = storage
+
+    def _path(self, key):
+        path = self.storage.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def head_object(self, Bucket, Key):
+        self.storage.calls.append(('HeadObject', Key))
+        path = self.storage.path(Key)
+        if not os.path.isfile(path):
+            raise ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject')
+        with open(path, 'rb') as f:
+            etag = hashlib.md5(f.read()).hexdigest()
+        return {
+            'ContentLength': os.path.getsize(path),
+            'ETag': f'"{etag}"',
+            'Metadata': self.storage.metadata.get(Key, {}),
+        }
+
+    def put_object(self, Bucket, Key, Body, Metadata=None, **params):
+        self.storage.calls.append(('PutObject', Key))
+        with open(self._path(Key), 'wb') as f:
+            f.write(Body if isinstance(Body, bytes) else Body.read())
+        self.storage.metadata[Key] = dict(Metadata or {})
+
+    def copy_object(self, Bucket, Key, CopySource, **params):
+        self.storage.calls.append(('CopyObject', Key))
+        src = self.storage.path(CopySource['Key'])
+        if not os.path.isfile(src):
+            raise _not_found('CopyObject', CopySource['Key'])
+        shutil.copyfile(src, self._path(Key))
+        self.storage.metadata[Key] = dict(self.storage.metadata.get(CopySource['Key'], {}))
+
+    def delete_object(self, Bucket, Key):
+        self.storage.calls.append(('DeleteObject', Key))
+        if os.path.isfile(self.storage.path(Key)):
+            os.remove(self.storage.path(Key))
+        self.storage.metadata.pop(Key, None)
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, Config=None):
+        self.storage.calls.append(('UploadFile', Key))
+        shutil.copyfile(Filename, self._path(Key))
+        self.storage.metadata[Key] = dict((ExtraArgs or {}).get('Metadata', {}))
+
+    def create_multipart_upload(self, Bucket, Key, **params):
+        self.storage.calls.append(('CreateMultipartUpload', Key))
+        upload_id = f'upload-{len(self.storage.multipart) + 1}'
+        self.storage.multipart[upload_id] = {}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **params):
+        self.storage.calls.append(('UploadPart', Key))
+        if UploadId not in self.storage.multipart:
+            raise ClientError({'Error': {'Code': 'NoSuchUpload', 'Message': UploadId}}, 'UploadPart')
+        data = Body.read()
+        self.storage.multipart[UploadId][PartNumber] = data
+        return {'ETag': f'"{hashlib.md5(data).hexdigest()}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.storage.calls.append(('CompleteMultipartUpload', Key))
+        parts = self.storage.multipart.pop(UploadId)
+        with open(self._path(Key), 'wb') as f:
+            for part in MultipartUpload['Parts']:
+                data = parts[part['PartNumber']]
+                if part['ETag'] != f'"{hashlib.md5(data).hexdigest()}"':
+                    raise ClientError({'Error': {'Code': 'InvalidPart', 'Message': Key}}, 'CompleteMultipartUpload')
+                f.write(data)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.storage.calls.append(('AbortMultipartUpload', Key))
+        self.storage.multipart.pop(UploadId, None)
+
+    def generate_presigned_url(self, ClientMethod, Params, ExpiresIn=3600, HttpMethod=None):
+        # Signed locally by boto3, no request; the URL itself isn't usable.
+        return f'https://{Params["Bucket"]}.invalid/{Params["Key"]}?X-Amz-Expires={ExpiresIn}'
+
+
+class S3StandInStorage(FileSystemStorage):
+    """FileSystemStorage that also looks like an S3Boto3Storage to
+    storage_adapter.is_s3(). `file_overwrite` mirrors the S3Boto3Storage
+    option: True saves over a taken key instead of picking a new name."""
+
+    bucket_name = 'stand-in'
+
+    def __init__(self, location, base_url=None, file_overwrite=False):
+        super().__init__(location=location, base_url=base_url)
+        self.file_overwrite = file_overwrite
+        self.calls = []
+        self.metadata = {}
+        self.multipart = {}  # upload id -> {part number: bytes}
+        self.connection = SimpleNamespace(meta=SimpleNamespace(client=_Client(self)))
+
+    def get_object_parameters(self, name):
+        return {}
+
+    def exists(self, name):
+        self.calls.append(('HeadObject', name))
+        return super().exists(name)
+
+    def _save(self, name, content):
+        if self.file_overwrite and super().exists(name):
+            os.remove(self.path(name))
+        self.calls.append(('PutObject', name))
+        return super()._save(name, content)
+
+    def get_available_name(self, name, max_length=None):
+        if self.file_overwrite:
+            return name
+        return super().get_available_name(name, max_length)
+
+    def delete(self, name):
+        self.calls.append(('DeleteObject', name))
+        super().delete(name)
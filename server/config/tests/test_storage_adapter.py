@@ -0,0 +1,133 @@
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import SimpleTestCase, override_settings
+
+from config.storage_adapter import StorageAdapter, is_s3
+
+from .s3_standin import S3StandInStorage
+
+
+class StorageAdapterChecks:
+    """Behaviour both backends must share. Subclasses provide make_storage()."""
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp(prefix='storage-adapter-')
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+        self.storage = self.make_storage()
+        self.adapter = StorageAdapter(self.storage)
+
+    def put(self, key, content):
+        return self.storage.save(key, ContentFile(content))
+
+    def read(self, key):
+        with self.storage.open(key, 'rb') as f:
+            return f.read()
+
+    def test_copy(self):
+        self.put('blog/a.png', b'original')
+        self.put('blog/b.png', b'old')
+        self.assertEqual(self.adapter.copy('blog/a.png', 'blog/b.png'), 'blog/b.png')
+        self.assertEqual(self.read('blog/b.png'), b'original')
+        self.assertEqual(self.read('blog/a.png'), b'original')
+
+    def test_copy_missing_source(self):
+        with self.assertRaises(FileNotFoundError):
+            self.adapter.copy('blog/missing.png', 'blog/b.png')
+        self.assertFalse(self.adapter.exists('blog/missing.png'))
+
+    def test_move(self):
+        self.put('blog/a.png', b'data')
+        self.adapter.move('blog/a.png', 'blog/renamed/a.png')
+        self.assertEqual(self.read('blog/renamed/a.png'), b'data')
+        self.assertFalse(self.storage.exists('blog/a.png'))
+        self.assertFalse(self.adapter.exists('blog/a.png'))
+        self.assertTrue(self.adapter.exists('blog/renamed/a.png'))
+
+    def test_overwrite(self):
+        self.put('quotes/q.pdf', b'v1')
+        self.assertEqual(self.adapter.overwrite('quotes/q.pdf', b'v2'), 'quotes/q.pdf')
+        self.assertEqual(self.read('quotes/q.pdf'), b'v2')
+        self.assertEqual(self.adapter.overwrite('quotes/new.pdf', b'v1'), 'quotes/new.pdf')
+        self.assertEqual(self.read('quotes/new.pdf'), b'v1')
+
+    def test_exists_is_cached(self):
+        self.assertFalse(self.adapter.exists('blog/a.png'))
+        self.put('blog/a.png', b'data')
+        # Written behind the adapter's back: the cached answer stands...
+        self.assertFalse(self.adapter.exists('blog/a.png'))
+        # ...while the adapter's own writes keep the cache current.
+        self.adapter.delete('blog/a.png')
+        self.assertFalse(self.adapter.exists('blog/a.png'))
+        self.adapter.overwrite('blog/a.png', b'data')
+        self.assertTrue(self.adapter.exists('blog/a.png'))
+
+    @override_settings(STORAGE_EXISTS_CACHE_SECONDS=0)
+    def test_exists_uncached(self):
+        self.assertFalse(self.adapter.exists('blog/a.png'))
+        self.put('blog/a.png', b'data')
+        self.assertTrue(self.adapter.exists('blog/a.png'))
+
+
+class FileSystemStorageAdapterTests(StorageAdapterChecks, SimpleTestCase):
+    def make_storage(self):
+        return FileSystemStorage(location=self.location)
+
+    def test_not_s3(self):
+        self.assertFalse(is_s3(self.storage))
+
+
+class S3StorageAdapterTests(StorageAdapterChecks, SimpleTestCase):
+    """The S3 path, with the request counts the adapter exists to cut."""
+
+    def make_storage(self):
+        return S3StandInStorage(self.location, file_overwrite=True)
+
+    def requests(self):
+        calls, self.storage.calls = self.storage.calls, []
+        return calls
+
+    def put(self, key, content):
+        saved = super().put(key, content)
+        self.storage.calls.clear()
+        return saved
+
+    def test_is_s3(self):
+        self.assertTrue(is_s3(self.storage))
+
+    def test_copy_is_one_server_side_copy(self):
+        self.put('blog/a.png', b'original')
+        self.adapter.copy('blog/a.png', 'blog/b.png')
+        self.assertEqual(self.requests(), [('CopyObject', 'blog/b.png')])
+        # Both keys are known to exist now: no HEAD requests.
+        self.assertTrue(self.adapter.exists('blog/a.png'))
+        self.assertTrue(self.adapter.exists('blog/b.png'))
+        self.assertEqual(self.requests(), [])
+
+    def test_move_is_copy_and_delete(self):
+        self.put('blog/a.png', b'data')
+        self.adapter.move('blog/a.png', 'blog/renamed/a.png')
+        self.assertEqual(self.requests(), [
+            ('CopyObject', 'blog/renamed/a.png'),
+            ('DeleteObject', 'blog/a.png'),
+        ])
+
+    def test_overwrite_is_one_put(self):
+        self.put('quotes/q.pdf', b'v1')
+        self.adapter.overwrite('quotes/q.pdf', b'v2')
+        self.assertEqual(self.requests(), [('PutObject', 'quotes/q.pdf')])
+        self.assertTrue(self.adapter.exists('quotes/q.pdf'))
+        self.assertEqual(self.requests(), [])
+
+    def test_exists_is_one_head(self):
+        self.put('blog/a.png', b'data')
+        for _ in range(3):
+            self.assertTrue(self.adapter.exists('blog/a.png'))
+        self.assertEqual(self.requests(), [('HeadObject', 'blog/a.png')])
+
+    def test_delete_skips_head(self):
+        self.put('blog/a.png', b'data')
+        self.adapter.delete('blog/a.png')
+        self.assertEqual(self.requests(), [('DeleteObject', 'blog/a.png')])
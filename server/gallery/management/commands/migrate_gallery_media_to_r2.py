@@ -8,20 +8,21 @@ gallery_media_storage; this only matters for images that predate it and are
 still sitting on local disk under MEDIA_ROOT. Safe to re-run: an image
 whose local file no longer exists (already migrated, or genuinely missing)
 is left untouched.
-"""
-import os
 
-from django.conf import settings
+Uploads are concurrent, resumable and skip objects already in the bucket --
+see config/media_migration.py.
+"""
 from django.core.management.base import BaseCommand
 
+from config.media_migration import MediaMigration
 from gallery.models import GalleryImage
-from gallery.storage import save_media_bytes
+from gallery.storage import gallery_media_storage
 
 
 class Command(BaseCommand):
     help = (
         'Upload gallery images still on local disk to gallery_media_storage '
-        '(R2). Use --dry-run first.'
+        '(R2). Resumable; use --dry-run first.'
     )
 
     def add_arguments(self, parser):
@@ -29,38 +30,38 @@ class Command(BaseCommand):
             '--dry-run', action='store_true',
             help="Print what would change; don't save or upload anything.",
         )
+        parser.add_argument('--workers', type=int, help='Concurrent uploads (default MEDIA_MIGRATION_WORKERS).')
+        parser.add_argument(
+            '--checkpoint', default='migrate_gallery_media_to_r2.checkpoint.json',
+            help='Progress file used to resume an interrupted run.',
+        )
+        parser.add_argument('--reset', action='store_true', help='Ignore and overwrite an existing checkpoint.')
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
-        uploaded = 0
-        missing = 0
+        migration = MediaMigration(
+            gallery_media_storage, options['checkpoint'], self.stdout,
+            workers=options['workers'], dry_run=dry_run, reset=options['reset'],
+        )
 
-        for image in GalleryImage.objects.all().order_by('id'):
-            if not image.image or not image.image.name:
-                continue
+        images = list(
+            GalleryImage.objects.exclude(image='').exclude(image__isnull=True).order_by('id').values_list('id', 'image')
+        )
+        migrated = migration.upload(name for _, name in images)
 
-            local_path = os.path.join(settings.MEDIA_ROOT, image.image.name)
-            if not os.path.isfile(local_path):
-                missing += 1
+        updates = []
+        for pk, name in images:
+            if name not in migrated:
                 continue
-
+            new_key = migrated[name]
             if dry_run:
-                self.stdout.write(f'Would upload GalleryImage #{image.id}: {image.image.name}')
-                uploaded += 1
-                continue
-
-            with open(local_path, 'rb') as f:
-                data = f.read()
-            new_key = save_media_bytes(image.image.name, data)
-            if new_key != image.image.name:
-                self.stdout.write(f'GalleryImage #{image.id}: {image.image.name} -> {new_key}')
-                GalleryImage.objects.filter(pk=image.pk).update(image=new_key)
-            else:
-                self.stdout.write(f'GalleryImage #{image.id}: {new_key} (uploaded, key unchanged)')
-            uploaded += 1
+                self.stdout.write(f'Would upload GalleryImage #{pk}: {name}')
+            elif new_key != name:
+                self.stdout.write(f'GalleryImage #{pk}: {name} -> {new_key}')
+                updates.append((pk, {'image': new_key}))
+        migration.apply_updates(GalleryImage, updates)
 
         mode = 'DRY RUN' if dry_run else 'APPLIED'
         self.stdout.write(self.style.SUCCESS(
-            f'{mode}: {uploaded} image(s) uploaded, {missing} reference(s) '
-            f'pointed at a missing local file (left untouched).'
+            f'{mode}: {migration.summary()}; {len(updates)} reference(s) rewritten.'
         ))
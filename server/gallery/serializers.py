@@ -2,6 +2,7 @@ import os
 
 from django.conf import settings
 from rest_framework import serializers
+from config import direct_uploads
 from config.media_utils import slugify_filename
 from .models import Category, GalleryImage
 from .storage import rename_media_file
@@ -62,9 +63,12 @@ class GalleryImageCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating/updating gallery images. `file_name` isn't a
     model field -- it renames the actual stored file on save (see update()/
     create()) rather than being persisted as separate metadata, so there's
-    never a name that drifts from the real file."""
+    never a name that drifts from the real file. `upload_token` attaches an
+    image already uploaded directly to storage (config/direct_uploads.py)
+    in place of a multipart `image`."""
 
     file_name = serializers.CharField(required=False, allow_blank=True, write_only=True)
+    upload_token = serializers.CharField(required=False, write_only=True)
 
     class Meta:
         model = GalleryImage
@@ -76,9 +80,19 @@ class GalleryImageCreateSerializer(serializers.ModelSerializer):
             'image',
             'alt_text',
             'file_name',
+            'upload_token',
             'order',
             'is_active',
         ]
+        extra_kwargs = {'image': {'required': False}}
+
+    def validate(self, attrs):
+        token = attrs.pop('upload_token', None)
+        if token:
+            attrs['image'] = direct_uploads.claim(token, 'gallery_image', '')
+        elif self.instance is None and not attrs.get('image'):
+            raise serializers.ValidationError({'image': 'No image provided.'})
+        return attrs
 
     def _apply_file_rename(self, instance, file_name):
         if not file_name or not instance.image:
@@ -21,10 +21,10 @@ transform/rotate feature needs this).
 import os
 
 from django.conf import settings
-from django.core.files.base import ContentFile
 from django.core.files.storage import FileSystemStorage
 
 from config.media_utils import slugify_filename
+from config.storage_adapter import StorageAdapter
 
 
 def _build_storage():
@@ -48,22 +48,23 @@ def _build_storage():
 
 # Built once at import time and reused.
 gallery_media_storage = _build_storage()
+# Server-side copy/rename, single-PUT overwrite and cached exists() on top
+# of it (see config/storage_adapter.py).
+gallery_media = StorageAdapter(gallery_media_storage)
 
 
 def save_media_bytes(key: str, content: bytes) -> str:
     """Save raw bytes at storage key `key` (e.g. 'gallery/2026/08/x.jpg').
     Returns the actual key saved under (the storage backend appends a
     dedup suffix if `key` is already taken)."""
-    return gallery_media_storage.save(key, ContentFile(content))
+    return gallery_media.save(key, content)
 
 
 def overwrite_media_bytes(key: str, content: bytes) -> None:
     """Replace the file at `key` in place with `content` -- used by the
     rotate/flip transform action, which edits an existing image and must
     keep the same key/URL rather than getting a deduped new one."""
-    if gallery_media_storage.exists(key):
-        gallery_media_storage.delete(key)
-    gallery_media_storage.save(key, ContentFile(content))
+    gallery_media.overwrite(key, content)
 
 
 def read_media_bytes(key: str) -> bytes:
@@ -77,13 +78,16 @@ def gallery_media_url(key: str):
     return gallery_media_storage.url(key)
 
 
+def media_file_exists(key: str) -> bool:
+    return gallery_media.exists(key)
+
+
 def delete_media_file(key: str) -> None:
-    if key and gallery_media_storage.exists(key):
-        gallery_media_storage.delete(key)
+    gallery_media.delete(key)
 
 
 def rename_media_file(key: str, desired_basename: str) -> str:
-    """Rename (local storage) or copy+delete (R2/remote storage) the file
+    """Rename (local storage) or server-side copy+delete (R2) the file
     at `key` to slugify_filename(desired_basename) + its existing
     extension, in the same 'directory'. Returns the new key (unchanged if
     the slugified name already matches the current basename). De-dupes
@@ -98,15 +102,12 @@ def rename_media_file(key: str, desired_basename: str) -> str:
         return key
 
     counter = 1
-    while gallery_media_storage.exists(new_key):
+    while gallery_media.exists(new_key):
         candidate = f'{base}-{counter}{ext}'
         new_key = os.path.join(directory, candidate) if directory else candidate
         counter += 1
 
-    with gallery_media_storage.open(key, 'rb') as f:
-        gallery_media_storage.save(new_key, ContentFile(f.read()))
-    gallery_media_storage.delete(key)
-    return new_key
+    return gallery_media.move(key, new_key)
 
 
 def is_local_storage() -> bool:
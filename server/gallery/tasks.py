@@ -9,7 +9,7 @@ from PIL import Image
 from django.conf import settings
 
 from .storage import (
-    gallery_media_storage,
+    media_file_exists,
     read_media_bytes,
     save_media_bytes,
     delete_media_file,
@@ -42,7 +42,7 @@ def convert_image_to_webp(self, image_id: int) -> dict:
             return {'status': 'skipped', 'reason': 'already_webp'}
 
         # Check if file exists
-        if not gallery_media_storage.exists(original_key):
+        if not media_file_exists(original_key):
             logger.error(f'Original image not found: {original_key}')
             return {'status': 'error', 'reason': 'file_not_found'}
 
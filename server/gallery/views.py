@@ -9,6 +9,8 @@ from rest_framework.filters import SearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from PIL import Image
 
+from config import direct_uploads
+
 from .models import Category, GalleryImage
 from .serializers import (
     CategorySerializer,
@@ -88,6 +90,12 @@ class GalleryImageViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], url_path='upload-url', permission_classes=[IsAdminUser])
+    def upload_url(self, request):
+        """Issue a direct-to-storage upload for a new image; create it with
+        the returned token as `upload_token` once the upload finishes."""
+        return Response(direct_uploads.issue(request, 'gallery_image', ''))
+
     @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
     def reorder(self, request):
         """Reorder images by updating their order field."""
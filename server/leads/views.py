@@ -9,7 +9,8 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.core.mail import send_mail
 from django.core.cache import cache
 from django.conf import settings
-from django.db.models import Count
+
+from notifications.stats import get_stats
 
 from .meta_capi import send_lead_event
 from .models import ContactLead, LocalAdsLead
@@ -172,25 +173,7 @@ View all leads in the admin dashboard.''',
     @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
     def stats(self, request):
         """Get lead statistics."""
-        total = ContactLead.objects.count()
-        by_status = {}
-        for status_choice in ContactLead.STATUS_CHOICES:
-            by_status[status_choice[0]] = ContactLead.objects.filter(
-                status=status_choice[0]
-            ).count()
-
-        landing_page_counts = (
-            ContactLead.objects.exclude(landing_page__isnull=True)
-            .values('landing_page__name')
-            .annotate(count=Count('id'))
-        )
-        by_landing_page = {row['landing_page__name']: row['count'] for row in landing_page_counts}
-
-        return Response({
-            'total': total,
-            'by_status': by_status,
-            'by_landing_page': by_landing_page,
-        })
+        return Response(get_stats('leads')['leads'])
 
     @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
     def update_status(self, request, pk=None):
@@ -377,29 +360,4 @@ class LocalAdsLeadViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get Local Ads lead statistics."""
-        total = LocalAdsLead.objects.count()
-
-        by_status = {}
-        for status_choice in LocalAdsLead.STATUS_CHOICES:
-            by_status[status_choice[0]] = LocalAdsLead.objects.filter(
-                status=status_choice[0]
-            ).count()
-
-        by_charge_status = {}
-        for charge_choice in LocalAdsLead.CHARGE_STATUS_CHOICES:
-            by_charge_status[charge_choice[0]] = LocalAdsLead.objects.filter(
-                charge_status=charge_choice[0]
-            ).count()
-
-        by_lead_type = {}
-        for type_choice in LocalAdsLead.LEAD_TYPE_CHOICES:
-            by_lead_type[type_choice[0]] = LocalAdsLead.objects.filter(
-                lead_type=type_choice[0]
-            ).count()
-
-        return Response({
-            'total': total,
-            'by_status': by_status,
-            'by_charge_status': by_charge_status,
-            'by_lead_type': by_lead_type,
-        })
+        return Response(get_stats('local_ads_leads')['local_ads_leads'])
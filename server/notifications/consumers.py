@@ -4,6 +4,8 @@ from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import User
 from .models import Notification
+from .services import STAFF_GROUP
+from . import unread
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +31,10 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
             self.channel_name
         )
 
+        # Staff also join the shared group used for all-staff fan-outs
+        if self.user.is_staff:
+            await self.channel_layer.group_add(STAFF_GROUP, self.channel_name)
+
         await self.accept()
 
         # Send initial unread count
@@ -47,6 +53,8 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
                 self.group_name,
                 self.channel_name
             )
+            if self.user.is_staff:
+                await self.channel_layer.group_discard(STAFF_GROUP, self.channel_name)
             logger.info(f"WebSocket disconnected for user {self.user.username}")
 
     async def receive_json(self, content):
@@ -80,6 +88,15 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
             'notification': event['notification']
         })
 
+    async def staff_notification_message(self, event):
+        """Handle an all-staff fan-out: forward this user's notification, if any."""
+        notification = event['notifications'].get(str(self.user.id))
+        if notification:
+            await self.send_json({
+                'type': 'new_notification',
+                'notification': notification
+            })
+
     async def unread_count_update(self, event):
         """Handle unread count update from channel layer."""
         await self.send_json({
@@ -90,26 +107,25 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
     @database_sync_to_async
     def get_unread_count(self):
         """Get the count of unread notifications for the user."""
-        return Notification.objects.filter(
-            user=self.user,
-            is_read=False
-        ).count()
+        return unread.get_unread_count(self.user.id)
 
     @database_sync_to_async
     def mark_notification_read(self, notification_id):
         """Mark a notification as read."""
         from django.utils import timezone
-        Notification.objects.filter(
+        updated = Notification.objects.filter(
             id=notification_id,
             user=self.user,
             is_read=False
         ).update(is_read=True, read_at=timezone.now())
+        unread.adjust({self.user.id: -updated})
 
     @database_sync_to_async
     def mark_all_notifications_read(self):
         """Mark all notifications as read."""
         from django.utils import timezone
-        Notification.objects.filter(
+        updated = Notification.objects.filter(
             user=self.user,
             is_read=False
         ).update(is_read=True, read_at=timezone.now())
+        unread.adjust({self.user.id: -updated})
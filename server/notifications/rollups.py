@@ -0,0 +1,246 @@
+"""
+Daily rollups (DailyStats) behind the stats dashboard.
+
+Closed days are read straight from their DailyStats row, so the dashboard's
+cost no longer grows with the leads/quotes/invoices tables. The current day
+is kept live two ways:
+
+- signals.py calls record_change() around every save/delete of a lead,
+  quote or invoice, which applies the change's delta to today's row with
+  F() updates (e.g. a quote moving draft -> sent adds 1 to quotes_sent; an
+  edit that moves it back takes it off again).
+- tasks.refresh_daily_stats (Celery beat) recomputes today and yesterday
+  from the source tables, correcting anything the deltas can't see
+  (QuerySet.update(), raw SQL) and finalising yesterday after midnight.
+
+Metric definitions match the previous live-computed dashboard: creations by
+created_at, status metrics by status + updated_at (invoice payments by
+paid_at), all bucketed by local date in TIME_ZONE.
+
+Recounts (beat refresh, backfill, gap filling) go through compute_range(),
+which handles any span of days with one GROUP BY per source table and
+timestamp column, filtered by half-open local-midnight timestamp ranges, and
+store_range(), which upserts the resulting rows in one bulk statement.
+"""
+import logging
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_FIELDS = [
+    'new_leads_website',
+    'new_leads_local_ads',
+    'leads_contacted',
+    'leads_converted',
+    'quotes_created',
+    'quotes_sent',
+    'quotes_accepted',
+    'quotes_total_value',
+    'invoices_created',
+    'invoices_paid',
+    'invoices_paid_value',
+]
+
+# model label -> fields a contribution depends on
+TRACKED_FIELDS = {
+    'leads.ContactLead': ['created_at', 'updated_at', 'status'],
+    'leads.LocalAdsLead': ['created_at'],
+    'quotes.Quote': ['created_at', 'updated_at', 'status', 'total'],
+    'quotes.Invoice': ['created_at', 'status', 'total', 'paid_at'],
+}
+
+
+def _local_day(value):
+    return timezone.localdate(value) if value else None
+
+
+def contributions(model_label, snapshot, day):
+    """What one row (as a {field: value} snapshot) adds to `day`'s rollup."""
+    created_today = _local_day(snapshot.get('created_at')) == day
+    updated_today = _local_day(snapshot.get('updated_at')) == day
+    status = snapshot.get('status')
+    result = {}
+
+    if model_label == 'leads.ContactLead':
+        result['new_leads_website'] = int(created_today)
+        result['leads_contacted'] = int(status == 'contacted' and updated_today)
+        result['leads_converted'] = int(status == 'converted' and updated_today)
+    elif model_label == 'leads.LocalAdsLead':
+        result['new_leads_local_ads'] = int(created_today)
+    elif model_label == 'quotes.Quote':
+        result['quotes_created'] = int(created_today)
+        result['quotes_total_value'] = (snapshot.get('total') or Decimal('0')) if created_today else Decimal('0')
+        result['quotes_sent'] = int(status == 'sent' and updated_today)
+        result['quotes_accepted'] = int(status == 'accepted' and updated_today)
+    elif model_label == 'quotes.Invoice':
+        paid_today = status == 'paid' and _local_day(snapshot.get('paid_at')) == day
+        result['invoices_created'] = int(created_today)
+        result['invoices_paid'] = int(paid_today)
+        result['invoices_paid_value'] = (snapshot.get('total') or Decimal('0')) if paid_today else Decimal('0')
+    return result
+
+
+def _day_bounds(start_date, end_date):
+    """Half-open [start, end) aware datetimes covering start_date..end_date
+    (inclusive) in the current time zone. Comparing the raw timestamp column
+    against these keeps the WHERE clause index-friendly, unlike __date
+    lookups, which cast the column."""
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(start_date, time.min), tz)
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def _grouped(queryset, date_field, bounds, **aggregates):
+    """One GROUP BY local day over rows whose `date_field` falls in `bounds`."""
+    start, end = bounds
+    return (
+        queryset.filter(**{f'{date_field}__gte': start, f'{date_field}__lt': end})
+        .annotate(day=TruncDate(date_field, tzinfo=timezone.get_current_timezone()))
+        .values('day')
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+
+def compute_range(start_date, end_date):
+    """
+    Compute every rollup metric for each day in start_date..end_date
+    (inclusive) from the source tables: one GROUP BY per source table and
+    timestamp column, seven queries however long the range. Returns
+    {date: {field: value}} with an entry for every day.
+    """
+    from leads.models import ContactLead, LocalAdsLead
+    from quotes.models import Quote, Invoice
+
+    bounds = _day_bounds(start_date, end_date)
+    days = {
+        start_date + timedelta(days=i): {field: 0 for field in ROLLUP_FIELDS}
+        for i in range((end_date - start_date).days + 1)
+    }
+
+    def collect(rows, mapping):
+        for row in rows:
+            for field, alias in mapping.items():
+                days[row['day']][field] = row[alias] or 0
+
+    collect(_grouped(ContactLead.objects, 'created_at', bounds, n=Count('pk')),
+            {'new_leads_website': 'n'})
+    collect(_grouped(ContactLead.objects, 'updated_at', bounds,
+                     contacted=Count('pk', filter=Q(status='contacted')),
+                     converted=Count('pk', filter=Q(status='converted'))),
+            {'leads_contacted': 'contacted', 'leads_converted': 'converted'})
+    collect(_grouped(LocalAdsLead.objects, 'created_at', bounds, n=Count('pk')),
+            {'new_leads_local_ads': 'n'})
+    collect(_grouped(Quote.objects, 'created_at', bounds, n=Count('pk'), value=Sum('total')),
+            {'quotes_created': 'n', 'quotes_total_value': 'value'})
+    collect(_grouped(Quote.objects, 'updated_at', bounds,
+                     sent=Count('pk', filter=Q(status='sent')),
+                     accepted=Count('pk', filter=Q(status='accepted'))),
+            {'quotes_sent': 'sent', 'quotes_accepted': 'accepted'})
+    collect(_grouped(Invoice.objects, 'created_at', bounds, n=Count('pk')),
+            {'invoices_created': 'n'})
+    collect(_grouped(Invoice.objects.filter(status='paid'), 'paid_at', bounds, n=Count('pk'), value=Sum('total')),
+            {'invoices_paid': 'n', 'invoices_paid_value': 'value'})
+    return days
+
+
+def store_range(start_date, end_date, only=None):
+    """
+    Recompute start_date..end_date and upsert the DailyStats rows in a single
+    bulk statement. `only`, if given, limits the write to those dates.
+    Returns {date: DailyStats}.
+    """
+    from .models import DailyStats
+
+    computed = compute_range(start_date, end_date)
+    now = timezone.now()
+    rows = [
+        DailyStats(date=day, created_at=now, updated_at=now, **values)
+        for day, values in computed.items()
+        if only is None or day in only
+    ]
+    DailyStats.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['date'],
+        update_fields=ROLLUP_FIELDS + ['updated_at'],
+    )
+    return {row.date: row for row in rows}
+
+
+def compute_day(stats_date):
+    """Compute every rollup metric for `stats_date` from the source tables."""
+    return compute_range(stats_date, stats_date)[stats_date]
+
+
+def store_day(stats_date):
+    """Recompute `stats_date` and write it to its DailyStats row."""
+    return store_range(stats_date, stats_date)[stats_date]
+
+
+def snapshot(instance):
+    """Tracked field values of a saved/deleted instance."""
+    return {name: getattr(instance, name) for name in TRACKED_FIELDS[instance._meta.label]}
+
+
+def stored_snapshot(instance):
+    """Tracked field values as currently stored, or None for a new row."""
+    if instance.pk is None or instance._state.adding:
+        return None
+    fields = TRACKED_FIELDS[instance._meta.label]
+    return type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+
+
+def record_change(model_label, before, after):
+    """
+    Apply the difference between a row's `before` and `after` snapshots (None
+    for a created/deleted row) to today's DailyStats row. If today has no row
+    yet it is computed from scratch instead, which already includes the change.
+    """
+    from .models import DailyStats
+
+    today = timezone.localdate()
+    if not DailyStats.objects.filter(date=today).exists():
+        store_day(today)
+        return
+
+    old = contributions(model_label, before, today) if before else {}
+    new = contributions(model_label, after, today) if after else {}
+    deltas = {}
+    for field in set(old) | set(new):
+        delta = new.get(field, 0) - old.get(field, 0)
+        if delta:
+            deltas[field] = F(field) + delta
+    if not deltas:
+        return
+    try:
+        with transaction.atomic():
+            DailyStats.objects.filter(date=today).update(**deltas)
+    except IntegrityError:
+        # A counter would go negative -- the row has drifted (e.g. after a
+        # QuerySet.update()); recount instead.
+        store_day(today)
+
+
+def daily_rows(start_date, end_date):
+    """
+    DailyStats rows for start_date..end_date (inclusive) keyed by date.
+    Days with no row yet (before the first backfill, or a missed beat run)
+    are computed and stored on the way.
+    """
+    from .models import DailyStats
+
+    rows = {row.date: row for row in DailyStats.objects.filter(date__gte=start_date, date__lte=end_date)}
+    all_days = (start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1))
+    missing = [day for day in all_days if day not in rows]
+    if missing:
+        logger.info(f"Filling {len(missing)} missing daily stats row(s)")
+        rows.update(store_range(min(missing), max(missing), only=set(missing)))
+    return rows
@@ -1,17 +1,19 @@
 """Notification service for creating and delivering notifications."""
 
-import json
 import logging
 from typing import Optional, Dict, Any, List
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
-from django.conf import settings
-from django.utils import timezone
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
+from . import unread
+
 logger = logging.getLogger(__name__)
 
+# Channel-layer group every staff user's consumer joins, for fan-outs.
+STAFF_GROUP = 'notifications_staff'
+
 
 class NotificationService:
     """Service for managing notifications."""
@@ -73,6 +75,8 @@ class NotificationService:
             data=data or {}
         )
 
+        unread.adjust({user.id: 1})
+
         # Attempt WebSocket delivery
         websocket_delivered = NotificationService._send_websocket(notification)
         if websocket_delivered:
@@ -94,25 +98,113 @@ class NotificationService:
         related_object: Any = None,
         data: Optional[Dict] = None
     ) -> List['Notification']:
-        """Create notifications for all staff users."""
-        staff_users = User.objects.filter(is_staff=True)
-        notifications = []
-
-        for user in staff_users:
-            notification = NotificationService.create_notification(
-                user=user,
-                notification_type=notification_type,
+        """
+        Create notifications for all staff users.
+
+        Runs on request paths (e.g. the public lead form's post_save), so the
+        cost is kept independent of the number of staff accounts: one
+        preference query, one bulk INSERT, one channel-layer broadcast to the
+        shared staff group, one UPDATE for delivered_via_websocket and one
+        batched push task.
+        """
+        from .models import Notification, NotificationPreference
+
+        staff_ids = list(User.objects.filter(is_staff=True).values_list('id', flat=True))
+        if not staff_ids:
+            return []
+
+        pref_field = f"{notification_type}_enabled"
+        if hasattr(NotificationPreference, pref_field):
+            muted = set(NotificationPreference.objects.filter(
+                user_id__in=staff_ids, **{pref_field: False}
+            ).values_list('user_id', flat=True))
+            staff_ids = [user_id for user_id in staff_ids if user_id not in muted]
+
+        content_type = None
+        object_id = None
+        if related_object:
+            content_type = ContentType.objects.get_for_model(related_object)
+            object_id = related_object.pk
+
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                user_id=user_id,
+                type=notification_type,
                 title=title,
                 message=message,
                 priority=priority,
-                related_object=related_object,
-                data=data
+                related_object_type=content_type,
+                related_object_id=object_id,
+                data=data or {}
             )
-            if notification:
-                notifications.append(notification)
+            for user_id in staff_ids
+        ])
+        if not notifications:
+            return []
+
+        unread.adjust({n.user_id: 1 for n in notifications})
+
+        notification_ids = [n.id for n in notifications]
+        if NotificationService._broadcast_to_staff(notifications):
+            Notification.objects.filter(id__in=notification_ids).update(delivered_via_websocket=True)
+            for notification in notifications:
+                notification.delivered_via_websocket = True
+
+        from .tasks import send_push_notifications
+        try:
+            send_push_notifications.delay(notification_ids)
+        except Exception as e:
+            logger.error(f"Failed to queue push notifications: {e}")
 
         return notifications
 
+    @staticmethod
+    def _serialize(notification: 'Notification') -> Dict[str, Any]:
+        """WebSocket payload for a notification."""
+        return {
+            'id': notification.id,
+            'type': notification.type,
+            'title': notification.title,
+            'message': notification.message,
+            'priority': notification.priority,
+            'related_object_type': notification.related_object_type.model if notification.related_object_type else None,
+            'related_object_id': notification.related_object_id,
+            'data': notification.data,
+            'created_at': notification.created_at.isoformat(),
+        }
+
+    @staticmethod
+    def _broadcast_to_staff(notifications: List['Notification']) -> bool:
+        """
+        Deliver a fan-out's notifications with a single group_send to the
+        staff group every staff consumer joins; each consumer picks out the
+        entry for its own user.
+
+        Returns True if successfully sent, False otherwise.
+        """
+        try:
+            channel_layer = get_channel_layer()
+            if not channel_layer:
+                logger.warning("No channel layer configured")
+                return False
+
+            async_to_sync(channel_layer.group_send)(
+                STAFF_GROUP,
+                {
+                    'type': 'staff_notification_message',
+                    'notifications': {
+                        str(n.user_id): NotificationService._serialize(n) for n in notifications
+                    }
+                }
+            )
+
+            logger.info(f"WebSocket notification broadcast to {len(notifications)} staff users")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to broadcast WebSocket notification: {e}")
+            return False
+
     @staticmethod
     def _send_websocket(notification: 'Notification') -> bool:
         """
@@ -129,17 +221,7 @@ class NotificationService:
             group_name = f"notifications_{notification.user.id}"
 
             # Serialize notification data
-            notification_data = {
-                'id': notification.id,
-                'type': notification.type,
-                'title': notification.title,
-                'message': notification.message,
-                'priority': notification.priority,
-                'related_object_type': notification.related_object_type.model if notification.related_object_type else None,
-                'related_object_id': notification.related_object_id,
-                'data': notification.data,
-                'created_at': notification.created_at.isoformat(),
-            }
+            notification_data = NotificationService._serialize(notification)
 
             # Send to user's notification group
             async_to_sync(channel_layer.group_send)(
@@ -161,13 +243,11 @@ class NotificationService:
     def send_unread_count_update(user: User):
         """Send updated unread count to user via WebSocket."""
         try:
-            from .models import Notification
-
             channel_layer = get_channel_layer()
             if not channel_layer:
                 return
 
-            count = Notification.objects.filter(user=user, is_read=False).count()
+            count = unread.get_unread_count(user.id)
             group_name = f"notifications_{user.id}"
 
             async_to_sync(channel_layer.group_send)(
@@ -184,87 +264,11 @@ class NotificationService:
 
 def send_push_notification_to_user(user: User, notification: 'Notification') -> int:
     """
-    Send push notification to all of a user's subscribed devices.
+    Send push notification to all of a user's subscribed devices
+    (concurrently, see push.py).
 
     Returns the number of successful deliveries.
     """
-    from .models import PushSubscription, NotificationPreference
-    from pywebpush import webpush, WebPushException
-
-    # Check if push is enabled for user
-    try:
-        prefs = NotificationPreference.objects.get(user=user)
-        if not prefs.push_enabled:
-            return 0
-    except NotificationPreference.DoesNotExist:
-        pass  # Default to enabled
-
-    # Get VAPID settings
-    vapid_private_key = getattr(settings, 'VAPID_PRIVATE_KEY', None)
-    vapid_claims = {
-        'sub': f"mailto:{getattr(settings, 'VAPID_CLAIMS_EMAIL', 'admin@tolatiles.com')}"
-    }
-
-    if not vapid_private_key:
-        logger.warning("VAPID_PRIVATE_KEY not configured, skipping push notifications")
-        return 0
-
-    # Get active subscriptions
-    subscriptions = PushSubscription.objects.filter(
-        user=user,
-        is_active=True
-    )
-
-    # Prepare payload
-    payload = json.dumps({
-        'title': notification.title,
-        'body': notification.message,
-        'icon': '/images/logo.png',
-        'badge': '/images/badge-72.png',
-        'tag': f'notification-{notification.id}',
-        'data': {
-            'notification_id': notification.id,
-            'type': notification.type,
-            'related_type': notification.related_object_type.model if notification.related_object_type else None,
-            'related_id': notification.related_object_id,
-            'url': notification.data.get('url', '/admin/notifications')
-        },
-        'requireInteraction': notification.priority == 'high',
-        'vibrate': [200, 100, 200] if notification.priority != 'low' else None
-    })
-
-    successful = 0
-    for subscription in subscriptions:
-        try:
-            webpush(
-                subscription_info={
-                    'endpoint': subscription.endpoint,
-                    'keys': {
-                        'p256dh': subscription.p256dh_key,
-                        'auth': subscription.auth_key
-                    }
-                },
-                data=payload,
-                vapid_private_key=vapid_private_key,
-                vapid_claims=vapid_claims
-            )
-
-            subscription.last_used_at = timezone.now()
-            subscription.failed_count = 0
-            subscription.save(update_fields=['last_used_at', 'failed_count'])
-            successful += 1
-
-            logger.info(f"Push notification sent to {subscription.device_name or 'device'}")
-
-        except WebPushException as e:
-            logger.error(f"Push notification failed: {e}")
-            subscription.failed_count += 1
-
-            # Disable subscription after too many failures
-            if subscription.failed_count >= 3:
-                subscription.is_active = False
-                logger.warning(f"Disabling subscription {subscription.id} after {subscription.failed_count} failures")
-
-            subscription.save(update_fields=['failed_count', 'is_active'])
+    from .push import deliver
 
-    return successful
+    return deliver([notification])[notification.id]
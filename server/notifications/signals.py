@@ -1,7 +1,8 @@
 """Signal handlers for creating notifications."""
 
 import logging
-from django.db.models.signals import post_save
+from django.apps import apps
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from leads.models import ContactLead, LocalAdsLead
 
@@ -116,3 +117,65 @@ def register_quote_signals():
 
 # Register quote signals
 register_quote_signals()
+
+
+def invalidate_stats_on_change(sender, **kwargs):
+    """Drop cached stats blocks (notifications/stats.py) computed from `sender`."""
+    from .stats import invalidate_stats, stats_for_model
+    invalidate_stats(*stats_for_model(sender))
+
+
+def register_stats_signals():
+    """Invalidate the cached stats blocks whenever their model's rows change."""
+    from .stats import STATS
+
+    for _, model_label in STATS.values():
+        model = apps.get_model(model_label)
+        for signal, event in ((post_save, 'save'), (post_delete, 'delete')):
+            signal.connect(
+                invalidate_stats_on_change, sender=model,
+                dispatch_uid=f'invalidate_stats_{model_label}_{event}',
+            )
+
+
+register_stats_signals()
+
+
+def _affects_rollup(sender, update_fields):
+    from .rollups import TRACKED_FIELDS
+    return update_fields is None or bool(set(update_fields) & set(TRACKED_FIELDS[sender._meta.label]))
+
+
+def capture_rollup_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Remember the stored row before a save, for update_rollup_on_save."""
+    if raw or not _affects_rollup(sender, update_fields):
+        return
+    from .rollups import stored_snapshot
+    instance._rollup_before = stored_snapshot(instance)
+
+
+def update_rollup_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Apply a save's effect to today's DailyStats row (see rollups.py)."""
+    if raw or not _affects_rollup(sender, update_fields):
+        return
+    from .rollups import record_change, snapshot
+    record_change(sender._meta.label, instance.__dict__.pop('_rollup_before', None), snapshot(instance))
+
+
+def update_rollup_on_delete(sender, instance, **kwargs):
+    from .rollups import record_change, snapshot
+    record_change(sender._meta.label, snapshot(instance), None)
+
+
+def register_rollup_signals():
+    """Keep today's DailyStats row current as leads, quotes and invoices change."""
+    from .rollups import TRACKED_FIELDS
+
+    for model_label in TRACKED_FIELDS:
+        model = apps.get_model(model_label)
+        pre_save.connect(capture_rollup_state, sender=model, dispatch_uid=f'rollup_before_{model_label}')
+        post_save.connect(update_rollup_on_save, sender=model, dispatch_uid=f'rollup_save_{model_label}')
+        post_delete.connect(update_rollup_on_delete, sender=model, dispatch_uid=f'rollup_delete_{model_label}')
+
+
+register_rollup_signals()
@@ -0,0 +1,184 @@
+"""
+Shared engine behind the `stats` actions (quotes, invoices, estimates,
+website leads, Local Ads leads) and the admin dashboard tiles.
+
+Each stats block is computed with a single conditional-aggregation query per
+model -- one COUNT(*) FILTER (WHERE status = ...) / SUM(...) FILTER (...)
+column per status instead of one round-trip per status -- and cached.
+
+Invalidation is by version key: every block's cache key embeds a version
+number held under its own key, and post_save/post_delete on the underlying
+model (see signals.py) bumps that version, so the next read misses and
+recomputes. Nothing is ever deleted; superseded entries simply expire.
+Code that changes rows with QuerySet.update() (no signals) must call
+invalidate_stats() itself. STATS_CACHE_SECONDS bounds staleness if an
+invalidation is ever missed.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+
+def _counts_by(field, choices):
+    """Aggregate expressions counting rows per choice of `field`, plus the
+    alias -> choice key mapping to read them back."""
+    aliases = {f'{field}_{i}': key for i, (key, _) in enumerate(choices)}
+    expressions = {alias: Count('pk', filter=Q(**{field: key})) for alias, key in aliases.items()}
+    return expressions, aliases
+
+
+def _unpack(row, aliases):
+    return {key: row[alias] for alias, key in aliases.items()}
+
+
+def _quote_stats():
+    from quotes.models import Quote
+
+    by_status, status_aliases = _counts_by('status', Quote.STATUS_CHOICES)
+    row = Quote.objects.aggregate(
+        row_count=Count('pk'),
+        total_value=Sum('total'),
+        accepted_value=Sum('total', filter=Q(status='accepted')),
+        **by_status,
+    )
+    return {
+        'total': row['row_count'],
+        'by_status': _unpack(row, status_aliases),
+        'total_value': float(row['total_value'] or 0),
+        'accepted_value': float(row['accepted_value'] or 0),
+    }
+
+
+def _invoice_stats():
+    from quotes.models import Invoice
+
+    by_status, status_aliases = _counts_by('status', Invoice.STATUS_CHOICES)
+    row = Invoice.objects.aggregate(
+        row_count=Count('pk'),
+        total_value=Sum('total'),
+        paid_value=Sum('total', filter=Q(status='paid')),
+        outstanding=Sum('total', filter=Q(status__in=['sent', 'overdue', 'partial'])),
+        **by_status,
+    )
+    return {
+        'total': row['row_count'],
+        'by_status': _unpack(row, status_aliases),
+        'total_value': float(row['total_value'] or 0),
+        'paid_value': float(row['paid_value'] or 0),
+        'outstanding': float(row['outstanding'] or 0),
+    }
+
+
+def _estimate_stats():
+    from quotes.models import Estimate
+
+    by_visit, visit_aliases = _counts_by('visit_status', Estimate.VISIT_STATUS_CHOICES)
+    by_financial, financial_aliases = _counts_by('financial_status', Estimate.FINANCIAL_STATUS_CHOICES)
+    row = Estimate.objects.aggregate(
+        row_count=Count('pk'),
+        pending=Count('pk', filter=Q(visit_status__in=['not_scheduled', 'scheduled'])),
+        **by_visit,
+        **by_financial,
+    )
+    return {
+        'total': row['row_count'],
+        'pending': row['pending'],
+        'by_visit_status': _unpack(row, visit_aliases),
+        'by_financial_status': _unpack(row, financial_aliases),
+    }
+
+
+def _lead_stats():
+    from leads.models import ContactLead
+
+    by_status, status_aliases = _counts_by('status', ContactLead.STATUS_CHOICES)
+    row = ContactLead.objects.aggregate(row_count=Count('pk'), **by_status)
+    # Landing pages are open-ended, so this one stays a GROUP BY.
+    landing_page_counts = (
+        ContactLead.objects.exclude(landing_page__isnull=True)
+        .values('landing_page__name')
+        .annotate(count=Count('id'))
+    )
+    return {
+        'total': row['row_count'],
+        'by_status': _unpack(row, status_aliases),
+        'by_landing_page': {r['landing_page__name']: r['count'] for r in landing_page_counts},
+    }
+
+
+def _local_ads_lead_stats():
+    from leads.models import LocalAdsLead
+
+    by_status, status_aliases = _counts_by('status', LocalAdsLead.STATUS_CHOICES)
+    by_charge, charge_aliases = _counts_by('charge_status', LocalAdsLead.CHARGE_STATUS_CHOICES)
+    by_type, type_aliases = _counts_by('lead_type', LocalAdsLead.LEAD_TYPE_CHOICES)
+    row = LocalAdsLead.objects.aggregate(row_count=Count('pk'), **by_status, **by_charge, **by_type)
+    return {
+        'total': row['row_count'],
+        'by_status': _unpack(row, status_aliases),
+        'by_charge_status': _unpack(row, charge_aliases),
+        'by_lead_type': _unpack(row, type_aliases),
+    }
+
+
+# stats name -> (builder, model label whose saves/deletes invalidate it)
+STATS = {
+    'quotes': (_quote_stats, 'quotes.Quote'),
+    'invoices': (_invoice_stats, 'quotes.Invoice'),
+    'estimates': (_estimate_stats, 'quotes.Estimate'),
+    'leads': (_lead_stats, 'leads.ContactLead'),
+    'local_ads_leads': (_local_ads_lead_stats, 'leads.LocalAdsLead'),
+}
+
+
+def _version_key(name):
+    return f'stats:{name}:version'
+
+
+def _versioned_keys(names):
+    """Current cache key for each stats block, in one cache round-trip."""
+    versions = cache.get_many([_version_key(name) for name in names])
+    keys = {}
+    for name in names:
+        version = versions.get(_version_key(name))
+        if version is None:
+            # Seed from the clock so a lost version key never resurrects an
+            # entry cached under an old, small version number.
+            version = int(time.time() * 1000)
+            cache.add(_version_key(name), version, None)
+        keys[name] = f'stats:{name}:v{version}'
+    return keys
+
+
+def get_stats(*names):
+    """Return {name: stats dict} for the requested blocks, computing and
+    caching any that are missing."""
+    keys = _versioned_keys(names)
+    cached = cache.get_many(keys.values())
+    timeout = getattr(settings, 'STATS_CACHE_SECONDS', 60)
+    result = {}
+    for name in names:
+        data = cached.get(keys[name])
+        if data is None:
+            data = STATS[name][0]()
+            cache.set(keys[name], data, timeout)
+        result[name] = data
+    return result
+
+
+def invalidate_stats(*names):
+    """Bump the version of the given stats blocks so the next read recomputes."""
+    for name in names:
+        try:
+            cache.incr(_version_key(name))
+        except ValueError:
+            # No version yet -- nothing cached under it either.
+            pass
+
+
+def stats_for_model(model):
+    """Names of the stats blocks computed from `model`."""
+    label = model._meta.label
+    return [name for name, (_, model_label) in STATS.items() if model_label == label]
@@ -3,7 +3,6 @@
 import logging
 from datetime import date, timedelta
 from celery import shared_task
-from django.db.models import Sum, Count, Q
 from django.utils import timezone
 
 logger = logging.getLogger(__name__)
@@ -43,6 +42,32 @@ def send_push_notification(self, notification_id: int):
         raise self.retry(exc=exc)
 
 
+@shared_task
+def send_push_notifications(notification_ids: list):
+    """
+    Send push notifications for a whole fan-out (see
+    NotificationService.create_notification_for_all_staff) in one task.
+
+    Args:
+        notification_ids: IDs of the Notifications to send
+    """
+    from .models import Notification
+    from .push import deliver
+
+    notifications = Notification.objects.filter(
+        id__in=notification_ids,
+        delivered_via_push=False
+    ).select_related('related_object_type')
+
+    results = deliver(notifications)
+    delivered = [notification_id for notification_id, sent in results.items() if sent > 0]
+
+    if delivered:
+        Notification.objects.filter(id__in=delivered).update(delivered_via_push=True)
+
+    return {'status': 'success', 'notifications_delivered': len(delivered)}
+
+
 @shared_task
 def aggregate_daily_stats(target_date: str = None):
     """
@@ -51,105 +76,38 @@ def aggregate_daily_stats(target_date: str = None):
     Args:
         target_date: ISO format date string (YYYY-MM-DD). Defaults to yesterday.
     """
-    from leads.models import ContactLead, LocalAdsLead
-    from quotes.models import Quote, Invoice
-    from .models import DailyStats
+    from .rollups import store_day
 
     if target_date:
         stats_date = date.fromisoformat(target_date)
     else:
-        stats_date = date.today() - timedelta(days=1)
-
-    start_datetime = timezone.make_aware(
-        timezone.datetime.combine(stats_date, timezone.datetime.min.time())
-    )
-    end_datetime = timezone.make_aware(
-        timezone.datetime.combine(stats_date, timezone.datetime.max.time())
-    )
+        stats_date = timezone.localdate() - timedelta(days=1)
 
     logger.info(f"Aggregating stats for {stats_date}")
-
-    # Lead stats
-    new_leads_website = ContactLead.objects.filter(
-        created_at__date=stats_date
-    ).count()
-
-    new_leads_local_ads = LocalAdsLead.objects.filter(
-        created_at__date=stats_date
-    ).count()
-
-    leads_contacted = ContactLead.objects.filter(
-        status='contacted',
-        updated_at__date=stats_date
-    ).count()
-
-    leads_converted = ContactLead.objects.filter(
-        status='converted',
-        updated_at__date=stats_date
-    ).count()
-
-    # Quote stats
-    quotes_created = Quote.objects.filter(
-        created_at__date=stats_date
-    ).count()
-
-    quotes_sent = Quote.objects.filter(
-        status='sent',
-        updated_at__date=stats_date
-    ).count()
-
-    quotes_accepted = Quote.objects.filter(
-        status='accepted',
-        updated_at__date=stats_date
-    ).count()
-
-    quotes_value = Quote.objects.filter(
-        created_at__date=stats_date
-    ).aggregate(total=Sum('total'))['total'] or 0
-
-    # Invoice stats
-    invoices_created = Invoice.objects.filter(
-        created_at__date=stats_date
-    ).count()
-
-    invoices_paid = Invoice.objects.filter(
-        status='paid',
-        updated_at__date=stats_date
-    ).count()
-
-    invoices_paid_value = Invoice.objects.filter(
-        status='paid',
-        updated_at__date=stats_date
-    ).aggregate(total=Sum('total'))['total'] or 0
-
-    # Create or update stats record
-    stats, created = DailyStats.objects.update_or_create(
-        date=stats_date,
-        defaults={
-            'new_leads_website': new_leads_website,
-            'new_leads_local_ads': new_leads_local_ads,
-            'leads_contacted': leads_contacted,
-            'leads_converted': leads_converted,
-            'quotes_created': quotes_created,
-            'quotes_sent': quotes_sent,
-            'quotes_accepted': quotes_accepted,
-            'quotes_total_value': quotes_value,
-            'invoices_created': invoices_created,
-            'invoices_paid': invoices_paid,
-            'invoices_paid_value': invoices_paid_value,
-        }
-    )
-
-    action = 'Created' if created else 'Updated'
-    logger.info(f"{action} daily stats for {stats_date}")
+    stats = store_day(stats_date)
+    logger.info(f"Stored daily stats for {stats_date}")
 
     return {
         'status': 'success',
         'date': stats_date.isoformat(),
-        'total_leads': new_leads_website + new_leads_local_ads
+        'total_leads': stats.total_new_leads
     }
 
 
+@shared_task
+def refresh_daily_stats():
+    """
+    Recompute today's and yesterday's DailyStats rows from the source tables.
+    Run every few minutes via Celery Beat: corrects drift in the signal-
+    maintained row for today and finalises yesterday once it has closed.
+    """
+    from .rollups import store_range
+
+    today = timezone.localdate()
+    store_range(today - timedelta(days=1), today)
+    return {'status': 'success', 'date': today.isoformat()}
+
+
 @shared_task
 def backfill_daily_stats(days: int = 30):
     """
@@ -158,15 +116,12 @@ def backfill_daily_stats(days: int = 30):
     Args:
         days: Number of days to backfill
     """
-    today = date.today()
-    results = []
+    from .rollups import store_range
 
-    for i in range(1, days + 1):
-        target = today - timedelta(days=i)
-        result = aggregate_daily_stats(target.isoformat())
-        results.append(result)
+    yesterday = timezone.localdate() - timedelta(days=1)
+    rows = store_range(yesterday - timedelta(days=days - 1), yesterday)
 
-    return {'status': 'success', 'days_processed': len(results)}
+    return {'status': 'success', 'days_processed': len(rows)}
 
 
 @shared_task
@@ -180,6 +135,7 @@ def cleanup_old_notifications(days: int = 90):
     from .models import Notification
 
     cutoff = timezone.now() - timedelta(days=days)
+    # Only read notifications are removed, so unread counters are unaffected.
     deleted_count, _ = Notification.objects.filter(
         created_at__lt=cutoff,
         is_read=True
@@ -187,3 +143,13 @@ def cleanup_old_notifications(days: int = 90):
 
     logger.info(f"Deleted {deleted_count} old notifications")
     return {'status': 'success', 'deleted': deleted_count}
+
+
+@shared_task
+def reconcile_unread_counts():
+    """Resync the Redis unread counters with the database (see unread.py)."""
+    from .unread import reconcile
+
+    checked = reconcile()
+    logger.info(f"Reconciled {checked} unread counters")
+    return {'status': 'success', 'reconciled': checked}
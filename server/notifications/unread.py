@@ -0,0 +1,123 @@
+"""
+Per-user unread notification counters kept in Redis.
+
+Every WebSocket connect, read receipt and unread_count request used to run
+COUNT(*) over the user's unread notifications; after a deploy every client
+reconnects at once and that all lands on the notifications table. Those
+paths now read `notifications:unread:<user_id>` instead.
+
+- A counter is seeded from the database on first read (SET NX) and expires
+  after UNREAD_COUNTER_TTL, so any drift is bounded even between
+  reconciliations.
+- Creates, mark-read and mark-all-read adjust it with INCRBY via a small Lua
+  script that only touches counters that already exist -- incrementing a
+  missing key would start it from the wrong base. Adjustments run on
+  transaction commit.
+- tasks.reconcile_unread_counts (Celery beat) overwrites every live counter
+  with the database value.
+- If Redis is unreachable, reads fall back to the database count.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'notifications:unread:'
+
+# INCRBY only if the counter exists; never below zero.
+_ADJUST_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return nil end
+local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+if value < 0 then redis.call('SET', KEYS[1], 0, 'KEEPTTL') return 0 end
+return value
+"""
+
+_client = None
+_adjust = None
+
+
+def _redis():
+    global _client, _adjust
+    if _client is None:
+        import redis
+        _client = redis.Redis.from_url(
+            getattr(settings, 'UNREAD_COUNTER_REDIS_URL', 'redis://localhost:6379/0'),
+            socket_timeout=2,
+            socket_connect_timeout=2,
+        )
+        _adjust = _client.register_script(_ADJUST_SCRIPT)
+    return _client
+
+
+def _key(user_id):
+    return f'{KEY_PREFIX}{user_id}'
+
+
+def _ttl():
+    return getattr(settings, 'UNREAD_COUNTER_TTL', 60 * 60)
+
+
+def _count_from_db(user_id):
+    from .models import Notification
+    return Notification.objects.filter(user_id=user_id, is_read=False).count()
+
+
+def get_unread_count(user_id) -> int:
+    """Current unread count for a user, seeding the counter if needed."""
+    try:
+        client = _redis()
+        value = client.get(_key(user_id))
+        if value is not None:
+            return int(value)
+        count = _count_from_db(user_id)
+        client.set(_key(user_id), count, ex=_ttl(), nx=True)
+        return count
+    except Exception as e:
+        logger.warning(f"Unread counter unavailable, counting in DB: {e}")
+        return _count_from_db(user_id)
+
+
+def _apply(deltas):
+    try:
+        _redis()
+        with _client.pipeline(transaction=False) as pipe:
+            for user_id, delta in deltas.items():
+                if delta:
+                    _adjust(keys=[_key(user_id)], args=[delta], client=pipe)
+            pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not update unread counters: {e}")
+
+
+def adjust(deltas):
+    """
+    Apply {user_id: delta} to the users' counters once the current
+    transaction commits. Missing counters are left alone (seeded on read).
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if deltas:
+        transaction.on_commit(lambda: _apply(deltas))
+
+
+def reconcile() -> int:
+    """Overwrite every live counter with the database value. Returns the
+    number of counters checked."""
+    from django.db.models import Count
+    from .models import Notification
+
+    client = _redis()
+    keys = list(client.scan_iter(match=f'{KEY_PREFIX}*', count=500))
+    if not keys:
+        return 0
+    user_ids = [int(key.decode().rsplit(':', 1)[1]) for key in keys]
+    counts = dict(
+        Notification.objects.filter(user_id__in=user_ids, is_read=False)
+        .values('user_id').annotate(n=Count('id')).values_list('user_id', 'n')
+    )
+    with client.pipeline(transaction=False) as pipe:
+        for user_id in user_ids:
+            pipe.set(_key(user_id), counts.get(user_id, 0), ex=_ttl(), xx=True)
+        pipe.execute()
+    return len(user_ids)
@@ -5,7 +5,8 @@ from .views import (
     NotificationPreferenceView,
     PushSubscriptionViewSet,
     VapidKeyView,
-    DailyStatsView
+    DailyStatsView,
+    DashboardStatsView,
 )
 
 router = DefaultRouter()
@@ -17,4 +18,5 @@ urlpatterns = [
     path('preferences/', NotificationPreferenceView.as_view(), name='notification-preferences'),
     path('vapid-key/', VapidKeyView.as_view(), name='vapid-key'),
     path('stats/daily/', DailyStatsView.as_view(), name='daily-stats'),
+    path('stats/dashboard/', DashboardStatsView.as_view(), name='dashboard-stats'),
 ]
@@ -7,6 +7,8 @@ from django.conf import settings
 from datetime import timedelta
 
 from .models import Notification, PushSubscription, NotificationPreference, DailyStats
+from .stats import STATS, get_stats
+from . import unread
 from .serializers import (
     NotificationSerializer,
     PushSubscriptionSerializer,
@@ -29,10 +31,11 @@ class NotificationViewSet(viewsets.ModelViewSet):
     def mark_read(self, request, pk=None):
         """Mark a single notification as read."""
         notification = self.get_object()
-        if not notification.is_read:
-            notification.is_read = True
-            notification.read_at = timezone.now()
-            notification.save()
+        updated = Notification.objects.filter(pk=notification.pk, is_read=False).update(
+            is_read=True,
+            read_at=timezone.now()
+        )
+        unread.adjust({request.user.id: -updated})
         return Response({'status': 'marked as read'})
 
     @action(detail=False, methods=['post'])
@@ -45,16 +48,13 @@ class NotificationViewSet(viewsets.ModelViewSet):
             is_read=True,
             read_at=timezone.now()
         )
+        unread.adjust({request.user.id: -count})
         return Response({'status': 'success', 'count': count})
 
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
         """Get count of unread notifications."""
-        count = Notification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).count()
-        return Response({'count': count})
+        return Response({'count': unread.get_unread_count(request.user.id)})
 
 
 class NotificationPreferenceView(APIView):
@@ -131,144 +131,43 @@ class VapidKeyView(APIView):
         return Response({'public_key': vapid_public_key})
 
 
+class DashboardStatsView(APIView):
+    """All admin dashboard stat tiles in one request (see stats.py)."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(get_stats(*STATS))
+
+
 class DailyStatsView(APIView):
-    """View for daily statistics - fetches real-time data from leads, quotes, invoices."""
+    """View for daily statistics - reads the DailyStats rollups (see rollups.py)."""
 
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         """Get daily stats for a given period."""
-        from leads.models import ContactLead, LocalAdsLead
-        from quotes.models import Quote, Invoice
-        from django.db.models import Sum, Count
-        from django.db.models.functions import TruncDate
-        from collections import defaultdict
+        from .rollups import ROLLUP_FIELDS, daily_rows
 
         days = int(request.query_params.get('days', 30))
         days = min(days, 365)  # Cap at 1 year
 
-        end_date = timezone.now().date()
+        end_date = timezone.localdate()
         start_date = end_date - timedelta(days=days - 1)
 
-        # Initialize daily data structure
-        daily_data = defaultdict(lambda: {
-            'new_leads_website': 0,
-            'new_leads_local_ads': 0,
-            'leads_contacted': 0,
-            'leads_converted': 0,
-            'quotes_created': 0,
-            'quotes_sent': 0,
-            'quotes_accepted': 0,
-            'quotes_total_value': 0,
-            'invoices_created': 0,
-            'invoices_paid': 0,
-            'invoices_paid_value': 0,
-        })
-
-        # Website leads by day
-        website_leads = ContactLead.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date
-        ).annotate(day=TruncDate('created_at')).values('day').annotate(count=Count('id'))
-        for item in website_leads:
-            daily_data[item['day']]['new_leads_website'] = item['count']
-
-        # Ads leads by day
-        ads_leads = LocalAdsLead.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date
-        ).annotate(day=TruncDate('created_at')).values('day').annotate(count=Count('id'))
-        for item in ads_leads:
-            daily_data[item['day']]['new_leads_local_ads'] = item['count']
-
-        # Contacted leads by day (based on updated_at)
-        contacted_leads = ContactLead.objects.filter(
-            status='contacted',
-            updated_at__date__gte=start_date,
-            updated_at__date__lte=end_date
-        ).annotate(day=TruncDate('updated_at')).values('day').annotate(count=Count('id'))
-        for item in contacted_leads:
-            daily_data[item['day']]['leads_contacted'] = item['count']
-
-        # Converted leads by day
-        converted_leads = ContactLead.objects.filter(
-            status='converted',
-            updated_at__date__gte=start_date,
-            updated_at__date__lte=end_date
-        ).annotate(day=TruncDate('updated_at')).values('day').annotate(count=Count('id'))
-        for item in converted_leads:
-            daily_data[item['day']]['leads_converted'] = item['count']
-
-        # Quotes created by day
-        quotes_created = Quote.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date
-        ).annotate(day=TruncDate('created_at')).values('day').annotate(
-            count=Count('id'),
-            value=Sum('total')
-        )
-        for item in quotes_created:
-            daily_data[item['day']]['quotes_created'] = item['count']
-            daily_data[item['day']]['quotes_total_value'] = float(item['value'] or 0)
-
-        # Quotes sent by day
-        quotes_sent = Quote.objects.filter(
-            status='sent',
-            updated_at__date__gte=start_date,
-            updated_at__date__lte=end_date
-        ).annotate(day=TruncDate('updated_at')).values('day').annotate(count=Count('id'))
-        for item in quotes_sent:
-            daily_data[item['day']]['quotes_sent'] = item['count']
-
-        # Quotes accepted by day
-        quotes_accepted = Quote.objects.filter(
-            status='accepted',
-            updated_at__date__gte=start_date,
-            updated_at__date__lte=end_date
-        ).annotate(day=TruncDate('updated_at')).values('day').annotate(count=Count('id'))
-        for item in quotes_accepted:
-            daily_data[item['day']]['quotes_accepted'] = item['count']
-
-        # Invoices created by day
-        invoices_created = Invoice.objects.filter(
-            created_at__date__gte=start_date,
-            created_at__date__lte=end_date
-        ).annotate(day=TruncDate('created_at')).values('day').annotate(count=Count('id'))
-        for item in invoices_created:
-            daily_data[item['day']]['invoices_created'] = item['count']
-
-        # Invoices paid by day
-        invoices_paid = Invoice.objects.filter(
-            status='paid',
-            paid_at__date__gte=start_date,
-            paid_at__date__lte=end_date
-        ).annotate(day=TruncDate('paid_at')).values('day').annotate(
-            count=Count('id'),
-            value=Sum('total')
-        )
-        for item in invoices_paid:
-            daily_data[item['day']]['invoices_paid'] = item['count']
-            daily_data[item['day']]['invoices_paid_value'] = float(item['value'] or 0)
+        rows = daily_rows(start_date, end_date)
 
         # Build ordered list of days
         days_list = []
         current_date = start_date
         while current_date <= end_date:
-            data = daily_data[current_date]
-            days_list.append({
-                'date': current_date.isoformat(),
-                'new_leads_website': data['new_leads_website'],
-                'new_leads_local_ads': data['new_leads_local_ads'],
-                'leads_contacted': data['leads_contacted'],
-                'leads_converted': data['leads_converted'],
-                'quotes_created': data['quotes_created'],
-                'quotes_sent': data['quotes_sent'],
-                'quotes_accepted': data['quotes_accepted'],
-                'quotes_total_value': data['quotes_total_value'],
-                'invoices_created': data['invoices_created'],
-                'invoices_paid': data['invoices_paid'],
-                'invoices_paid_value': data['invoices_paid_value'],
-            })
+            row = rows[current_date]
+            data = {'date': current_date.isoformat()}
+            for field in ROLLUP_FIELDS:
+                data[field] = getattr(row, field)
+            data['quotes_total_value'] = float(data['quotes_total_value'])
+            data['invoices_paid_value'] = float(data['invoices_paid_value'])
+            days_list.append(data)
             current_date += timedelta(days=1)
 
         # Calculate totals
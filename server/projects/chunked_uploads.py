@@ -0,0 +1,246 @@
+"""
+Resumable chunked uploads for project videos (main video and phase media),
+so a dropped connection on a job site resumes instead of restarting a
+multi-hundred-megabyte upload from zero.
+
+The protocol follows tus (offsets in an Upload-Offset header, per-chunk
+checksums in Upload-Checksum) on the project's own routes:
+
+    POST   /api/projects/<pk>/uploads/             {target, filename, content_type, size}
+           -> 201 {id, offset: 0, chunk_size, ...}
+    GET    /api/projects/<pk>/uploads/<id>/        current offset (HEAD too)
+    PATCH  /api/projects/<pk>/uploads/<id>/        raw chunk body, headers
+           Upload-Offset: <offset>, Upload-Checksum: sha256 <base64 digest>
+           -> {offset, ...}; 409 {offset} if the offset doesn't match
+    DELETE /api/projects/<pk>/uploads/<id>/        abandon
+
+Every chunk but the last is exactly `chunk_size` bytes. A chunk is spooled
+(SpooledTemporaryFile, so memory stays bounded) while its sha256 is
+computed; one that doesn't match its checksum is rejected and the offset
+stays put. Verified chunks go:
+
+- on R2 (S3Boto3Storage): straight up as parts of an S3 multipart upload,
+  part number offset // chunk_size + 1; completed when the last arrives.
+- on local disk: into a part file under CHUNKED_UPLOAD_TEMP_DIR, which is
+  moved into storage when the last chunk arrives.
+
+When the upload completes, the response carries an `upload_token`
+(config/direct_uploads.py) to attach the video with the main-video / phase
+media endpoints, exactly like a direct upload. Uploads untouched for
+CHUNKED_UPLOAD_EXPIRE_HOURS -- abandoned halfway, or finished but never
+attached -- are cleaned up by the cleanup_video_uploads beat task.
+"""
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from config import direct_uploads
+from config.storage_adapter import is_s3
+
+from .models import VideoUpload
+
+logger = logging.getLogger(__name__)
+
+READ_BLOCK = 1024 * 1024
+# S3 rejects multipart parts under 5 MB (except the last one).
+MIN_CHUNK_MB = 5
+
+
+class OffsetConflict(Exception):
+    """The client's Upload-Offset doesn't match what the server has."""
+
+    def __init__(self, offset):
+        super().__init__(f'Upload is at offset {offset}')
+        self.offset = offset
+
+
+class _PartFile(File):
+    # FileSystemStorage moves (rather than copies) content that has a
+    # temporary_file_path, like Django's own TemporaryUploadedFile.
+    def temporary_file_path(self):
+        return self.name
+
+
+def _chunk_size():
+    return max(getattr(settings, 'CHUNKED_UPLOAD_CHUNK_MB', 8), MIN_CHUNK_MB) * 1024 * 1024
+
+
+def _temp_dir():
+    path = getattr(settings, 'CHUNKED_UPLOAD_TEMP_DIR', '') or os.path.join(tempfile.gettempdir(), 'chunked-uploads')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _part_path(upload):
+    return os.path.join(_temp_dir(), f'{upload.id}.part')
+
+
+def _scope(upload):
+    return f'project:{upload.project_id}'
+
+
+def _client(storage):
+    return storage.connection.meta.client
+
+
+def state(upload):
+    """Serialized upload, for the API."""
+    data = {
+        'id': str(upload.id),
+        'target': upload.target,
+        'key': upload.key,
+        'size': upload.size,
+        'offset': upload.offset,
+        'chunk_size': upload.chunk_size,
+        'status': upload.status,
+    }
+    if upload.status == 'complete':
+        data['upload_token'] = direct_uploads.sign(
+            upload.target, upload.key, upload.size, upload.content_type, _scope(upload)
+        )
+    return data
+
+
+def start(project, data):
+    """Validate the upload request and open a new VideoUpload."""
+    target = data.get('target')
+    if target not in dict(VideoUpload.TARGET_CHOICES):
+        raise ValidationError({'target': 'Expected project_main_video or project_media.'})
+    key, content_type, size = direct_uploads.prepare(target, data)
+    upload = VideoUpload(
+        project=project, target=target, key=key, content_type=content_type,
+        size=size, chunk_size=_chunk_size(),
+    )
+    storage = direct_uploads.storage_for(target)
+    if is_s3(storage):
+        params = dict(storage.get_object_parameters(key))
+        params['ContentType'] = content_type
+        response = _client(storage).create_multipart_upload(Bucket=storage.bucket_name, Key=key, **params)
+        upload.s3_upload_id = response['UploadId']
+    else:
+        open(_part_path(upload), 'wb').close()
+    upload.save()
+    return upload
+
+
+def _parse_checksum(header):
+    algorithm, _, value = (header or '').partition(' ')
+    if algorithm.lower() != 'sha256' or not value:
+        raise ValidationError({'detail': 'Upload-Checksum header "sha256 <base64 digest>" is required.'})
+    try:
+        return base64.b64decode(value.strip(), validate=True)
+    except (binascii.Error, ValueError):
+        raise ValidationError({'detail': 'Upload-Checksum digest is not valid base64.'})
+
+
+def write_chunk(upload, offset, stream, checksum_header):
+    """Verify and store one chunk of `upload` starting at `offset`, read
+    from `stream`. Completes the upload when it was the last chunk."""
+    if upload.status != 'uploading' or offset != upload.offset:
+        raise OffsetConflict(upload.offset)
+    expected_digest = _parse_checksum(checksum_header)
+    expected_length = min(upload.chunk_size, upload.size - offset)
+
+    with tempfile.SpooledTemporaryFile(max_size=READ_BLOCK, dir=_temp_dir()) as chunk:
+        sha256, length = hashlib.sha256(), 0
+        for block in iter(lambda: stream.read(READ_BLOCK), b''):
+            length += len(block)
+            if length > expected_length:
+                raise ValidationError({'detail': f'Chunk must be {expected_length} bytes.'})
+            sha256.update(block)
+            chunk.write(block)
+        if length != expected_length:
+            raise ValidationError({'detail': f'Chunk must be {expected_length} bytes, got {length}.'})
+        if sha256.digest() != expected_digest:
+            raise ValidationError({'detail': 'Chunk checksum mismatch.'})
+        chunk.seek(0)
+
+        storage = direct_uploads.storage_for(upload.target)
+        parts = list(upload.parts)
+        if is_s3(storage):
+            part_number = offset // upload.chunk_size + 1
+            response = _client(storage).upload_part(
+                Bucket=storage.bucket_name, Key=upload.key, UploadId=upload.s3_upload_id,
+                PartNumber=part_number, Body=chunk, ContentLength=length,
+            )
+            parts = [p for p in parts if p['PartNumber'] != part_number]
+            parts.append({'PartNumber': part_number, 'ETag': response['ETag']})
+        else:
+            with open(_part_path(upload), 'r+b') as f:
+                f.seek(offset)
+                while block := chunk.read(READ_BLOCK):
+                    f.write(block)
+
+    new_offset = offset + length
+    # Compare-and-set on the offset, so two clients racing on the same
+    # chunk can't both advance it.
+    advanced = VideoUpload.objects.filter(pk=upload.pk, offset=offset, status='uploading').update(
+        offset=new_offset, parts=parts, updated_at=timezone.now()
+    )
+    if not advanced:
+        upload.refresh_from_db()
+        raise OffsetConflict(upload.offset)
+    upload.offset, upload.parts = new_offset, parts
+    if new_offset == upload.size:
+        _complete(upload)
+    return upload
+
+
+def _complete(upload):
+    storage = direct_uploads.storage_for(upload.target)
+    if is_s3(storage):
+        _client(storage).complete_multipart_upload(
+            Bucket=storage.bucket_name, Key=upload.key, UploadId=upload.s3_upload_id,
+            MultipartUpload={'Parts': sorted(upload.parts, key=lambda p: p['PartNumber'])},
+        )
+    else:
+        with open(_part_path(upload), 'rb') as f:
+            saved = storage.save(upload.key, _PartFile(f, name=_part_path(upload)))
+        if os.path.exists(_part_path(upload)):
+            os.remove(_part_path(upload))
+        upload.key = saved
+    upload.status = 'complete'
+    upload.save(update_fields=['key', 'status', 'updated_at'])
+
+
+def abort(upload):
+    """Drop an upload and whatever of it has been stored so far."""
+    storage = direct_uploads.storage_for(upload.target)
+    if upload.status == 'uploading':
+        if upload.s3_upload_id:
+            try:
+                _client(storage).abort_multipart_upload(
+                    Bucket=storage.bucket_name, Key=upload.key, UploadId=upload.s3_upload_id
+                )
+            except Exception as e:
+                logger.warning(f"Could not abort multipart upload {upload.s3_upload_id}: {e}")
+        elif os.path.exists(_part_path(upload)):
+            os.remove(_part_path(upload))
+    upload.delete()
+
+
+def cleanup(older_than):
+    """Abort uploads untouched for longer than `older_than`, and forget
+    completed ones, deleting the stored video if it was never attached.
+    Returns (aborted, removed)."""
+    aborted = removed = 0
+    stale = VideoUpload.objects.filter(updated_at__lt=timezone.now() - older_than)
+    for upload in stale:
+        if upload.status == 'uploading':
+            abort(upload)
+            aborted += 1
+            continue
+        if not direct_uploads.is_attached(upload.target, upload.key):
+            direct_uploads.storage_for(upload.target).delete(upload.key)
+            removed += 1
+        upload.delete()
+    return aborted, removed
+
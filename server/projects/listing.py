@@ -0,0 +1,97 @@
+"""
+The public project lists (PublicProjectsView, PublicServiceProjectsView):
+denormalized list fields and the cached responses.
+
+ProjectListSerializer needs a phase count and a cover (the first media of
+the first phase). Working those out per request meant prefetching every
+phase and media row of the portfolio; instead they're kept on the Project
+row -- phase_count, cover_media_type, cover_file, cover_poster -- and
+refresh_summary() recomputes them whenever a phase or media item changes
+(signals.py), a reorder moves them (views), or a video's web renditions
+become ready (video_pipeline.py). The list query then only reads projects
+and their job types.
+
+The serialized lists are cached with the same version-key scheme as
+notifications/stats.py: every cached list embeds a version number that
+invalidate() bumps on any project, phase, media or job type write, so the
+next read rebuilds. PROJECT_LIST_CACHE_SECONDS bounds staleness if an
+invalidation is ever missed (or happens in another process).
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = 'projects:public:version'
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a lost version key never resurrects an
+        # entry cached under an old, small version number.
+        version = int(time.time() * 1000)
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+def invalidate():
+    """Bump the list version so the next read of every list rebuilds."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # No version yet -- nothing cached under it either.
+        pass
+
+
+def cached_list(request, variant, build):
+    """The cached result of build() for this list `variant` (filters,
+    service slug...). Keyed on the request's host too, since the
+    serialized URLs are absolute."""
+    origin = hashlib.sha1(request.build_absolute_uri('/').encode()).hexdigest()[:10]
+    key = f'projects:public:v{_version()}:{origin}:{hashlib.sha1(variant.encode()).hexdigest()}'
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, getattr(settings, 'PROJECT_LIST_CACHE_SECONDS', 300))
+    return data
+
+
+def summary_fields(project_id):
+    """phase_count and the cover fields for one project, from its current
+    phases and media."""
+    from .models import Phase
+
+    phases = Phase.objects.filter(project_id=project_id)
+    fields = {
+        'phase_count': phases.count(),
+        'cover_media_type': 'image',
+        'cover_file': '',
+        'cover_poster': '',
+    }
+    first_phase = phases.order_by('order').first()
+    media = first_phase.media.order_by('order').first() if first_phase else None
+    if media is None:
+        return fields
+    fields['cover_media_type'] = media.media_type
+    if media.media_type == 'youtube':
+        fields['cover_file'] = media.youtube_thumbnail or ''
+    elif media.file:
+        renditions = media.video_renditions or {}
+        if media.video_status == 'ready' and renditions.get('source') == media.file.name:
+            fields['cover_file'] = renditions.get('mp4', '')
+            fields['cover_poster'] = renditions.get('poster', '')
+        else:
+            fields['cover_file'] = media.file.name
+    return fields
+
+
+def refresh_summary(project_id):
+    """Recompute a project's denormalized list fields and invalidate the
+    cached lists."""
+    from .models import Project
+
+    if project_id is not None:
+        Project.objects.filter(pk=project_id).update(**summary_fields(project_id))
+    invalidate()
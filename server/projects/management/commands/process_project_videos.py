@@ -0,0 +1,41 @@
+"""
+Build web renditions (poster, H.264 MP4, optional HLS -- see
+projects/video_pipeline.py) for project videos that don't have them yet:
+videos uploaded before the pipeline existed, and ones that failed (e.g.
+ffmpeg was missing on the worker). New uploads are queued automatically.
+
+By default the work is queued on the Celery 'video' queue; --sync runs it
+here, one video at a time. --force rebuilds videos whose renditions are
+already ready (e.g. after changing PROJECT_VIDEO_MAX_DIMENSION).
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from projects.tasks import process_project_video
+from projects.video_pipeline import SOURCES, is_video
+
+
+class Command(BaseCommand):
+    help = 'Queue (or run) web renditions for project videos that are missing them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync', action='store_true', help='Process here instead of queueing on Celery.')
+        parser.add_argument('--force', action='store_true', help='Also rebuild videos whose renditions are ready.')
+
+    def handle(self, *args, **options):
+        total = 0
+        for model_label, (file_field, status_field, _, _) in SOURCES.items():
+            qs = apps.get_model(model_label).objects.exclude(**{file_field: ''}).exclude(**{f'{file_field}__isnull': True})
+            if not options['force']:
+                qs = qs.exclude(**{status_field: 'ready'})
+            for pk, name in qs.values_list('pk', file_field):
+                if not is_video(name):
+                    continue
+                total += 1
+                if options['sync']:
+                    result = process_project_video(model_label, pk, force=options['force'])
+                    self.stdout.write(f'{model_label} {pk}: {result}')
+                else:
+                    process_project_video.delay(model_label, pk, force=options['force'])
+        verb = 'Processed' if options['sync'] else 'Queued'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {total} video(s).'))
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:27
+
+from django.db import migrations, models
+
+from projects.models import extract_youtube_id
+
+
+def backfill_list_summary(apps, schema_editor):
+    # Mirrors projects.listing.summary_fields() on the historical models.
+    Project = apps.get_model('projects', 'Project')
+    Phase = apps.get_model('projects', 'Phase')
+    ProjectMedia = apps.get_model('projects', 'ProjectMedia')
+    for project in Project.objects.all():
+        phases = Phase.objects.filter(project=project)
+        fields = {'phase_count': phases.count(), 'cover_media_type': 'image', 'cover_file': '', 'cover_poster': ''}
+        first_phase = phases.order_by('order').first()
+        media = ProjectMedia.objects.filter(phase=first_phase).order_by('order').first() if first_phase else None
+        if media is not None:
+            fields['cover_media_type'] = media.media_type
+            if media.media_type == 'youtube':
+                vid = extract_youtube_id(media.youtube_url)
+                fields['cover_file'] = f'https://img.youtube.com/vi/{vid}/maxresdefault.jpg' if vid else ''
+            elif media.file:
+                renditions = media.video_renditions or {}
+                if media.video_status == 'ready' and renditions.get('source') == media.file.name:
+                    fields['cover_file'] = renditions.get('mp4', '')
+                    fields['cover_poster'] = renditions.get('poster', '')
+                else:
+                    fields['cover_file'] = media.file.name
+        Project.objects.filter(pk=project.pk).update(**fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_video_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='cover_file',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='cover_media_type',
+            field=models.CharField(default='image', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='cover_poster',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='phase_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_list_summary, migrations.RunPython.noop),
+    ]
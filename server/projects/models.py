@@ -1,5 +1,6 @@
 import os
 import re
+import uuid
 from django.db import models
 from django.utils.text import slugify
 
@@ -17,6 +18,15 @@ WORK_STATUS_CHOICES = [
 
 VIDEO_EXTENSIONS = {'.mp4', '.mov', '.webm', '.avi', '.mkv'}
 
+# Progress of the web renditions of an uploaded video (projects/video_pipeline.py).
+VIDEO_STATUS_CHOICES = [
+    ('none', 'None'),
+    ('pending', 'Pending'),
+    ('processing', 'Processing'),
+    ('ready', 'Ready'),
+    ('failed', 'Failed'),
+]
+
 YOUTUBE_PATTERNS = [
     r'(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]{11})',
     r'youtube\.com/embed/([a-zA-Z0-9_-]{11})',
@@ -61,6 +71,17 @@ class Project(models.Model):
     main_video = models.FileField(upload_to='projects/main_videos/', null=True, blank=True)
     main_video_url = models.URLField(max_length=500, blank=True, default='')
     main_video_type = models.CharField(max_length=10, choices=MAIN_VIDEO_TYPE_CHOICES, default='none')
+    main_video_status = models.CharField(max_length=12, choices=VIDEO_STATUS_CHOICES, default='none')
+    # Poster, web MP4 and HLS renditions of main_video, with probe metadata.
+    main_video_renditions = models.JSONField(default=dict, blank=True)
+    # Denormalized for the public project lists (projects/listing.py): kept
+    # in step with the phases/media by listing.refresh_summary().
+    phase_count = models.PositiveIntegerField(default=0)
+    cover_media_type = models.CharField(max_length=10, default='image')
+    # Storage key of the cover image/video (a YouTube thumbnail URL for
+    # YouTube media), and of the video's poster frame.
+    cover_file = models.CharField(max_length=500, blank=True, default='')
+    cover_poster = models.CharField(max_length=500, blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -126,6 +147,9 @@ class ProjectMedia(models.Model):
     file = models.FileField(upload_to='projects/media/', null=True, blank=True)
     youtube_url = models.URLField(max_length=500, blank=True, default='')
     media_type = models.CharField(max_length=10, choices=MEDIA_TYPE_CHOICES, default='image')
+    video_status = models.CharField(max_length=12, choices=VIDEO_STATUS_CHOICES, default='none')
+    # Poster, web MP4 and HLS renditions of a video file, with probe metadata.
+    video_renditions = models.JSONField(default=dict, blank=True)
     order = models.PositiveIntegerField(default=0)
     alt_text = models.CharField(max_length=500, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -157,3 +181,40 @@ class ProjectMedia(models.Model):
     def youtube_thumbnail(self):
         vid = extract_youtube_id(self.youtube_url)
         return f'https://img.youtube.com/vi/{vid}/maxresdefault.jpg' if vid else None
+
+
+class VideoUpload(models.Model):
+    """A resumable, chunked upload of a project video (see
+    projects/chunked_uploads.py). Tracks how many bytes have arrived so an
+    interrupted upload picks up where it stopped."""
+
+    TARGET_CHOICES = [
+        ('project_main_video', 'Main Video'),
+        ('project_media', 'Phase Media'),
+    ]
+
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    project = models.ForeignKey(Project, related_name='video_uploads', on_delete=models.CASCADE)
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    key = models.CharField(max_length=500)
+    content_type = models.CharField(max_length=100)
+    size = models.BigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    offset = models.BigIntegerField(default=0)
+    # S3 multipart upload (R2 storage only): upload id and finished parts.
+    s3_upload_id = models.CharField(max_length=255, blank=True)
+    parts = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.project} - {self.key} ({self.offset}/{self.size})"
@@ -8,22 +8,59 @@ class ProjectServiceTypeSerializer(serializers.ModelSerializer):
         fields = ['slug', 'name']
 
 
+def _storage_url(serializer, storage, key):
+    if not key:
+        return None
+    url = storage.url(key)
+    request = serializer.context.get('request')
+    return request.build_absolute_uri(url) if request else url
+
+
+def _rendition_urls(serializer, field_file, status, renditions):
+    """(playable URL, poster URL, HLS URL) for a video FileField: the web
+    renditions from projects/video_pipeline.py once they're ready, the
+    original file until then."""
+    if not field_file:
+        return None, None, None
+    if status != 'ready' or renditions.get('source') != field_file.name:
+        return _storage_url(serializer, field_file.storage, field_file.name), None, None
+    return tuple(
+        _storage_url(serializer, field_file.storage, renditions.get(kind))
+        for kind in ('mp4', 'poster', 'hls')
+    )
+
+
 class ProjectMediaSerializer(serializers.ModelSerializer):
     file = serializers.SerializerMethodField()
+    poster = serializers.SerializerMethodField()
+    hls_url = serializers.SerializerMethodField()
+    original_file = serializers.SerializerMethodField()
     youtube_embed_url = serializers.SerializerMethodField()
     youtube_thumbnail = serializers.SerializerMethodField()
 
     class Meta:
         model = ProjectMedia
-        fields = ['id', 'file', 'youtube_url', 'youtube_embed_url', 'youtube_thumbnail', 'media_type', 'order', 'alt_text', 'created_at']
+        fields = [
+            'id', 'file', 'poster', 'hls_url', 'original_file', 'video_status', 'youtube_url',
+            'youtube_embed_url', 'youtube_thumbnail', 'media_type', 'order', 'alt_text', 'created_at',
+        ]
+
+    def _renditions(self, obj):
+        return _rendition_urls(self, obj.file, obj.video_status, obj.video_renditions)
 
     def get_file(self, obj):
+        return self._renditions(obj)[0]
+
+    def get_poster(self, obj):
+        return self._renditions(obj)[1]
+
+    def get_hls_url(self, obj):
+        return self._renditions(obj)[2]
+
+    def get_original_file(self, obj):
         if not obj.file:
             return None
-        request = self.context.get('request')
-        if request:
-            return request.build_absolute_uri(obj.file.url)
-        return obj.file.url
+        return _storage_url(self, obj.file.storage, obj.file.name)
 
     def get_youtube_embed_url(self, obj):
         return obj.youtube_embed_url
@@ -42,14 +79,21 @@ class PhaseSerializer(serializers.ModelSerializer):
 
 class MainVideoSerializerMixin(serializers.Serializer):
     main_video = serializers.SerializerMethodField()
+    main_video_poster = serializers.SerializerMethodField()
+    main_video_hls_url = serializers.SerializerMethodField()
+    main_video_status = serializers.ReadOnlyField()
+
+    def _main_video_renditions(self, obj):
+        return _rendition_urls(self, obj.main_video, obj.main_video_status, obj.main_video_renditions)
 
     def get_main_video(self, obj):
-        if not obj.main_video:
-            return None
-        request = self.context.get('request')
-        if request:
-            return request.build_absolute_uri(obj.main_video.url)
-        return obj.main_video.url
+        return self._main_video_renditions(obj)[0]
+
+    def get_main_video_poster(self, obj):
+        return self._main_video_renditions(obj)[1]
+
+    def get_main_video_hls_url(self, obj):
+        return self._main_video_renditions(obj)[2]
 
 
 class ProjectListSerializer(MainVideoSerializerMixin, serializers.ModelSerializer):
@@ -57,41 +101,42 @@ class ProjectListSerializer(MainVideoSerializerMixin, serializers.ModelSerialize
     phase_count = serializers.SerializerMethodField()
     cover_image = serializers.SerializerMethodField()
     cover_media_type = serializers.SerializerMethodField()
+    cover_poster = serializers.SerializerMethodField()
 
     class Meta:
         model = Project
-        fields = ['id', 'title', 'slug', 'status', 'work_status', 'is_featured', 'job_types', 'phase_count', 'main_video', 'main_video_type', 'cover_image', 'cover_media_type', 'created_at', 'updated_at']
+        fields = [
+            'id', 'title', 'slug', 'status', 'work_status', 'is_featured', 'job_types', 'phase_count',
+            'main_video', 'main_video_poster', 'main_video_hls_url', 'main_video_status', 'main_video_type',
+            'cover_image', 'cover_media_type', 'cover_poster', 'created_at', 'updated_at',
+        ]
 
     def get_job_types(self, obj):
-        return list(obj.job_types.values_list('slug', flat=True))
+        # .all() rather than values_list() so the job_types prefetch is used.
+        return [job_type.slug for job_type in obj.job_types.all()]
 
     def get_phase_count(self, obj):
-        return obj.phases.count()
+        return obj.phase_count
 
-    def _get_cover_media(self, obj):
-        first_phase = obj.phases.order_by('order').first()
-        if first_phase:
-            return first_phase.media.order_by('order').first()
-        return None
+    # The cover is denormalized onto the project (projects/listing.py), so
+    # listing never reads phases or media.
+    def _cover_url(self, key):
+        if key.startswith(('http://', 'https://')):  # YouTube thumbnail
+            return key
+        return _storage_url(self, ProjectMedia._meta.get_field('file').storage, key)
 
     def get_cover_image(self, obj):
         if obj.main_video_type == 'youtube' and obj.main_video_thumbnail:
             return obj.main_video_thumbnail
-        media = self._get_cover_media(obj)
-        if not media:
-            return None
-        if media.media_type == 'youtube':
-            return media.youtube_thumbnail
-        if media.file:
-            request = self.context.get('request')
-            return request.build_absolute_uri(media.file.url) if request else media.file.url
-        return None
+        return self._cover_url(obj.cover_file)
+
+    def get_cover_poster(self, obj):
+        return self._cover_url(obj.cover_poster)
 
     def get_cover_media_type(self, obj):
         if obj.main_video_type == 'youtube':
             return 'youtube'
-        media = self._get_cover_media(obj)
-        return media.media_type if media else 'image'
+        return obj.cover_media_type
 
 
 class ProjectDetailSerializer(MainVideoSerializerMixin, serializers.ModelSerializer):
@@ -110,7 +155,8 @@ class ProjectDetailSerializer(MainVideoSerializerMixin, serializers.ModelSeriali
         model = Project
         fields = [
             'id', 'title', 'slug', 'description', 'status', 'work_status', 'is_featured', 'job_types',
-            'main_video', 'main_video_url', 'main_video_type', 'main_video_embed_url', 'main_video_thumbnail',
+            'main_video', 'main_video_poster', 'main_video_hls_url', 'main_video_status',
+            'main_video_url', 'main_video_type', 'main_video_embed_url', 'main_video_thumbnail',
             'phases', 'created_at', 'updated_at'
         ]
         read_only_fields = ['slug']
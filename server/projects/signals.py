@@ -0,0 +1,52 @@
+"""
+Django signals for projects app.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import listing
+from .models import Phase, Project
+
+
+@receiver(post_save, sender='projects.ProjectMedia')
+@receiver(post_save, sender='projects.Project')
+def queue_video_renditions(sender, instance, **kwargs):
+    """Queue web renditions for a newly uploaded or replaced video (see
+    projects/video_pipeline.py); a no-op when the video hasn't changed."""
+    from .video_pipeline import schedule
+
+    schedule(instance)
+
+
+@receiver(post_delete, sender='projects.ProjectMedia')
+@receiver(post_delete, sender='projects.Project')
+def delete_video_renditions(sender, instance, **kwargs):
+    from .video_pipeline import forget
+
+    forget(instance)
+
+
+@receiver(post_save, sender='projects.Phase')
+@receiver(post_delete, sender='projects.Phase')
+def refresh_project_summary_for_phase(sender, instance, **kwargs):
+    """Keep the project's phase count and cover current (projects/listing.py)."""
+    listing.refresh_summary(instance.project_id)
+
+
+@receiver(post_save, sender='projects.ProjectMedia')
+@receiver(post_delete, sender='projects.ProjectMedia')
+def refresh_project_summary_for_media(sender, instance, **kwargs):
+    # Looked up rather than instance.phase: during a cascade the phase may
+    # already be gone (its own post_delete refreshes the project then).
+    listing.refresh_summary(
+        Phase.objects.filter(pk=instance.phase_id).values_list('project_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender='projects.Project')
+@receiver(post_delete, sender='projects.Project')
+@receiver(post_save, sender='projects.ProjectServiceType')
+@receiver(post_delete, sender='projects.ProjectServiceType')
+@receiver(m2m_changed, sender=Project.job_types.through)
+def invalidate_project_lists(sender, **kwargs):
+    listing.invalidate()
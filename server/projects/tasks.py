@@ -0,0 +1,33 @@
+"""
+Celery tasks for the projects app.
+"""
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+
+
+@shared_task(soft_time_limit=getattr(settings, 'PROJECT_VIDEO_TIMEOUT', 60 * 60) * 3)
+def process_project_video(model_label, pk, force=False):
+    """
+    Build the poster, web MP4 and (optionally) HLS renditions of a project
+    video -- a ProjectMedia file or a Project's main video. Queued on save
+    (projects/signals.py); runs on the 'video' queue.
+    """
+    from .video_pipeline import process
+
+    return process(model_label, pk, force=force)
+
+
+@shared_task
+def cleanup_video_uploads():
+    """
+    Abort resumable video uploads (projects/chunked_uploads.py) nobody has
+    touched for CHUNKED_UPLOAD_EXPIRE_HOURS -- freeing their part files or
+    S3 multipart parts -- and remove finished ones that were never attached
+    to a project. Runs via Celery Beat.
+    """
+    from .chunked_uploads import cleanup
+
+    aborted, removed = cleanup(older_than=timedelta(hours=getattr(settings, 'CHUNKED_UPLOAD_EXPIRE_HOURS', 24)))
+    return f"Aborted {aborted} abandoned video uploads, removed {removed} unattached videos"
@@ -8,6 +8,9 @@ from .views import (
 
 project_list = ProjectViewSet.as_view({'get': 'list', 'post': 'create'})
 project_detail = ProjectViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'})
+project_upload_url = ProjectViewSet.as_view({'post': 'upload_url'})
+project_uploads = ProjectViewSet.as_view({'post': 'uploads'})
+project_upload_detail = ProjectViewSet.as_view({'get': 'upload_detail', 'patch': 'upload_detail', 'delete': 'upload_detail'})
 project_main_video = ProjectViewSet.as_view({'post': 'main_video', 'delete': 'main_video'})
 project_phases = ProjectViewSet.as_view({'get': 'phases', 'post': 'phases'})
 project_phase_detail = ProjectViewSet.as_view({'put': 'phase_detail', 'delete': 'phase_detail'})
@@ -21,6 +24,13 @@ urlpatterns = [
     path('', project_list, name='project-list'),
     path('<int:pk>/', project_detail, name='project-detail'),
 
+    # Direct-to-storage uploads (config/direct_uploads.py)
+    path('<int:pk>/upload-url/', project_upload_url, name='project-upload-url'),
+
+    # Resumable chunked video uploads (projects/chunked_uploads.py)
+    path('<int:pk>/uploads/', project_uploads, name='project-uploads'),
+    path('<int:pk>/uploads/<uuid:upload_id>/', project_upload_detail, name='project-upload-detail'),
+
     # Main video
     path('<int:pk>/main-video/', project_main_video, name='project-main-video'),
 
@@ -0,0 +1,292 @@
+"""
+Web renditions of uploaded project videos (ProjectMedia.file and
+Project.main_video), which are otherwise served byte-for-byte -- often 4K
+HEVC phone recordings that many browsers can't play and that take ages to
+start.
+
+Saving a row with a new video file (signals.py) marks it 'pending' and
+queues tasks.process_project_video on the 'video' queue once the
+transaction commits, so the upload response never waits on ffmpeg. The
+task, with a locally installed ffmpeg/ffprobe:
+
+- extracts a JPEG poster frame,
+- encodes an H.264/AAC MP4 with +faststart, the long edge capped at
+  PROJECT_VIDEO_MAX_DIMENSION and the bitrate at PROJECT_VIDEO_MAXRATE_KBPS,
+- optionally (PROJECT_VIDEO_HLS) remuxes that MP4 into VOD HLS segments,
+
+and stores them next to the original under projects/renditions/. The
+keys, probe metadata (width, height, duration, codec) and status are kept
+in the row's renditions/status fields; the serializers hand out the
+rendition URLs once they're ready and the original until then.
+
+Idempotent: renditions are tied to the source key they were made from, so
+re-saving the row or a duplicate task delivery does nothing, a replaced
+video gets fresh renditions (the old ones are deleted), and the result of
+a run whose source was replaced mid-encode is thrown away.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+
+from .models import VIDEO_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+# model label -> (file field, status field, renditions field, key folder)
+SOURCES = {
+    'projects.ProjectMedia': ('file', 'video_status', 'video_renditions', 'media'),
+    'projects.Project': ('main_video', 'main_video_status', 'main_video_renditions', 'main_videos'),
+}
+
+
+class VideoProcessingError(Exception):
+    pass
+
+
+def is_video(name):
+    return bool(name) and os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS
+
+
+def _fields(instance):
+    return SOURCES[instance._meta.label]
+
+
+def delete_renditions(storage, renditions):
+    for key in (renditions or {}).get('files', []):
+        try:
+            storage.delete(key)
+        except Exception as e:
+            logger.warning(f"Could not delete video rendition {key}: {e}")
+
+
+def schedule(instance):
+    """Queue renditions for `instance`'s video if it doesn't have them yet
+    (or drop them if the video is gone). Called from post_save."""
+    from .tasks import process_project_video
+
+    file_field, status_field, renditions_field, _ = _fields(instance)
+    field_file = getattr(instance, file_field)
+    name = field_file.name if field_file else ''
+    renditions = getattr(instance, renditions_field) or {}
+    if name and renditions.get('source') == name:
+        return
+    # Image media and projects without a video: nothing to queue or drop,
+    # so don't spend an UPDATE on every save.
+    if not is_video(name) and not renditions and getattr(instance, status_field) == 'none':
+        return
+
+    model = type(instance)
+    delete_renditions(model._meta.get_field(file_field).storage, renditions)
+    if is_video(name):
+        status, renditions = 'pending', {'source': name}
+    else:
+        status, renditions = 'none', {}
+    # .update() rather than save(): no second post_save.
+    model.objects.filter(pk=instance.pk).update(**{status_field: status, renditions_field: renditions})
+    setattr(instance, status_field, status)
+    setattr(instance, renditions_field, renditions)
+    if status == 'pending':
+        label, pk = instance._meta.label, instance.pk
+        transaction.on_commit(lambda: process_project_video.delay(label, pk))
+
+
+def forget(instance):
+    """Delete the renditions of a row that's being deleted."""
+    file_field, _, renditions_field, _ = _fields(instance)
+    delete_renditions(type(instance)._meta.get_field(file_field).storage, getattr(instance, renditions_field))
+
+
+# -- ffmpeg ----------------------------------------------------------------
+
+def _run(args):
+    try:
+        result = subprocess.run(
+            args, capture_output=True, timeout=getattr(settings, 'PROJECT_VIDEO_TIMEOUT', 60 * 60)
+        )
+    except FileNotFoundError:
+        raise VideoProcessingError(f'{args[0]} is not installed')
+    except subprocess.TimeoutExpired:
+        raise VideoProcessingError(f'{os.path.basename(args[0])} timed out')
+    if result.returncode != 0:
+        tail = result.stderr.decode('utf-8', 'replace').strip().splitlines()[-3:]
+        raise VideoProcessingError(f'{os.path.basename(args[0])} failed: {" / ".join(tail)}')
+    return result.stdout
+
+
+def probe(path):
+    """Width, height (as displayed, i.e. after rotation), duration and
+    codec of the first video stream."""
+    output = _run([
+        getattr(settings, 'FFPROBE_BINARY', 'ffprobe'), '-v', 'error', '-print_format', 'json',
+        '-show_format', '-show_streams', '-select_streams', 'v:0', path,
+    ])
+    data = json.loads(output or b'{}')
+    if not data.get('streams'):
+        raise VideoProcessingError('no video stream')
+    stream = data['streams'][0]
+    width, height = stream.get('width', 0), stream.get('height', 0)
+    rotation = 0
+    for side_data in stream.get('side_data_list', []):
+        rotation = int(side_data.get('rotation', rotation) or 0)
+    rotation = int(stream.get('tags', {}).get('rotate', rotation) or 0)
+    if abs(rotation) % 180 == 90:
+        width, height = height, width
+    return {
+        'width': width,
+        'height': height,
+        'duration': round(float(data.get('format', {}).get('duration') or 0), 2),
+        'codec': stream.get('codec_name', ''),
+    }
+
+
+def _scale_filter():
+    # Cap the long edge, keep the aspect ratio and even dimensions (H.264).
+    limit = getattr(settings, 'PROJECT_VIDEO_MAX_DIMENSION', 1920)
+    return (
+        f"scale=w='if(gte(iw,ih),min(iw,{limit}),-2)':h='if(gte(iw,ih),-2,min(ih,{limit}))'"
+    )
+
+
+def _encode(source_path, out_dir, duration):
+    ffmpeg = getattr(settings, 'FFMPEG_BINARY', 'ffmpeg')
+    poster = os.path.join(out_dir, 'poster.jpg')
+    _run([
+        ffmpeg, '-nostdin', '-y', '-ss', str(min(1.0, duration / 2)), '-i', source_path,
+        '-frames:v', '1', '-vf', _scale_filter(), '-q:v', '3', poster,
+    ])
+
+    mp4 = os.path.join(out_dir, 'web.mp4')
+    maxrate = getattr(settings, 'PROJECT_VIDEO_MAXRATE_KBPS', 6000)
+    _run([
+        ffmpeg, '-nostdin', '-y', '-i', source_path,
+        '-map', '0:v:0', '-map', '0:a:0?',
+        '-vf', _scale_filter(), '-c:v', 'libx264', '-preset', 'veryfast', '-profile:v', 'high',
+        '-crf', str(getattr(settings, 'PROJECT_VIDEO_CRF', 23)),
+        '-maxrate', f'{maxrate}k', '-bufsize', f'{maxrate * 2}k', '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac', '-b:a', '128k', '-ac', '2',
+        '-movflags', '+faststart', mp4,
+    ])
+    outputs = {'poster': 'poster.jpg', 'mp4': 'web.mp4'}
+
+    if getattr(settings, 'PROJECT_VIDEO_HLS', False):
+        hls_dir = os.path.join(out_dir, 'hls')
+        os.makedirs(hls_dir)
+        # The MP4 is already H.264/AAC: segmenting it is a remux, not an encode.
+        _run([
+            ffmpeg, '-nostdin', '-y', '-i', mp4, '-c', 'copy', '-f', 'hls',
+            '-hls_time', '6', '-hls_playlist_type', 'vod',
+            '-hls_segment_filename', os.path.join(hls_dir, 'segment_%04d.ts'),
+            os.path.join(hls_dir, 'index.m3u8'),
+        ])
+        outputs['hls'] = 'hls/index.m3u8'
+    return outputs
+
+
+# -- task body -------------------------------------------------------------
+
+def _local_source(storage, name, work_dir):
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        path = None
+    if path and os.path.exists(path):
+        return path
+    path = os.path.join(work_dir, 'source' + os.path.splitext(name)[1].lower())
+    with storage.open(name, 'rb') as src, open(path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    return path
+
+
+def _store(storage, out_dir, prefix):
+    """Save every file under `out_dir` to `prefix` in storage (replacing
+    leftovers of an earlier run). Returns the saved keys."""
+    keys = []
+    for root, _, files in os.walk(out_dir):
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            key = prefix + os.path.relpath(path, out_dir).replace(os.sep, '/')
+            storage.delete(key)
+            with open(path, 'rb') as f:
+                keys.append(storage.save(key, File(f)))
+    return keys
+
+
+def process(model_label, pk, force=False):
+    """Build the renditions for one row. Returns 'ready', 'failed', or
+    'skipped' (not a video, already done, being processed elsewhere, or
+    replaced mid-run)."""
+    file_field, status_field, renditions_field, folder = SOURCES[model_label]
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return 'skipped'
+    name = getattr(instance, file_field).name or ''
+    current = getattr(instance, renditions_field) or {}
+    if not is_video(name):
+        return 'skipped'
+    if not force and current.get('source') == name and getattr(instance, status_field) == 'ready':
+        return 'skipped'
+
+    rows = model.objects.filter(pk=pk, **{file_field: name})
+    claimed = (rows if force else rows.exclude(**{status_field: 'processing'})).update(**{status_field: 'processing'})
+    if not claimed:
+        return 'skipped'
+
+    storage = model._meta.get_field(file_field).storage
+    prefix = f'projects/renditions/{folder}/{pk}/{hashlib.sha1(name.encode()).hexdigest()[:10]}/'
+    keys = []
+    try:
+        with tempfile.TemporaryDirectory(prefix='project-video-') as work_dir:
+            source_path = _local_source(storage, name, work_dir)
+            metadata = probe(source_path)
+            out_dir = os.path.join(work_dir, 'out')
+            os.makedirs(out_dir)
+            outputs = _encode(source_path, out_dir, metadata['duration'])
+            mp4_bytes = os.path.getsize(os.path.join(out_dir, outputs['mp4']))
+            keys = _store(storage, out_dir, prefix)
+    except Exception as e:
+        if isinstance(e, VideoProcessingError):
+            logger.error(f"Video renditions failed for {model_label} {pk} ({name}): {e}")
+        else:
+            logger.exception(f"Video renditions failed for {model_label} {pk} ({name})")
+        delete_renditions(storage, {'files': keys})
+        rows.update(**{status_field: 'failed', renditions_field: {'source': name, 'error': str(e)[:500]}})
+        _refresh_listing(instance)
+        return 'failed'
+
+    renditions = {
+        'source': name,
+        **{kind: prefix + path for kind, path in outputs.items()},
+        'files': keys,
+        'bytes': mp4_bytes,
+        **metadata,
+    }
+    if not rows.update(**{status_field: 'ready', renditions_field: renditions}):
+        # The video was replaced while this one was encoding.
+        delete_renditions(storage, renditions)
+        return 'skipped'
+    # Renditions an earlier run made from the same source, under other keys.
+    stale = set(current.get('files', [])) - set(keys) if current.get('source') == name else set()
+    delete_renditions(storage, {'files': sorted(stale)})
+    _refresh_listing(instance)
+    return 'ready'
+
+
+def _refresh_listing(instance):
+    # The public project lists show the renditions (a phase video can be a
+    # project's cover) -- see listing.py.
+    from . import listing
+
+    if instance._meta.label == 'projects.ProjectMedia':
+        listing.refresh_summary(instance.phase.project_id)
+    else:
+        listing.invalidate()
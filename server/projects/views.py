@@ -1,3 +1,5 @@
+import io
+
 from django.db import transaction
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
@@ -6,7 +8,10 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 
-from .models import Project, Phase, ProjectMedia
+from config import direct_uploads
+
+from . import chunked_uploads, listing
+from .models import Project, Phase, ProjectMedia, VideoUpload
 from .serializers import (
     ProjectListSerializer, ProjectDetailSerializer, PhaseSerializer,
     ProjectMediaSerializer,
@@ -20,7 +25,11 @@ class ProjectViewSet(viewsets.ModelViewSet):
     pagination_class = None  # return plain array, not paginated response
 
     def get_queryset(self):
-        qs = Project.objects.prefetch_related('phases__media', 'job_types')
+        if self.action == 'list':
+            # The list reads the denormalized cover/phase count (listing.py).
+            qs = Project.objects.prefetch_related('job_types')
+        else:
+            qs = Project.objects.prefetch_related('phases__media', 'job_types')
         job_type = self.request.query_params.get('job_type')
         if job_type:
             qs = qs.filter(job_types__slug=job_type)
@@ -43,8 +52,62 @@ class ProjectViewSet(viewsets.ModelViewSet):
             instance.main_video.delete(save=False)
         for media in ProjectMedia.objects.filter(phase__project=instance).exclude(file=''):
             media.file.delete(save=False)
+        for upload in instance.video_uploads.filter(status='uploading'):
+            chunked_uploads.abort(upload)
         instance.delete()
 
+    @action(detail=True, methods=['post'], url_path='upload-url')
+    def upload_url(self, request, pk=None):
+        """Issue a direct-to-storage upload for this project's main video
+        (target 'project_main_video') or a phase media file ('project_media');
+        pass the returned token as `upload_token` to main-video / media."""
+        project = self.get_object()
+        target = request.data.get('target')
+        if target not in ('project_main_video', 'project_media'):
+            return Response({'detail': 'Unknown upload target.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(direct_uploads.issue(request, target, f'project:{project.pk}'))
+
+    @action(detail=True, methods=['post'])
+    def uploads(self, request, pk=None):
+        """Start a resumable chunked video upload (projects/chunked_uploads.py)."""
+        project = self.get_object()
+        upload = chunked_uploads.start(project, request.data)
+        return Response(
+            chunked_uploads.state(upload), status=status.HTTP_201_CREATED,
+            headers={'Upload-Offset': str(upload.offset)},
+        )
+
+    @action(detail=True, methods=['get', 'patch', 'delete'], url_path='uploads/(?P<upload_id>[^/.]+)')
+    def upload_detail(self, request, pk=None, upload_id=None):
+        """GET/HEAD: where a resumable upload stands. PATCH: append the raw
+        chunk in the body at Upload-Offset. DELETE: abandon it."""
+        project = self.get_object()
+        try:
+            upload = project.video_uploads.get(pk=upload_id)
+        except VideoUpload.DoesNotExist:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        if request.method == 'DELETE':
+            chunked_uploads.abort(upload)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        if request.method == 'PATCH':
+            try:
+                offset = int(request.headers.get('Upload-Offset', ''))
+            except ValueError:
+                return Response({'detail': 'Upload-Offset header is required.'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                chunked_uploads.write_chunk(
+                    upload, offset, request.stream or io.BytesIO(), request.headers.get('Upload-Checksum')
+                )
+            except chunked_uploads.OffsetConflict as e:
+                return Response(
+                    {'detail': str(e), 'offset': e.offset}, status=status.HTTP_409_CONFLICT,
+                    headers={'Upload-Offset': str(e.offset)},
+                )
+
+        return Response(chunked_uploads.state(upload), headers={'Upload-Offset': str(upload.offset)})
+
     @action(detail=True, methods=['post', 'delete'], url_path='main-video')
     def main_video(self, request, pk=None):
         project = self.get_object()
@@ -59,6 +122,9 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
 
         file = request.FILES.get('file')
+        upload_token = request.data.get('upload_token')
+        if upload_token:
+            file = direct_uploads.claim(upload_token, 'project_main_video', f'project:{project.pk}')
         youtube_url = (request.data.get('youtube_url') or '').strip()
         if not file and not youtube_url:
             return Response({'detail': 'No file or YouTube URL provided.'}, status=status.HTTP_400_BAD_REQUEST)
@@ -116,6 +182,8 @@ class ProjectViewSet(viewsets.ModelViewSet):
         with transaction.atomic():
             for item in items:
                 project.phases.filter(pk=item['id']).update(order=item['order'])
+        # .update() sends no signals; the first phase may have changed.
+        listing.refresh_summary(project.pk)
         phases = project.phases.order_by('order')
         serializer = PhaseSerializer(phases, many=True, context={'request': request})
         return Response(serializer.data)
@@ -135,6 +203,9 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
 
         file = request.FILES.get('file')
+        upload_token = request.data.get('upload_token')
+        if upload_token:
+            file = direct_uploads.claim(upload_token, 'project_media', f'project:{project.pk}')
         youtube_url = request.data.get('youtube_url', '').strip()
         if not file and not youtube_url:
             return Response({'detail': 'No file or YouTube URL provided.'}, status=status.HTTP_400_BAD_REQUEST)
@@ -172,6 +243,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         with transaction.atomic():
             for item in items:
                 phase.media.filter(pk=item['id']).update(order=item['order'])
+        listing.refresh_summary(project.pk)
         serializer = ProjectMediaSerializer(
             phase.media.order_by('order'), many=True, context={'request': request}
         )
@@ -182,15 +254,19 @@ class PublicProjectsView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        qs = Project.objects.filter(status='published').prefetch_related('phases__media', 'job_types')
         is_featured = request.query_params.get('is_featured')
-        if is_featured is not None and is_featured.lower() in ('true', '1'):
-            qs = qs.filter(is_featured=True)
+        is_featured = is_featured is not None and is_featured.lower() in ('true', '1')
         job_type = request.query_params.get('job_type')
-        if job_type:
-            qs = qs.filter(job_types__slug=job_type).distinct()
-        serializer = ProjectListSerializer(qs, many=True, context={'request': request})
-        return Response(serializer.data)
+
+        def build():
+            qs = Project.objects.filter(status='published').prefetch_related('job_types')
+            if is_featured:
+                qs = qs.filter(is_featured=True)
+            if job_type:
+                qs = qs.filter(job_types__slug=job_type).distinct()
+            return ProjectListSerializer(qs, many=True, context={'request': request}).data
+
+        return Response(listing.cached_list(request, f'list:{is_featured}:{job_type or ""}', build))
 
 
 class PublicProjectDetailView(APIView):
@@ -216,9 +292,11 @@ class PublicServiceProjectsView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, service_slug):
-        projects = Project.objects.filter(
-            job_types__slug=service_slug,
-            status='published'
-        ).prefetch_related('phases__media', 'job_types').distinct()[:6]
-        serializer = ProjectListSerializer(projects, many=True, context={'request': request})
-        return Response(serializer.data)
+        def build():
+            projects = Project.objects.filter(
+                job_types__slug=service_slug,
+                status='published'
+            ).prefetch_related('job_types').distinct()[:6]
+            return ProjectListSerializer(projects, many=True, context={'request': request}).data
+
+        return Response(listing.cached_list(request, f'service:{service_slug}', build))
@@ -8,14 +8,17 @@ financial_media_storage; this only matters for PDFs that predate it and
 are still sitting on local disk under MEDIA_ROOT. Safe to re-run: a PDF
 whose local file no longer exists (already migrated, or genuinely missing)
 is left untouched.
-"""
-import os
 
-from django.conf import settings
+Uploads are concurrent, resumable and skip objects already in the bucket --
+see config/media_migration.py. financial storage is file_overwrite=True
+(deterministic filenames by design), so a PDF always keeps its key and a
+differing object at that key is overwritten, same as save_pdf_bytes.
+"""
 from django.core.management.base import BaseCommand
 
+from config.media_migration import MediaMigration
 from quotes.models import Quote, Invoice, InvoiceInstallment, Estimate
-from quotes.storage import save_pdf_bytes
+from quotes.storage import financial_media_storage
 
 TARGETS = [
     (Quote, 'pdf_file'),
@@ -29,7 +32,7 @@ TARGETS = [
 class Command(BaseCommand):
     help = (
         'Upload quote/invoice/estimate/receipt PDFs still on local disk to '
-        'financial_media_storage (R2). Use --dry-run first.'
+        'financial_media_storage (R2). Resumable; use --dry-run first.'
     )
 
     def add_arguments(self, parser):
@@ -37,42 +40,45 @@ class Command(BaseCommand):
             '--dry-run', action='store_true',
             help="Print what would change; don't save or upload anything.",
         )
+        parser.add_argument('--workers', type=int, help='Concurrent uploads (default MEDIA_MIGRATION_WORKERS).')
+        parser.add_argument(
+            '--checkpoint', default='migrate_financial_media_to_r2.checkpoint.json',
+            help='Progress file used to resume an interrupted run.',
+        )
+        parser.add_argument('--reset', action='store_true', help='Ignore and overwrite an existing checkpoint.')
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
-        uploaded = 0
-        missing = 0
+        migration = MediaMigration(
+            financial_media_storage, options['checkpoint'], self.stdout,
+            workers=options['workers'], dry_run=dry_run, reset=options['reset'],
+        )
 
+        references = []
         for model, field_name in TARGETS:
-            for obj in model.objects.all().order_by('id'):
-                field_file = getattr(obj, field_name)
-                if not field_file or not field_file.name:
-                    continue
+            rows = (
+                model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .order_by('id').values_list('id', field_name)
+            )
+            references += [(model, field_name, pk, name) for pk, name in rows]
+        migrated = migration.upload(name for _, _, _, name in references)
 
-                local_path = os.path.join(settings.MEDIA_ROOT, field_file.name)
-                if not os.path.isfile(local_path):
-                    missing += 1
+        total = 0
+        for model, field_name in TARGETS:
+            updates = []
+            for ref_model, ref_field, pk, name in references:
+                if (ref_model, ref_field) != (model, field_name) or name not in migrated:
                     continue
-
-                label = f'{model.__name__} #{obj.pk}.{field_name}'
+                label = f'{model.__name__} #{pk}.{field_name}'
                 if dry_run:
-                    self.stdout.write(f'Would upload {label}: {field_file.name}')
-                    uploaded += 1
-                    continue
-
-                with open(local_path, 'rb') as f:
-                    data = f.read()
-                # financial storage is file_overwrite=True (deterministic
-                # filenames by design), so new_key always == field_file.name --
-                # still calling through save_pdf_bytes rather than assuming
-                # that, to stay consistent with the rest of this app.
-                new_key = save_pdf_bytes(field_file.name, data)
-                self.stdout.write(f'{label}: {field_file.name} -> {new_key}')
-                model.objects.filter(pk=obj.pk).update(**{field_name: new_key})
-                uploaded += 1
+                    self.stdout.write(f'Would upload {label}: {name}')
+                elif migrated[name] != name:
+                    self.stdout.write(f'{label}: {name} -> {migrated[name]}')
+                    updates.append((pk, {field_name: migrated[name]}))
+            migration.apply_updates(model, updates)
+            total += len(updates)
 
         mode = 'DRY RUN' if dry_run else 'APPLIED'
         self.stdout.write(self.style.SUCCESS(
-            f'{mode}: {uploaded} file(s) uploaded, {missing} reference(s) '
-            f'pointed at a missing local file (left untouched).'
+            f'{mode}: {migration.summary()}; {total} reference(s) rewritten.'
         ))
@@ -0,0 +1,252 @@
+"""
+Bulk re-render existing quote/invoice/receipt PDFs, e.g. after changing
+CompanySettings (logo, address, sender) or a quotes/templates/quotes/*_pdf.html
+template.
+
+Only documents that already have a PDF are touched; narrow the set with
+--kind/--template, --status and --since/--until (creation date). Work is
+split into batches of --batch-size ids and run --workers at a time, either in
+a local process pool (default) or fanned out to the Celery 'pdf' queue
+(--celery). --workers is also the cap on concurrent R2 uploads.
+
+Every render goes through the normal task bodies in quotes/tasks.py, so quotes
+and invoices keep their version archive and unchanged-content fingerprint
+(a re-run after a no-op settings change skips the upload; pass --force to
+re-upload anyway).
+
+Progress is checkpointed to --checkpoint after every finished batch. Running
+the same command again resumes where an interrupted run stopped; a checkpoint
+written for different filters is ignored, --reset discards it.
+"""
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils.dateparse import parse_date
+
+KINDS = ['quote', 'invoice', 'installment_receipt', 'invoice_receipt']
+
+TEMPLATE_KINDS = {
+    'quote_pdf.html': 'quote',
+    'invoice_pdf.html': 'invoice',
+    'installment_receipt_pdf.html': 'installment_receipt',
+    'invoice_receipt_pdf.html': 'invoice_receipt',
+}
+
+# Outcomes that mean the PDF is rendered. 'queued' (the document was busy,
+# so the render was only handed to Celery) and 'error' are not checkpointed,
+# so a resumed run retries them.
+DONE_STATUSES = {'success', 'unchanged', 'skipped'}
+
+
+def _queryset(kind):
+    """Documents of `kind` that already have a stored PDF."""
+    # Imported here: pool workers unpickle this module before django.setup().
+    from quotes.models import Quote, Invoice, InvoiceInstallment
+
+    if kind == 'quote':
+        return Quote.objects.exclude(pdf_file='').exclude(pdf_file__isnull=True), 'created_at'
+    if kind == 'invoice':
+        return Invoice.objects.exclude(pdf_file='').exclude(pdf_file__isnull=True), 'created_at'
+    if kind == 'invoice_receipt':
+        return (Invoice.objects.exclude(receipt_pdf_file='').exclude(receipt_pdf_file__isnull=True),
+                'created_at')
+    return (InvoiceInstallment.objects.exclude(receipt_pdf_file='').exclude(receipt_pdf_file__isnull=True),
+            'invoice__created_at')
+
+
+def _date_arg(value):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f'{value!r} is not a YYYY-MM-DD date')
+    return parsed
+
+
+def _init_worker():
+    # Spawned pool processes start from a bare interpreter.
+    import django
+    django.setup()
+    from quotes.pdf_engine import warm_up
+    warm_up()
+
+
+def _run_batch(kind, ids, force):
+    from quotes.tasks import regenerate_pdf_batch
+    return regenerate_pdf_batch(kind, ids, force)
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-render existing quote/invoice/receipt PDFs (after a CompanySettings '
+        'or template change). Resumable; use --dry-run first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind', action='append', choices=KINDS,
+            help='Document kind to regenerate (repeatable). Default: all.',
+        )
+        parser.add_argument(
+            '--template', action='append', choices=sorted(TEMPLATE_KINDS),
+            help='Regenerate the documents rendered from this template (repeatable).',
+        )
+        parser.add_argument('--status', action='append', help='Only documents with this status (repeatable).')
+        parser.add_argument('--since', type=_date_arg, help='Only documents created on/after YYYY-MM-DD.')
+        parser.add_argument('--until', type=_date_arg, help='Only documents created on/before YYYY-MM-DD.')
+        parser.add_argument('--workers', type=int, default=4, help='Batches rendered concurrently (default 4).')
+        parser.add_argument('--batch-size', type=int, default=20, help='Documents per batch (default 20).')
+        parser.add_argument(
+            '--celery', action='store_true',
+            help="Fan batches out to the Celery 'pdf' queue instead of a local process pool.",
+        )
+        parser.add_argument(
+            '--checkpoint', default='regenerate_pdfs.checkpoint.json',
+            help='Progress file used to resume an interrupted run.',
+        )
+        parser.add_argument('--reset', action='store_true', help='Ignore and overwrite an existing checkpoint.')
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Re-upload quote/invoice PDFs even when their content is unchanged.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Print what would be regenerated; don't render or upload anything.",
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--workers and --batch-size must be at least 1.')
+
+        kinds = list(options['kind'] or [])
+        kinds += [TEMPLATE_KINDS[t] for t in options['template'] or []]
+        kinds = [k for k in KINDS if k in kinds] or list(KINDS)
+
+        signature = {
+            'kinds': kinds,
+            'status': sorted(options['status'] or []),
+            'since': options['since'].isoformat() if options['since'] else None,
+            'until': options['until'].isoformat() if options['until'] else None,
+            'force': options['force'],
+        }
+        checkpoint_path = options['checkpoint']
+        done = self._load_checkpoint(checkpoint_path, signature, options['reset'])
+
+        batches = []
+        total = 0
+        for kind in kinds:
+            qs, date_field = _queryset(kind)
+            if options['status']:
+                qs = qs.filter(status__in=options['status'])
+            if options['since']:
+                qs = qs.filter(**{f'{date_field}__date__gte': options['since']})
+            if options['until']:
+                qs = qs.filter(**{f'{date_field}__date__lte': options['until']})
+            already = set(done.setdefault(kind, []))
+            ids = [pk for pk in qs.order_by('id').values_list('id', flat=True) if pk not in already]
+            total += len(ids)
+            self.stdout.write(f'{kind}: {len(ids)} to regenerate ({len(already)} done in checkpoint)')
+            for i in range(0, len(ids), options['batch_size']):
+                batches.append((kind, ids[i:i + options['batch_size']]))
+
+        if options['dry_run']:
+            for kind, ids in batches:
+                self.stdout.write(f'Would regenerate {kind}: {", ".join(map(str, ids))}')
+            self.stdout.write(self.style.SUCCESS(
+                f'DRY RUN: {total} PDF(s) in {len(batches)} batch(es) would be regenerated.'
+            ))
+            return
+
+        if not batches:
+            self.stdout.write(self.style.SUCCESS('Nothing to regenerate.'))
+            return
+
+        counts = {}
+        progress = {'processed': 0, 'started': time.monotonic()}
+
+        def record(kind, result):
+            for object_id, status in result.get('outcomes', {}).items():
+                counts[status] = counts.get(status, 0) + 1
+                if status in DONE_STATUSES:
+                    done[kind].append(int(object_id))
+            progress['processed'] += len(result.get('outcomes', {}))
+            self._save_checkpoint(checkpoint_path, signature, done)
+            self._report(progress, total)
+
+        if options['celery']:
+            self._run_celery(batches, options, record)
+        elif options['workers'] == 1:
+            for kind, ids in batches:
+                record(kind, _run_batch(kind, ids, options['force']))
+        else:
+            self._run_pool(batches, options, record)
+
+        summary = ', '.join(f'{n} {status}' for status, n in sorted(counts.items()))
+        self.stdout.write(self.style.SUCCESS(f'APPLIED: {progress["processed"]} PDF(s) processed ({summary}).'))
+        if counts.get('error') or counts.get('queued'):
+            self.stdout.write(self.style.WARNING(
+                'Failed and queued documents are not checkpointed; re-run the same command to retry them.'
+            ))
+
+    def _run_pool(self, batches, options, record):
+        # Children must open their own DB connections.
+        connections.close_all()
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=options['workers'], mp_context=context,
+                                 initializer=_init_worker) as pool:
+            pending = {pool.submit(_run_batch, kind, ids, options['force']): kind for kind, ids in batches}
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record(pending.pop(future), future.result())
+
+    def _run_celery(self, batches, options, record):
+        from quotes.tasks import regenerate_pdf_batch
+
+        queue = list(batches)
+        in_flight = []
+        while queue or in_flight:
+            while queue and len(in_flight) < options['workers']:
+                kind, ids = queue.pop(0)
+                in_flight.append((kind, ids, regenerate_pdf_batch.delay(kind, ids, options['force'])))
+            still_running = []
+            for kind, ids, result in in_flight:
+                if not result.ready():
+                    still_running.append((kind, ids, result))
+                elif result.successful():
+                    record(kind, result.result)
+                else:
+                    record(kind, {'outcomes': {str(pk): 'error' for pk in ids}})
+            in_flight = still_running
+            if in_flight:
+                time.sleep(0.5)
+
+    def _report(self, progress, total):
+        elapsed = time.monotonic() - progress['started']
+        processed = progress['processed']
+        rate = processed / elapsed if elapsed else 0
+        eta = (total - processed) / rate if rate else 0
+        self.stdout.write(
+            f'{processed}/{total} PDF(s) | {rate:.1f} docs/s | ETA {int(eta // 60)}m{int(eta % 60):02d}s'
+        )
+
+    def _load_checkpoint(self, path, signature, reset):
+        if reset or not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('signature') != signature:
+            self.stdout.write(self.style.WARNING(
+                f'Checkpoint {path} was written for different options; starting over.'
+            ))
+            return {}
+        return data.get('done', {})
+
+    def _save_checkpoint(self, path, signature, done):
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'signature': signature, 'done': done}, f)
+        os.replace(tmp_path, path)
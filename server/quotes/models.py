@@ -25,6 +25,37 @@ def generate_invoice_reference():
     return f"INV-{date_str}-{random_str}"
 
 
+# Lifecycle of the coalesced background PDF render (see quotes/pdf_jobs.py).
+PDF_STATUS_CHOICES = [
+    ('idle', 'Not Generated'),
+    ('queued', 'Queued'),
+    ('rendering', 'Rendering'),
+    ('ready', 'Ready'),
+    ('failed', 'Failed'),
+]
+
+# Quote/Invoice columns owned by the render job: written only by the
+# conditional .update()s in quotes/pdf_jobs.py and by the render tasks
+# (save(update_fields=[...])). A plain save() of an existing row leaves them
+# out, so an instance loaded before a render finished can't write back a
+# stale lock, version history or revision.
+PDF_JOB_FIELDS = frozenset({
+    'pdf_file', 'pdf_generated_at', 'pdf_version', 'pdf_versions', 'pdf_fingerprint',
+    'pdf_status', 'pdf_revision', 'pdf_rendered_revision', 'pdf_render_started_at',
+})
+
+
+def _without_pdf_job_fields(instance, update_fields):
+    """update_fields for a Quote/Invoice save(): every column but
+    PDF_JOB_FIELDS when the caller didn't name any and the row exists."""
+    if update_fields is not None or instance.pk is None or instance._state.adding:
+        return update_fields
+    return [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in PDF_JOB_FIELDS
+    ]
+
+
 class CompanySettings(models.Model):
     """
     Global company settings for quotes/invoices (singleton pattern).
@@ -218,6 +249,19 @@ class Quote(models.Model):
     pdf_version = models.PositiveIntegerField(default=1)
     pdf_versions = models.JSONField(default=list, blank=True)
 
+    # Background render job -- pdf_revision is bumped on every save that asks
+    # for a new PDF, pdf_rendered_revision is the revision the current
+    # pdf_file reflects. A burst of saves collapses into one render of the
+    # latest revision.
+    pdf_status = models.CharField(max_length=20, choices=PDF_STATUS_CHOICES, default='idle')
+    pdf_revision = models.PositiveIntegerField(default=0)
+    pdf_rendered_revision = models.PositiveIntegerField(default=0)
+    pdf_render_started_at = models.DateTimeField(blank=True, null=True)
+    # sha256 of the HTML the current pdf_file was rendered from (see
+    # quotes/tasks.py::_render_fingerprint) -- an unchanged fingerprint means
+    # the render, archive copy and upload can all be skipped.
+    pdf_fingerprint = models.CharField(max_length=64, blank=True, default='')
+
     # Portal tracking
     created_via_portal = models.BooleanField(default=False, db_index=True)
     edited_by_admin = models.BooleanField(default=False)
@@ -242,6 +286,7 @@ class Quote(models.Model):
         self.calculate_totals()
         # Check for expiration
         self.check_expiration()
+        kwargs['update_fields'] = _without_pdf_job_fields(self, kwargs.get('update_fields'))
         super().save(*args, **kwargs)
 
     def calculate_totals(self):
@@ -436,6 +481,19 @@ class Invoice(models.Model):
     pdf_version = models.PositiveIntegerField(default=1)
     pdf_versions = models.JSONField(default=list, blank=True)
 
+    # Background render job -- pdf_revision is bumped on every save that asks
+    # for a new PDF, pdf_rendered_revision is the revision the current
+    # pdf_file reflects. A burst of saves collapses into one render of the
+    # latest revision.
+    pdf_status = models.CharField(max_length=20, choices=PDF_STATUS_CHOICES, default='idle')
+    pdf_revision = models.PositiveIntegerField(default=0)
+    pdf_rendered_revision = models.PositiveIntegerField(default=0)
+    pdf_render_started_at = models.DateTimeField(blank=True, null=True)
+    # sha256 of the HTML the current pdf_file was rendered from (see
+    # quotes/tasks.py::_render_fingerprint) -- an unchanged fingerprint means
+    # the render, archive copy and upload can all be skipped.
+    pdf_fingerprint = models.CharField(max_length=64, blank=True, default='')
+
     # Receipt storage
     receipt_pdf_file = models.FileField(upload_to='receipts/invoices/', storage=financial_media_storage, blank=True, null=True)
     receipt_generated_at = models.DateTimeField(blank=True, null=True)
@@ -451,6 +509,7 @@ class Invoice(models.Model):
     def save(self, *args, **kwargs):
         self.calculate_totals()
         self.check_overdue()
+        kwargs['update_fields'] = _without_pdf_job_fields(self, kwargs.get('update_fields'))
         super().save(*args, **kwargs)
 
     def calculate_totals(self):
@@ -0,0 +1,189 @@
+"""
+Rendering engine behind every financial-document PDF task in quotes/tasks.py
+(quote, invoice, installment receipt, invoice receipt).
+
+Three things live here so the tasks don't each pay for them per render:
+
+- Warm-up. PDF tasks are routed to their own Celery queue ('pdf', see
+  CELERY_TASK_ROUTES) served by long-lived worker processes. Each process
+  imports xhtml2pdf/ReportLab, compiles the PDF templates and lays out a
+  throwaway page once at start-up (worker_process_init), so the first real
+  render doesn't carry the cold-start cost.
+- Asset resolution. Templates reference images by URL (e.g.
+  {{ company.company_logo.url }}); link_callback() maps those to a local
+  file, fetching anything that isn't already on local disk (remote storage,
+  absolute URLs) once into PDF_ASSET_CACHE_DIR and remembering the mapping
+  for the life of the process. Stored media names are never reused for
+  different content (Django storage renames on collision), so a URL is a
+  safe cache key.
+- Timing. StageTimer records per-stage wall time (template, layout,
+  archive, upload) which each task logs and returns in its result for the
+  dashboards. xhtml2pdf lays out and writes the PDF in a single call, so
+  'layout' covers both.
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from celery.signals import worker_process_init
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+PDF_TEMPLATES = [
+    'quotes/quote_pdf.html',
+    'quotes/invoice_pdf.html',
+    'quotes/installment_receipt_pdf.html',
+    'quotes/invoice_receipt_pdf.html',
+]
+
+# uri -> local file path, for the life of the worker process.
+_resolved_assets = {}
+_resolved_assets_lock = threading.Lock()
+
+
+class StageTimer:
+    """Collects per-stage wall times in milliseconds, e.g. {'template_ms': 12.3}."""
+
+    def __init__(self):
+        self.stages = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[f'{name}_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    def finish(self, label):
+        """Record the total, log the breakdown and return it."""
+        self.stages['total_ms'] = round((time.perf_counter() - self._started) * 1000, 1)
+        logger.info(
+            f"PDF render timings for {label}: "
+            + ', '.join(f"{k}={v}" for k, v in self.stages.items()),
+            extra={'pdf_render_timings': self.stages, 'pdf_document': label},
+        )
+        return self.stages
+
+
+def _asset_cache_dir():
+    path = getattr(settings, 'PDF_ASSET_CACHE_DIR', None)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _cache_to_disk(uri, read_bytes):
+    """Write the bytes behind `uri` into the asset cache dir (once) and
+    return the local path."""
+    ext = os.path.splitext(uri.split('?', 1)[0])[1][:10]
+    path = os.path.join(_asset_cache_dir(), hashlib.sha256(uri.encode()).hexdigest() + ext)
+    if not os.path.exists(path):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(read_bytes())
+        os.replace(tmp_path, path)
+    return path
+
+
+def _read_storage_bytes(name):
+    with default_storage.open(name, 'rb') as f:
+        return f.read()
+
+
+def _fetch_url_bytes(uri):
+    response = requests.get(uri, timeout=15)
+    response.raise_for_status()
+    return response.content
+
+
+def _resolve_asset(uri):
+    media_url = settings.MEDIA_URL
+    static_url = '/' + settings.STATIC_URL.lstrip('/')
+
+    if uri.startswith(media_url):
+        name = uri[len(media_url):]
+        try:
+            return default_storage.path(name)
+        except NotImplementedError:
+            # Remote default storage -- fetch once, serve from disk after.
+            return _cache_to_disk(uri, lambda: _read_storage_bytes(name))
+
+    if uri.startswith(static_url):
+        from django.contrib.staticfiles import finders
+        name = uri[len(static_url):]
+        found = finders.find(name)
+        return found or os.path.join(settings.STATIC_ROOT, name)
+
+    if uri.startswith(('http://', 'https://')):
+        return _cache_to_disk(uri, lambda: _fetch_url_bytes(uri))
+
+    return uri
+
+
+def link_callback(uri, rel):
+    """xhtml2pdf link_callback: resolve an <img>/<link> URI to a local path,
+    memoised per process. Unresolvable assets are logged and passed through
+    unchanged so a missing logo never fails the whole document."""
+    if uri.startswith('data:'):
+        return uri
+    path = _resolved_assets.get(uri)
+    if path and os.path.exists(path):
+        return path
+    try:
+        path = _resolve_asset(uri)
+    except Exception as exc:
+        logger.warning(f"Could not resolve PDF asset {uri}: {exc}")
+        return uri
+    with _resolved_assets_lock:
+        _resolved_assets[uri] = path
+    return path
+
+
+def html_to_pdf(html_content, timer):
+    """Lay out `html_content` as a PDF. Returns the PDF bytes, or None if
+    xhtml2pdf reported errors. Raises ImportError if xhtml2pdf is missing."""
+    from xhtml2pdf import pisa
+
+    with timer.stage('layout'):
+        buffer = io.BytesIO()
+        pisa_status = pisa.CreatePDF(html_content, dest=buffer, link_callback=link_callback)
+
+    if pisa_status.err:
+        logger.error(f"Error generating PDF: {pisa_status.err}")
+        return None
+    return buffer.getvalue()
+
+
+def warm_up():
+    """Pay the per-process start-up costs before the first real render."""
+    started = time.perf_counter()
+    try:
+        from xhtml2pdf import pisa
+
+        for template_name in PDF_TEMPLATES:
+            get_template(template_name)
+
+        from quotes.models import CompanySettings
+        company = CompanySettings.objects.filter(pk=1).first()
+        if company and company.company_logo:
+            link_callback(company.company_logo.url, None)
+
+        pisa.CreatePDF('<html><body><p>warm-up</p></body></html>', dest=io.BytesIO())
+    except Exception as exc:
+        logger.warning(f"PDF engine warm-up incomplete: {exc}")
+        return
+    logger.info(f"PDF engine warmed up in {round((time.perf_counter() - started) * 1000)}ms")
+
+
+@worker_process_init.connect
+def _warm_up_worker_process(**kwargs):
+    warm_up()
@@ -0,0 +1,209 @@
+"""
+Coalesced background PDF regeneration for quotes and invoices.
+
+Saving a quote/invoice used to render its PDF inline, so every PATCH from the
+editor blocked a request worker on xhtml2pdf plus the storage round-trips.
+Views now call request_pdf_render() instead, which bumps the document's
+pdf_revision and schedules tasks.render_pdf_job a few seconds out. A job only
+renders if its revision is still the latest one when it runs, so a burst of
+saves collapses into a single render of the final state.
+
+pdf_render_started_at doubles as a per-document lock: a job that finds
+another render in progress for the same document backs off and retries
+rather than rendering concurrently. Locks older than PDF_RENDER_LOCK_TIMEOUT
+are treated as abandoned (worker killed mid-render) and can be taken over;
+the job's retries back off up to the moment the lock it's waiting on turns
+stale, so a crashed render is always outlasted. A job that still runs out
+of retries marks its revision 'failed' rather than leaving it 'queued'.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class PdfRenderBusy(Exception):
+    """Another worker is currently rendering this document. `stale_in` is
+    how many seconds until its lock counts as abandoned."""
+
+    def __init__(self, message, stale_in=0):
+        super().__init__(message)
+        self.stale_in = stale_in
+
+
+def _lock_timeout():
+    return timedelta(seconds=getattr(settings, 'PDF_RENDER_LOCK_TIMEOUT', 5 * 60))
+
+
+def _job_targets():
+    from .models import Quote, Invoice
+    from .tasks import generate_quote_pdf, generate_invoice_pdf
+    return {
+        'quote': (Quote, generate_quote_pdf),
+        'invoice': (Invoice, generate_invoice_pdf),
+    }
+
+
+def doc_type_for(obj) -> str:
+    """'quote' or 'invoice' for a Quote/Invoice instance."""
+    for doc_type, (model, _) in _job_targets().items():
+        if isinstance(obj, model):
+            return doc_type
+    raise ValueError(f"No PDF job pipeline for {type(obj).__name__}")
+
+
+def pdf_job_status(obj) -> dict:
+    """Job status payload returned by the API for a Quote/Invoice."""
+    return {
+        'status': obj.pdf_status,
+        'revision': obj.pdf_revision,
+        'rendered_revision': obj.pdf_rendered_revision,
+        'version': obj.pdf_version,
+        'generated_at': obj.pdf_generated_at.isoformat() if obj.pdf_generated_at else None,
+    }
+
+
+def request_pdf_render(obj, countdown=None) -> int:
+    """
+    Mark `obj`'s PDF as stale and schedule a coalesced re-render.
+
+    Returns the revision number the caller's changes will be rendered at.
+    The task is enqueued on transaction commit so it never reads a
+    half-saved document. Never raises -- a broker outage must not fail the
+    save that triggered it (same contract as the old inline render).
+    """
+    from .tasks import render_pdf_job
+
+    if countdown is None:
+        countdown = getattr(settings, 'PDF_RENDER_DEBOUNCE_SECONDS', 3)
+
+    model = type(obj)
+    doc_type = doc_type_for(obj)
+    model.objects.filter(pk=obj.pk).update(pdf_revision=F('pdf_revision') + 1, pdf_status='queued')
+    revision = model.objects.filter(pk=obj.pk).values_list('pdf_revision', flat=True).first() or 0
+    obj.pdf_revision = revision
+    obj.pdf_status = 'queued'
+
+    def enqueue():
+        try:
+            render_pdf_job.apply_async((doc_type, obj.pk, revision), countdown=countdown)
+        except Exception as exc:
+            logger.error(f"Could not queue PDF render for {doc_type} {obj.pk}: {exc}")
+            model.objects.filter(pk=obj.pk, pdf_revision=revision).update(pdf_status='failed')
+
+    transaction.on_commit(enqueue)
+    return revision
+
+
+def run_pdf_job(doc_type: str, object_id: int, revision: int, force: bool = False) -> dict:
+    """
+    Body of tasks.render_pdf_job. Renders `object_id` if `revision` is still
+    its latest requested revision; raises PdfRenderBusy if another render of
+    the same document holds the lock. `force` bypasses the unchanged-content
+    fingerprint check in the render task.
+    """
+    model, render = _job_targets()[doc_type]
+
+    current = model.objects.filter(pk=object_id).values('pdf_revision', 'pdf_rendered_revision').first()
+    if current is None:
+        return {'status': 'error', 'reason': f'{doc_type}_not_found'}
+    if current['pdf_revision'] != revision:
+        return {'status': 'skipped', 'reason': 'superseded'}
+    if current['pdf_rendered_revision'] >= revision:
+        return {'status': 'skipped', 'reason': 'already_rendered'}
+
+    now = timezone.now()
+    stale_before = now - _lock_timeout()
+    claimed = model.objects.filter(pk=object_id).filter(
+        Q(pdf_render_started_at__isnull=True) | Q(pdf_render_started_at__lt=stale_before)
+    ).update(pdf_render_started_at=now, pdf_status='rendering')
+    if not claimed:
+        started_at = model.objects.filter(pk=object_id).values_list('pdf_render_started_at', flat=True).first()
+        stale_in = (started_at - stale_before).total_seconds() if started_at else 0
+        raise PdfRenderBusy(f"{doc_type} {object_id} is already rendering", stale_in=max(0, stale_in))
+
+    try:
+        result = render(object_id, force=force)
+    except Exception as exc:
+        logger.exception(f"PDF render failed for {doc_type} {object_id}: {exc}")
+        result = {'status': 'error', 'reason': 'pdf_generation_failed'}
+
+    succeeded = result.get('status') == 'success'
+    release = {'pdf_render_started_at': None}
+    if succeeded:
+        release['pdf_rendered_revision'] = revision
+
+    # Only settle the status if nothing newer was requested mid-render;
+    # otherwise leave it 'queued' for the follow-up job.
+    settled = model.objects.filter(pk=object_id, pdf_revision=revision).update(
+        pdf_status='ready' if succeeded else 'failed', **release
+    )
+    if not settled:
+        model.objects.filter(pk=object_id).update(**release)
+
+    return result
+
+
+def abandon_pdf_job(doc_type: str, object_id: int, revision: int) -> dict:
+    """
+    Give up on `revision` after render_pdf_job ran out of retries: mark it
+    'failed' (unless something newer was requested since) so pollers stop
+    waiting and the next save or generate_pdf requests a fresh render.
+    """
+    model, _ = _job_targets()[doc_type]
+    model.objects.filter(pk=object_id, pdf_revision=revision).update(pdf_status='failed')
+    logger.error(f"Gave up rendering {doc_type} {object_id} revision {revision}: lock never freed")
+    return {'status': 'error', 'reason': 'render_busy'}
+
+
+def render_pdf_now(doc_type: str, object_id: int, force: bool = False) -> dict:
+    """
+    Render a quote/invoice PDF synchronously, with the same revision/lock
+    bookkeeping as the background job -- any pending debounced job for the
+    document is superseded by this render. If another worker is rendering it
+    right now, the render is handed to render_pdf_job (which waits for the
+    lock) and {'status': 'queued'} is returned. Used by bulk regeneration.
+    """
+    from .tasks import render_pdf_job
+
+    model, _ = _job_targets()[doc_type]
+    model.objects.filter(pk=object_id).update(pdf_revision=F('pdf_revision') + 1, pdf_status='queued')
+    revision = model.objects.filter(pk=object_id).values_list('pdf_revision', flat=True).first()
+    if revision is None:
+        return {'status': 'error', 'reason': f'{doc_type}_not_found'}
+    try:
+        return run_pdf_job(doc_type, object_id, revision, force=force)
+    except PdfRenderBusy:
+        render_pdf_job.apply_async((doc_type, object_id, revision, force),
+                                   countdown=getattr(settings, 'PDF_RENDER_DEBOUNCE_SECONDS', 3))
+        return {'status': 'queued', 'revision': revision}
+
+
+def wait_for_pdf_render(obj, revision: int, timeout=None) -> dict:
+    """
+    Block until `obj`'s PDF reflects at least `revision`, the job for it
+    fails, or `timeout` seconds pass. Refreshes `obj` and returns its
+    pdf_job_status().
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'PDF_RENDER_WAIT_SECONDS', 30)
+
+    fields = ['pdf_status', 'pdf_revision', 'pdf_rendered_revision',
+              'pdf_version', 'pdf_generated_at', 'pdf_file']
+    deadline = time.monotonic() + timeout
+    while True:
+        obj.refresh_from_db(fields=fields)
+        if obj.pdf_rendered_revision >= revision:
+            break
+        if obj.pdf_status == 'failed' and obj.pdf_revision == revision:
+            break
+        if time.monotonic() >= deadline:
+            break
+        time.sleep(0.25)
+    return pdf_job_status(obj)
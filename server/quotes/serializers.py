@@ -3,6 +3,7 @@ Serializers for the Quote Generator and Invoice system.
 """
 from rest_framework import serializers
 from .models import CompanySettings, Customer, CustomerPhoto, Quote, LineItem, Invoice, InvoiceInstallment, InvoiceLineItem, Estimate, EstimateLineItem, EstimatePhoto, Deal, EstimateVisit, EstimateVisitPhoto, Appointment, AppointmentDay, CustomJobType, CustomLeadSource
+from .pdf_jobs import pdf_job_status
 
 
 class CompanySettingsSerializer(serializers.ModelSerializer):
@@ -121,6 +122,7 @@ class QuoteDetailSerializer(serializers.ModelSerializer):
     customer = CustomerSerializer(read_only=True)
     line_items = LineItemSerializer(many=True, read_only=True)
     pdf_url = serializers.SerializerMethodField()
+    pdf_job = serializers.SerializerMethodField()
     public_url = serializers.SerializerMethodField()
     invoice_id = serializers.SerializerMethodField()
 
@@ -133,7 +135,7 @@ class QuoteDetailSerializer(serializers.ModelSerializer):
             'subtotal', 'discount_type', 'discount_amount', 'discount_percent',
             'tax_rate', 'tax_amount', 'shipping_amount', 'total',
             'line_items', 'pdf_file', 'pdf_url', 'pdf_generated_at',
-            'pdf_version', 'pdf_versions', 'public_url', 'invoice_id',
+            'pdf_version', 'pdf_versions', 'pdf_job', 'public_url', 'invoice_id',
             'created_via_portal', 'edited_by_admin', 'admin_edited_at',
             'portal_contact_name',
         ]
@@ -150,6 +152,9 @@ class QuoteDetailSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.pdf_file.url)
         return None
 
+    def get_pdf_job(self, obj):
+        return pdf_job_status(obj)
+
     def get_public_url(self, obj):
         return obj.get_public_url()
 
@@ -353,6 +358,7 @@ class InvoiceDetailSerializer(serializers.ModelSerializer):
     installments = InvoiceInstallmentSerializer(many=True, read_only=True)
     balance_due = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
     pdf_url = serializers.SerializerMethodField()
+    pdf_job = serializers.SerializerMethodField()
     receipt_url = serializers.SerializerMethodField()
     public_url = serializers.SerializerMethodField()
 
@@ -367,7 +373,7 @@ class InvoiceDetailSerializer(serializers.ModelSerializer):
             'amount_paid', 'balance_due',
             'installments',
             'pdf_file', 'pdf_url', 'pdf_generated_at',
-            'pdf_version', 'pdf_versions',
+            'pdf_version', 'pdf_versions', 'pdf_job',
             'receipt_pdf_file', 'receipt_url', 'receipt_generated_at',
             'public_url',
         ]
@@ -387,6 +393,9 @@ class InvoiceDetailSerializer(serializers.ModelSerializer):
                 return url
         return None
 
+    def get_pdf_job(self, obj):
+        return pdf_job_status(obj)
+
     def get_receipt_url(self, obj):
         if obj.receipt_pdf_file:
             request = self.context.get('request')
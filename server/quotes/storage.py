@@ -17,9 +17,10 @@ backend. A "financial key" is a path relative to storage root, e.g.
 storage.save()/open()/delete()/exists().
 """
 from django.conf import settings
-from django.core.files.base import ContentFile
 from django.core.files.storage import FileSystemStorage
 
+from config.storage_adapter import StorageAdapter
+
 
 def _build_storage():
     if getattr(settings, 'USE_R2_FINANCIAL_STORAGE', False):
@@ -49,15 +50,16 @@ def _build_storage():
 
 # Built once at import time and reused.
 financial_media_storage = _build_storage()
+# Single-PUT overwrite, server-side copy and cached exists() on top of it
+# (see config/storage_adapter.py).
+financial_media = StorageAdapter(financial_media_storage)
 
 
 def save_pdf_bytes(key: str, content: bytes) -> str:
     """Save raw PDF bytes at storage key `key` (e.g. 'quotes/quote_ABC.pdf'),
     overwriting any existing file at that key. Returns the key saved under
-    (always == `key` since file_overwrite=True / local os.replace semantics)."""
-    if financial_media_storage.exists(key):
-        financial_media_storage.delete(key)
-    return financial_media_storage.save(key, ContentFile(content))
+    (always == `key`). One PUT on R2; a temp file + os.replace locally."""
+    return financial_media.overwrite(key, content)
 
 
 def financial_media_url(key: str):
@@ -79,24 +81,19 @@ def read_financial_file(key: str) -> bytes:
 
 
 def financial_file_exists(key: str) -> bool:
-    return bool(key) and financial_media_storage.exists(key)
+    return financial_media.exists(key)
 
 
 def copy_financial_file(src_key: str, dest_key: str) -> str:
-    """Copy the file at `src_key` to `dest_key` (used by _archive_pdf to
-    snapshot the previous version before it gets overwritten). Returns
-    dest_key. No-op-safe: raises if src_key doesn't exist, same as the old
-    shutil.copy2 behavior did."""
-    with financial_media_storage.open(src_key, 'rb') as f:
-        content = f.read()
-    if financial_media_storage.exists(dest_key):
-        financial_media_storage.delete(dest_key)
-    return financial_media_storage.save(dest_key, ContentFile(content))
+    """Copy the file at `src_key` to `dest_key`, replacing it (used by
+    _archive_pdf to snapshot the previous version before it gets
+    overwritten). Returns dest_key. Server-side CopyObject on R2, a hardlink
+    locally. Raises FileNotFoundError if src_key doesn't exist."""
+    return financial_media.copy(src_key, dest_key)
 
 
 def delete_financial_file(key: str) -> None:
-    if key and financial_media_storage.exists(key):
-        financial_media_storage.delete(key)
+    financial_media.delete(key)
 
 
 def is_local_storage() -> bool:
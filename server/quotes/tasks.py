@@ -1,7 +1,7 @@
 """
 Celery tasks for quote/invoice PDF generation and email delivery.
 """
-import io
+import hashlib
 import logging
 from celery import shared_task
 from django.conf import settings
@@ -9,6 +9,7 @@ from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 from django.utils import timezone
 
+from .pdf_engine import StageTimer, html_to_pdf
 from .storage import (
     save_pdf_bytes,
     read_financial_file,
@@ -18,6 +19,24 @@ from .storage import (
 
 logger = logging.getLogger(__name__)
 
+# Bump when something that changes the PDF output *without* changing the
+# rendered HTML ships (xhtml2pdf upgrade, font swap, ...) so every stored
+# fingerprint goes stale and documents re-render on their next save.
+PDF_TEMPLATE_VERSION = '1'
+
+
+def _render_fingerprint(html_content: str) -> str:
+    """
+    Fingerprint of everything visible in a document PDF. The rendered HTML
+    already folds in the document fields, line items/installments,
+    CompanySettings (logo included, by storage path) and the template source,
+    so hashing it catches exactly the changes that would alter the PDF --
+    and nothing else, e.g. a status-only save.
+    """
+    digest = hashlib.sha256(PDF_TEMPLATE_VERSION.encode())
+    digest.update(html_content.encode('utf-8'))
+    return digest.hexdigest()
+
 
 def _archive_pdf(obj, key_prefix, base_filename):
     """
@@ -29,12 +48,16 @@ def _archive_pdf(obj, key_prefix, base_filename):
         return obj.pdf_version
 
     current_key = obj.pdf_file.name if obj.pdf_file else None
-    if current_key and financial_file_exists(current_key):
+    if current_key:
         version = obj.pdf_version
         versioned_filename = f"{base_filename}_v{version}.pdf"
         versioned_key = f"{key_prefix}/{versioned_filename}"
+        # Copy straight away (server-side on R2) rather than checking
+        # existence first: a missing current file is the rare case.
         try:
             copy_financial_file(current_key, versioned_key)
+        except FileNotFoundError:
+            return version
         except Exception as exc:
             logger.warning(f"Could not archive PDF version: {exc}")
             return version
@@ -52,43 +75,53 @@ def _archive_pdf(obj, key_prefix, base_filename):
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def generate_quote_pdf(self, quote_id: int) -> dict:
-    """Generate PDF for a quote, archiving any previous version."""
+def generate_quote_pdf(self, quote_id: int, force: bool = False) -> dict:
+    """
+    Generate PDF for a quote, archiving any previous version. Skipped
+    entirely (no render, archive or upload) when the rendered HTML matches
+    the stored fingerprint, unless `force` is set.
+    """
     from quotes.models import Quote, CompanySettings
 
     try:
-        from xhtml2pdf import pisa
-
+        timer = StageTimer()
         quote = Quote.objects.select_related('customer').prefetch_related('line_items').get(id=quote_id)
         company = CompanySettings.get_instance()
 
-        # Archive existing PDF before overwriting
-        _archive_pdf(quote, 'quotes', f"quote_{quote.reference}")
-
-        html_content = render_to_string('quotes/quote_pdf.html', {
-            'quote': quote,
-            'company': company,
-            'line_items': quote.line_items.all(),
-        })
+        with timer.stage('template'):
+            html_content = render_to_string('quotes/quote_pdf.html', {
+                'quote': quote,
+                'company': company,
+                'line_items': quote.line_items.all(),
+            })
 
         pdf_filename = f"quote_{quote.reference}.pdf"
         pdf_key = f"quotes/{pdf_filename}"
 
-        buffer = io.BytesIO()
-        pisa_status = pisa.CreatePDF(html_content, dest=buffer)
+        fingerprint = _render_fingerprint(html_content)
+        if not force and quote.pdf_file and quote.pdf_fingerprint == fingerprint:
+            logger.info(f"PDF for quote {quote.reference} unchanged, skipping render")
+            return {'status': 'success', 'pdf_key': quote.pdf_file.name, 'reference': quote.reference, 'unchanged': True}
 
-        if pisa_status.err:
-            logger.error(f"Error generating PDF: {pisa_status.err}")
+        pdf_bytes = html_to_pdf(html_content, timer)
+        if pdf_bytes is None:
             return {'status': 'error', 'reason': 'pdf_generation_failed'}
 
-        save_pdf_bytes(pdf_key, buffer.getvalue())
+        # Archive existing PDF before overwriting
+        with timer.stage('archive'):
+            _archive_pdf(quote, 'quotes', f"quote_{quote.reference}")
+
+        with timer.stage('upload'):
+            save_pdf_bytes(pdf_key, pdf_bytes)
 
         quote.pdf_file.name = pdf_key
         quote.pdf_generated_at = timezone.now()
-        quote.save(update_fields=['pdf_file', 'pdf_generated_at', 'pdf_version', 'pdf_versions'])
+        quote.pdf_fingerprint = fingerprint
+        quote.save(update_fields=['pdf_file', 'pdf_generated_at', 'pdf_version', 'pdf_versions', 'pdf_fingerprint'])
 
         logger.info(f"Generated PDF v{quote.pdf_version - 1} for quote {quote.reference}")
-        return {'status': 'success', 'pdf_key': pdf_key, 'reference': quote.reference}
+        timings = timer.finish(f"quote {quote.reference}")
+        return {'status': 'success', 'pdf_key': pdf_key, 'reference': quote.reference, 'timings': timings}
 
     except Quote.DoesNotExist:
         logger.error(f"Quote {quote_id} not found")
@@ -103,6 +136,64 @@ def generate_quote_pdf(self, quote_id: int) -> dict:
         raise self.retry(exc=exc)
 
 
+@shared_task(bind=True, max_retries=20, default_retry_delay=3)
+def render_pdf_job(self, doc_type: str, object_id: int, revision: int, force: bool = False) -> dict:
+    """
+    Coalesced background render of a quote/invoice PDF (see quotes/pdf_jobs.py).
+    Retries while another render of the same document holds the lock,
+    backing off exponentially but never past the moment that lock turns
+    stale -- so a render abandoned by a dead worker is always taken over
+    well within max_retries.
+    """
+    from .pdf_jobs import abandon_pdf_job, run_pdf_job, PdfRenderBusy
+
+    try:
+        return run_pdf_job(doc_type, object_id, revision, force=force)
+    except PdfRenderBusy as exc:
+        if self.request.retries >= self.max_retries:
+            return abandon_pdf_job(doc_type, object_id, revision)
+        backoff = self.default_retry_delay * 2 ** self.request.retries
+        countdown = max(self.default_retry_delay, min(backoff, exc.stale_in + 1))
+        raise self.retry(exc=exc, countdown=countdown)
+
+
+def regenerate_pdf(kind: str, object_id: int, force: bool = False) -> dict:
+    """
+    Re-render one existing PDF through its normal task body. `kind` is one of
+    'quote', 'invoice', 'installment_receipt', 'invoice_receipt'. Used by the
+    regenerate_pdfs management command (in-process pool) and by
+    regenerate_pdf_batch (Celery fan-out).
+    """
+    from .pdf_jobs import render_pdf_now
+
+    try:
+        if kind in ('quote', 'invoice'):
+            # Through the job pipeline so a concurrent editor save and this
+            # render never race on the same document.
+            return render_pdf_now(kind, object_id, force=force)
+        if kind == 'installment_receipt':
+            return generate_installment_receipt_pdf(object_id)
+        if kind == 'invoice_receipt':
+            return generate_invoice_receipt_pdf(object_id)
+    except Exception as exc:
+        logger.exception(f"Error regenerating {kind} PDF {object_id}: {exc}")
+        return {'status': 'error', 'reason': str(exc)}
+    return {'status': 'error', 'reason': f'unknown_kind_{kind}'}
+
+
+@shared_task
+def regenerate_pdf_batch(kind: str, object_ids: list, force: bool = False) -> dict:
+    """Regenerate a batch of existing PDFs. Returns {object_id: status}."""
+    outcomes = {}
+    for object_id in object_ids:
+        result = regenerate_pdf(kind, object_id, force=force)
+        status = result.get('status')
+        if status == 'success' and result.get('unchanged'):
+            status = 'unchanged'
+        outcomes[str(object_id)] = status
+    return {'status': 'success', 'kind': kind, 'outcomes': outcomes}
+
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=120)
 def send_quote_email(self, quote_id: int) -> dict:
     """
@@ -178,45 +269,55 @@ def send_quote_email(self, quote_id: int) -> dict:
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def generate_invoice_pdf(self, invoice_id: int) -> dict:
-    """Generate PDF for an invoice, archiving any previous version."""
+def generate_invoice_pdf(self, invoice_id: int, force: bool = False) -> dict:
+    """
+    Generate PDF for an invoice, archiving any previous version. Skipped
+    entirely (no render, archive or upload) when the rendered HTML matches
+    the stored fingerprint, unless `force` is set.
+    """
     from quotes.models import Invoice, CompanySettings
 
     try:
-        from xhtml2pdf import pisa
-
+        timer = StageTimer()
         invoice = Invoice.objects.select_related('customer').prefetch_related(
             'installments__line_items'
         ).get(id=invoice_id)
         company = CompanySettings.get_instance()
 
-        # Archive existing PDF before overwriting
-        _archive_pdf(invoice, 'invoices', f"invoice_{invoice.reference}")
-
-        html_content = render_to_string('quotes/invoice_pdf.html', {
-            'invoice': invoice,
-            'company': company,
-            'installments': invoice.installments.prefetch_related('line_items').all(),
-        })
+        with timer.stage('template'):
+            html_content = render_to_string('quotes/invoice_pdf.html', {
+                'invoice': invoice,
+                'company': company,
+                'installments': invoice.installments.prefetch_related('line_items').all(),
+            })
 
         pdf_filename = f"invoice_{invoice.reference}.pdf"
         pdf_key = f"invoices/{pdf_filename}"
 
-        buffer = io.BytesIO()
-        pisa_status = pisa.CreatePDF(html_content, dest=buffer)
+        fingerprint = _render_fingerprint(html_content)
+        if not force and invoice.pdf_file and invoice.pdf_fingerprint == fingerprint:
+            logger.info(f"PDF for invoice {invoice.reference} unchanged, skipping render")
+            return {'status': 'success', 'pdf_key': invoice.pdf_file.name, 'reference': invoice.reference, 'unchanged': True}
 
-        if pisa_status.err:
-            logger.error(f"Error generating PDF: {pisa_status.err}")
+        pdf_bytes = html_to_pdf(html_content, timer)
+        if pdf_bytes is None:
             return {'status': 'error', 'reason': 'pdf_generation_failed'}
 
-        save_pdf_bytes(pdf_key, buffer.getvalue())
+        # Archive existing PDF before overwriting
+        with timer.stage('archive'):
+            _archive_pdf(invoice, 'invoices', f"invoice_{invoice.reference}")
+
+        with timer.stage('upload'):
+            save_pdf_bytes(pdf_key, pdf_bytes)
 
         invoice.pdf_file.name = pdf_key
         invoice.pdf_generated_at = timezone.now()
-        invoice.save(update_fields=['pdf_file', 'pdf_generated_at', 'pdf_version', 'pdf_versions'])
+        invoice.pdf_fingerprint = fingerprint
+        invoice.save(update_fields=['pdf_file', 'pdf_generated_at', 'pdf_version', 'pdf_versions', 'pdf_fingerprint'])
 
         logger.info(f"Generated PDF v{invoice.pdf_version - 1} for invoice {invoice.reference}")
-        return {'status': 'success', 'pdf_key': pdf_key, 'reference': invoice.reference}
+        timings = timer.finish(f"invoice {invoice.reference}")
+        return {'status': 'success', 'pdf_key': pdf_key, 'reference': invoice.reference, 'timings': timings}
 
     except Invoice.DoesNotExist:
         logger.error(f"Invoice {invoice_id} not found")
@@ -237,36 +338,36 @@ def generate_installment_receipt_pdf(self, installment_id: int) -> dict:
     from quotes.models import InvoiceInstallment, CompanySettings
 
     try:
-        from xhtml2pdf import pisa
-
+        timer = StageTimer()
         installment = InvoiceInstallment.objects.select_related(
             'invoice__customer'
         ).prefetch_related('line_items').get(id=installment_id)
         company = CompanySettings.get_instance()
 
-        html_content = render_to_string('quotes/installment_receipt_pdf.html', {
-            'installment': installment,
-            'invoice': installment.invoice,
-            'company': company,
-        })
+        with timer.stage('template'):
+            html_content = render_to_string('quotes/installment_receipt_pdf.html', {
+                'installment': installment,
+                'invoice': installment.invoice,
+                'company': company,
+            })
 
         pdf_filename = f"receipt_{installment.invoice.reference}_inst{installment.id}.pdf"
         pdf_key = f"receipts/installments/{pdf_filename}"
 
-        buffer = io.BytesIO()
-        pisa_status = pisa.CreatePDF(html_content, dest=buffer)
-
-        if pisa_status.err:
+        pdf_bytes = html_to_pdf(html_content, timer)
+        if pdf_bytes is None:
             return {'status': 'error', 'reason': 'pdf_generation_failed'}
 
-        save_pdf_bytes(pdf_key, buffer.getvalue())
+        with timer.stage('upload'):
+            save_pdf_bytes(pdf_key, pdf_bytes)
 
         installment.receipt_pdf_file.name = pdf_key
         installment.receipt_generated_at = timezone.now()
         installment.save(update_fields=['receipt_pdf_file', 'receipt_generated_at'])
 
         logger.info(f"Generated installment receipt for {installment}")
-        return {'status': 'success', 'pdf_key': pdf_key}
+        timings = timer.finish(f"installment receipt {installment.id}")
+        return {'status': 'success', 'pdf_key': pdf_key, 'timings': timings}
 
     except InvoiceInstallment.DoesNotExist:
         return {'status': 'error', 'reason': 'installment_not_found'}
@@ -283,36 +384,36 @@ def generate_invoice_receipt_pdf(self, invoice_id: int) -> dict:
     from quotes.models import Invoice, CompanySettings
 
     try:
-        from xhtml2pdf import pisa
-
+        timer = StageTimer()
         invoice = Invoice.objects.select_related('customer').prefetch_related(
             'installments__line_items'
         ).get(id=invoice_id)
         company = CompanySettings.get_instance()
 
-        html_content = render_to_string('quotes/invoice_receipt_pdf.html', {
-            'invoice': invoice,
-            'company': company,
-            'installments': invoice.installments.prefetch_related('line_items').all(),
-        })
+        with timer.stage('template'):
+            html_content = render_to_string('quotes/invoice_receipt_pdf.html', {
+                'invoice': invoice,
+                'company': company,
+                'installments': invoice.installments.prefetch_related('line_items').all(),
+            })
 
         pdf_filename = f"receipt_{invoice.reference}.pdf"
         pdf_key = f"receipts/invoices/{pdf_filename}"
 
-        buffer = io.BytesIO()
-        pisa_status = pisa.CreatePDF(html_content, dest=buffer)
-
-        if pisa_status.err:
+        pdf_bytes = html_to_pdf(html_content, timer)
+        if pdf_bytes is None:
             return {'status': 'error', 'reason': 'pdf_generation_failed'}
 
-        save_pdf_bytes(pdf_key, buffer.getvalue())
+        with timer.stage('upload'):
+            save_pdf_bytes(pdf_key, pdf_bytes)
 
         invoice.receipt_pdf_file.name = pdf_key
         invoice.receipt_generated_at = timezone.now()
         invoice.save(update_fields=['receipt_pdf_file', 'receipt_generated_at'])
 
         logger.info(f"Generated invoice receipt for {invoice.reference}")
-        return {'status': 'success', 'pdf_key': pdf_key}
+        timings = timer.finish(f"invoice receipt {invoice.reference}")
+        return {'status': 'success', 'pdf_key': pdf_key, 'timings': timings}
 
     except Invoice.DoesNotExist:
         return {'status': 'error', 'reason': 'invoice_not_found'}
@@ -409,6 +510,9 @@ def check_expired_quotes():
         status='sent',
         expires_at__lt=timezone.now().date()
     ).update(status='expired')
+    if expired_count:
+        from notifications.stats import invalidate_stats
+        invalidate_stats('quotes')
 
     logger.info(f"Marked {expired_count} quotes as expired")
     return {'expired_count': expired_count}
@@ -426,6 +530,9 @@ def check_overdue_invoices():
         status='sent',
         due_date__lt=timezone.now().date()
     ).update(status='overdue')
+    if overdue_count:
+        from notifications.stats import invalidate_stats
+        invalidate_stats('invoices')
 
     logger.info(f"Marked {overdue_count} invoices as overdue")
     return {'overdue_count': overdue_count}
@@ -15,6 +15,8 @@ from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
 
+from config import direct_uploads
+
 from .models import CompanySettings, Customer, CustomerPhoto, Quote, LineItem, Invoice, InvoiceInstallment, InvoiceLineItem, Estimate, EstimateLineItem, EstimatePhoto, Deal, EstimateVisit, EstimateVisitPhoto, Appointment, CustomJobType, CustomLeadSource
 from .serializers import (
     CompanySettingsSerializer,
@@ -27,6 +29,8 @@ from .serializers import (
     DealSerializer, EstimateVisitSerializer, EstimateVisitPhotoSerializer, AppointmentSerializer,
     CustomJobTypeSerializer, CustomLeadSourceSerializer,
 )
+from .pdf_jobs import request_pdf_render, wait_for_pdf_render, pdf_job_status
+from notifications.stats import get_stats
 
 
 class IsAdminOrQuotesManager(BasePermission):
@@ -43,6 +47,38 @@ class IsAdminOrQuotesManager(BasePermission):
             return False
 
 
+def _fresh_pdf_response(request, document, payload):
+    """
+    Ask for an immediate render of `document`'s PDF and wait on its coalesced
+    job (never a second concurrent render). Falls back to 202 + job status
+    if the worker doesn't finish within PDF_RENDER_WAIT_SECONDS, so the
+    client can keep polling the pdf_job action.
+    """
+    revision = request_pdf_render(document, countdown=0)
+    job = wait_for_pdf_render(document, revision)
+
+    if document.pdf_rendered_revision >= revision:
+        pdf_url = None
+        if document.pdf_file:
+            pdf_url = request.build_absolute_uri(document.pdf_file.url)
+        return Response({
+            'message': 'PDF generated successfully',
+            **payload,
+            'pdf_url': pdf_url,
+            'pdf_job': job,
+        })
+    if job['status'] == 'failed':
+        return Response(
+            {'error': 'PDF generation failed', 'pdf_job': job},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+    return Response({
+        'message': 'PDF generation queued',
+        **payload,
+        'pdf_job': job,
+    }, status=status.HTTP_202_ACCEPTED)
+
+
 # ==================== COMPANY SETTINGS ====================
 
 class CompanySettingsView(APIView):
@@ -169,11 +205,20 @@ class CustomerViewSet(viewsets.ModelViewSet):
         serializer = CustomerPhotoSerializer(photos, many=True, context={'request': request})
         return Response(serializer.data)
 
-    @action(detail=True, methods=['post'], url_path='upload_photo', parser_classes=[MultiPartParser, FormParser])
+    @action(detail=True, methods=['post'], url_path='photo_upload_url')
+    def photo_upload_url(self, request, pk=None):
+        """Issue a direct-to-storage upload for a customer photo."""
+        customer = self.get_object()
+        return Response(direct_uploads.issue(request, 'customer_photo', f'customer:{customer.pk}'))
+
+    @action(detail=True, methods=['post'], url_path='upload_photo', parser_classes=[MultiPartParser, FormParser, JSONParser])
     def upload_photo(self, request, pk=None):
-        """Upload a photo for this customer."""
+        """Upload a photo for this customer (or attach a direct upload by
+        its `upload_token`)."""
         customer = self.get_object()
         image = request.FILES.get('image')
+        if request.data.get('upload_token'):
+            image = direct_uploads.claim(request.data['upload_token'], 'customer_photo', f'customer:{customer.pk}')
         if not image:
             return Response({'error': 'No image provided'}, status=status.HTTP_400_BAD_REQUEST)
         caption = request.data.get('caption', '')
@@ -205,6 +250,7 @@ class QuoteViewSet(viewsets.ModelViewSet):
 
     Custom Actions:
     - POST /api/quotes/{id}/generate_pdf/ - Generate PDF
+    - GET /api/quotes/{id}/pdf_job/ - Background PDF render status
     - POST /api/quotes/{id}/send_email/ - Send via email
     - POST /api/quotes/{id}/update_status/ - Update status
     - POST /api/quotes/{id}/duplicate/ - Create copy
@@ -223,12 +269,8 @@ class QuoteViewSet(viewsets.ModelViewSet):
         return QuoteDetailSerializer
 
     def _generate_pdf_after_save(self, quote, request):
-        """Regenerate PDF synchronously after every save."""
-        try:
-            from .tasks import generate_quote_pdf
-            generate_quote_pdf(quote.id)
-        except Exception:
-            pass  # PDF failure must not block save response
+        """Queue a coalesced background PDF render after every save."""
+        request_pdf_render(quote)
 
     def perform_create(self, serializer):
         instance = serializer.save()
@@ -245,33 +287,17 @@ class QuoteViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def generate_pdf(self, request, pk=None):
-        """Generate PDF synchronously."""
+        """Render a fresh PDF now, waiting on the document's coalesced render job."""
         quote = self.get_object()
+        return _fresh_pdf_response(request, quote, {
+            'quote_id': quote.id,
+            'reference': quote.reference,
+        })
 
-        try:
-            from .tasks import generate_quote_pdf
-            # Run synchronously (without .delay()) for immediate result
-            result = generate_quote_pdf(quote.id)
-
-            if result.get('status') == 'success':
-                quote.refresh_from_db()
-                pdf_url = None
-                if quote.pdf_file:
-                    pdf_url = request.build_absolute_uri(quote.pdf_file.url)
-                return Response({
-                    'message': 'PDF generated successfully',
-                    'quote_id': quote.id,
-                    'reference': quote.reference,
-                    'pdf_url': pdf_url
-                })
-            else:
-                return Response({
-                    'error': result.get('reason', 'PDF generation failed')
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        except Exception as e:
-            return Response({
-                'error': str(e)
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    @action(detail=True, methods=['get'])
+    def pdf_job(self, request, pk=None):
+        """Current background PDF render status (for polling from the editor)."""
+        return Response(pdf_job_status(self.get_object()))
 
     @action(detail=True, methods=['post'])
     def send_email(self, request, pk=None):
@@ -351,27 +377,7 @@ class QuoteViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get quote statistics."""
-        total = Quote.objects.count()
-        by_status = {}
-
-        for status_key, status_label in Quote.STATUS_CHOICES:
-            by_status[status_key] = Quote.objects.filter(status=status_key).count()
-
-        # Calculate totals
-        total_value = Quote.objects.aggregate(
-            total_value=models.Sum('total')
-        )['total_value'] or 0
-
-        accepted_value = Quote.objects.filter(status='accepted').aggregate(
-            total_value=models.Sum('total')
-        )['total_value'] or 0
-
-        return Response({
-            'total': total,
-            'by_status': by_status,
-            'total_value': float(total_value),
-            'accepted_value': float(accepted_value),
-        })
+        return Response(get_stats('quotes')['quotes'])
 
     @action(detail=True, methods=['post'])
     def convert_to_invoice(self, request, pk=None):
@@ -509,6 +515,7 @@ class InvoiceViewSet(viewsets.ModelViewSet):
 
     Custom Actions:
     - POST /api/invoices/{id}/generate_pdf/ - Generate PDF
+    - GET /api/invoices/{id}/pdf_job/ - Background PDF render status
     - POST /api/invoices/{id}/send_email/ - Send via email
     - POST /api/invoices/{id}/mark_paid/ - Mark as paid
     - POST /api/invoices/{id}/record_payment/ - Record partial payment
@@ -529,12 +536,8 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         return InvoiceDetailSerializer
 
     def _generate_pdf_after_save(self, invoice, request):
-        """Regenerate PDF synchronously after every save."""
-        try:
-            from .tasks import generate_invoice_pdf
-            generate_invoice_pdf(invoice.id)
-        except Exception:
-            pass
+        """Queue a coalesced background PDF render after every save."""
+        request_pdf_render(invoice)
 
     def perform_create(self, serializer):
         instance = serializer.save()
@@ -546,33 +549,17 @@ class InvoiceViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def generate_pdf(self, request, pk=None):
-        """Generate PDF synchronously."""
+        """Render a fresh PDF now, waiting on the document's coalesced render job."""
         invoice = self.get_object()
+        return _fresh_pdf_response(request, invoice, {
+            'invoice_id': invoice.id,
+            'reference': invoice.reference,
+        })
 
-        try:
-            from .tasks import generate_invoice_pdf
-            # Run synchronously (without .delay()) for immediate result
-            result = generate_invoice_pdf(invoice.id)
-
-            if result.get('status') == 'success':
-                invoice.refresh_from_db()
-                pdf_url = None
-                if invoice.pdf_file:
-                    pdf_url = request.build_absolute_uri(invoice.pdf_file.url)
-                return Response({
-                    'message': 'PDF generated successfully',
-                    'invoice_id': invoice.id,
-                    'reference': invoice.reference,
-                    'pdf_url': pdf_url
-                })
-            else:
-                return Response({
-                    'error': result.get('reason', 'PDF generation failed')
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        except Exception as e:
-            return Response({
-                'error': str(e)
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    @action(detail=True, methods=['get'])
+    def pdf_job(self, request, pk=None):
+        """Current background PDF render status (for polling from the editor)."""
+        return Response(pdf_job_status(self.get_object()))
 
     @action(detail=True, methods=['post'])
     def send_email(self, request, pk=None):
@@ -758,34 +745,7 @@ class InvoiceViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get invoice statistics."""
-        total = Invoice.objects.count()
-        by_status = {}
-
-        for status_key, status_label in Invoice.STATUS_CHOICES:
-            by_status[status_key] = Invoice.objects.filter(status=status_key).count()
-
-        # Calculate totals
-        total_value = Invoice.objects.aggregate(
-            total_value=models.Sum('total')
-        )['total_value'] or 0
-
-        paid_value = Invoice.objects.filter(status='paid').aggregate(
-            total_value=models.Sum('total')
-        )['total_value'] or 0
-
-        outstanding = Invoice.objects.filter(
-            status__in=['sent', 'overdue', 'partial']
-        ).aggregate(
-            total_value=models.Sum('total')
-        )['total_value'] or 0
-
-        return Response({
-            'total': total,
-            'by_status': by_status,
-            'total_value': float(total_value),
-            'paid_value': float(paid_value),
-            'outstanding': float(outstanding),
-        })
+        return Response(get_stats('invoices')['invoices'])
 
 
 # ==================== PUBLIC INVOICE VIEW ====================
@@ -821,11 +781,20 @@ class EstimateViewSet(viewsets.ModelViewSet):
             return EstimateListSerializer
         return EstimateSerializer
 
-    @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser])
+    @action(detail=True, methods=['post'])
+    def photo_upload_url(self, request, pk=None):
+        """Issue a direct-to-storage upload for an estimate photo."""
+        estimate = self.get_object()
+        return Response(direct_uploads.issue(request, 'estimate_photo', f'estimate:{estimate.pk}'))
+
+    @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser, JSONParser])
     def upload_photo(self, request, pk=None):
-        """Upload a photo for this estimate."""
+        """Upload a photo for this estimate (or attach a direct upload by
+        its `upload_token`)."""
         estimate = self.get_object()
         image = request.FILES.get('image')
+        if request.data.get('upload_token'):
+            image = direct_uploads.claim(request.data['upload_token'], 'estimate_photo', f'estimate:{estimate.pk}')
         if not image:
             return Response({'error': 'No image provided'}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -882,21 +851,7 @@ class EstimateViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get estimate statistics."""
-        total = Estimate.objects.count()
-        pending = Estimate.objects.filter(visit_status__in=['not_scheduled', 'scheduled']).count()
-        by_visit_status = {}
-        for key, _ in Estimate.VISIT_STATUS_CHOICES:
-            by_visit_status[key] = Estimate.objects.filter(visit_status=key).count()
-        by_financial_status = {}
-        for key, _ in Estimate.FINANCIAL_STATUS_CHOICES:
-            by_financial_status[key] = Estimate.objects.filter(financial_status=key).count()
-
-        return Response({
-            'total': total,
-            'pending': pending,
-            'by_visit_status': by_visit_status,
-            'by_financial_status': by_financial_status,
-        })
+        return Response(get_stats('estimates')['estimates'])
 
 
 # ==================== DEAL VIEWSET ====================
@@ -1044,11 +999,20 @@ class EstimateVisitViewSet(viewsets.ModelViewSet):
     filterset_fields = ['deal', 'status']
     pagination_class = None
 
-    @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser])
+    @action(detail=True, methods=['post'])
+    def photo_upload_url(self, request, pk=None):
+        """Issue a direct-to-storage upload for an estimate visit photo."""
+        visit = self.get_object()
+        return Response(direct_uploads.issue(request, 'estimate_visit_photo', f'estimate_visit:{visit.pk}'))
+
+    @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser, JSONParser])
     def upload_photo(self, request, pk=None):
-        """Upload a photo for this estimate visit."""
+        """Upload a photo for this estimate visit (or attach a direct
+        upload by its `upload_token`)."""
         visit = self.get_object()
         image = request.FILES.get('image')
+        if request.data.get('upload_token'):
+            image = direct_uploads.claim(request.data['upload_token'], 'estimate_visit_photo', f'estimate_visit:{visit.pk}')
         if not image:
             return Response({'error': 'No image provided'}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -1165,20 +1129,12 @@ class QuotesPortalViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         customer = _get_portal_placeholder_customer()
         instance = serializer.save(created_via_portal=True, customer=customer)
-        try:
-            from .tasks import generate_quote_pdf
-            generate_quote_pdf(instance.id)
-        except Exception:
-            pass
+        request_pdf_render(instance)
 
     def perform_update(self, serializer):
         # Reset admin-edit flag when portal user edits the quote
         instance = serializer.save(edited_by_admin=False, admin_edited_at=None)
-        try:
-            from .tasks import generate_quote_pdf
-            generate_quote_pdf(instance.id)
-        except Exception:
-            pass
+        request_pdf_render(instance)
 
     def destroy(self, request, *args, **kwargs):
         return Response(
@@ -1190,26 +1146,12 @@ class QuotesPortalViewSet(viewsets.ModelViewSet):
     def generate_pdf(self, request, pk=None):
         """Generate/regenerate PDF for a portal quote."""
         quote = self.get_object()
-        try:
-            from .tasks import generate_quote_pdf
-            result = generate_quote_pdf(quote.id)
-            if result.get('status') == 'success':
-                quote.refresh_from_db()
-                pdf_url = None
-                if quote.pdf_file:
-                    pdf_url = request.build_absolute_uri(quote.pdf_file.url)
-                return Response({
-                    'message': 'PDF generated successfully',
-                    'quote_id': quote.id,
-                    'pdf_url': pdf_url,
-                })
-            else:
-                return Response(
-                    {'error': result.get('reason', 'PDF generation failed')},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                )
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return _fresh_pdf_response(request, quote, {'quote_id': quote.id})
+
+    @action(detail=True, methods=['get'])
+    def pdf_job(self, request, pk=None):
+        """Current background PDF render status for a portal quote."""
+        return Response(pdf_job_status(self.get_object()))
 
     @action(detail=True, methods=['post'])
     def send_email(self, request, pk=None):